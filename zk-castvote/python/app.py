@@ -1,13 +1,69 @@
-from fastapi import FastAPI, HTTPException
+import time
+
+# Process start, for the cold-start time reported by /health
+_started = time.perf_counter()
+
+import json
+import os
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.exceptions import RequestValidationError
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from pydantic import BaseModel, ValidationError
 from typing import Optional
 
-from utils import check_vote, VoteRequest as VoteRequestModel
+from groth16 import warmup
+from utils import (
+    AdmissionController,
+    AdmissionRejected,
+    MicroBatcher,
+    VerificationPool,
+    QueueFullError,
+    VoteRequest as VoteRequestModel,
+    metrics,
+    stream,
+    wire,
+)
 from models import Album
 
-app = FastAPI()
+# Worker processes that run the Groth16 verification (see utils/pool.py)
+verification_pool: Optional[VerificationPool] = None
+# Groups single votes into shared multi-pairings (see utils/batcher.py)
+batcher: Optional[MicroBatcher] = None
+# Admission control in front of the pool (see utils/admission.py)
+admission: Optional[AdmissionController] = None
+# Seconds from process start until the app was ready, and where they went
+cold_start: dict = {}
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global verification_pool, batcher, admission
+    # Build the verifier state before the pool exists, so forked workers
+    # start with it; each worker still checks it in its initializer
+    cold_start["warmup"] = warmup()
+    metrics.install()
+    verification_pool = VerificationPool.from_env()
+    batcher = MicroBatcher.from_env(verification_pool)
+    admission = AdmissionController.from_env(verification_pool, batcher)
+    cold_start["workers"] = await verification_pool.warmup()
+    cold_start["seconds"] = time.perf_counter() - _started
+    print(f"ready in {cold_start['seconds']:.3f}s "
+          f"(warmup {sum(cold_start['warmup'].values()):.3f}s, {len(cold_start['workers'])} workers)")
+    try:
+        yield
+    finally:
+        admission.nullifiers.close()
+        verification_pool.shutdown()
+        verification_pool = None
+        batcher = None
+        admission = None
+
+
+app = FastAPI(lifespan=lifespan)
 
 # Enable CORS
 app.add_middleware(
@@ -37,6 +93,51 @@ class VoteRequest(BaseModel):
     poll_id: int
 
 
+@app.get("/health")
+async def health():
+    return {"status": "ok", "cold_start": cold_start}
+
+
+def _pool_gauge(read):
+    return lambda: read(verification_pool) if verification_pool is not None else None
+
+
+metrics.REGISTRY.register(metrics.Gauge(
+    "checkvote_queue_depth", "Verification tasks queued or running in the pool.",
+    _pool_gauge(lambda pool: pool.pending)))
+metrics.REGISTRY.register(metrics.Gauge(
+    "checkvote_queue_votes", "Votes in the queued or running verification tasks.",
+    _pool_gauge(lambda pool: pool.pending_votes)))
+metrics.REGISTRY.register(metrics.Gauge(
+    "checkvote_pool_workers", "Worker processes in the verification pool.",
+    _pool_gauge(lambda pool: pool.workers)))
+metrics.REGISTRY.register(metrics.Gauge(
+    "checkvote_pool_utilization", "Fraction of the pool workers busy right now.",
+    _pool_gauge(lambda pool: min(pool.pending, pool.workers) / pool.workers)))
+metrics.REGISTRY.register(metrics.Gauge(
+    "checkvote_vote_seconds", "Moving average of worker time per vote.",
+    _pool_gauge(lambda pool: pool.vote_seconds)))
+metrics.REGISTRY.register(metrics.Gauge(
+    "checkvote_cold_start_seconds", "Seconds from process start until the app was ready.",
+    lambda: cold_start.get("seconds")))
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics_endpoint():
+    return PlainTextResponse(metrics.REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+
+def _failure_outcome(e: Exception) -> str:
+    """The checkvote_votes_total outcome of a vote that failed after its precheck."""
+    if isinstance(e, AdmissionRejected):
+        return "duplicate" if e.status_code == 409 else "throttled"
+    if isinstance(e, QueueFullError):
+        return "throttled"
+    if isinstance(e, ValueError):
+        return "rejected"
+    return "error"
+
+
 @app.get("/albums")
 async def get_albums():
     return albums
@@ -56,34 +157,226 @@ async def post_albums(album: Album):
     return album
 
 
-@app.post("/checkvote")
-async def checkvote_endpoint(vote_request: VoteRequest):
+def _to_vote_model(vote_request: VoteRequest) -> VoteRequestModel:
+    return VoteRequestModel(
+        seal=vote_request.seal,
+        journal=vote_request.journal,
+        journal_abi=vote_request.journal_abi,
+        image_id=vote_request.image_id,
+        nullifier=vote_request.nullifier,
+        age=vote_request.age,
+        is_student=vote_request.is_student,
+        poll_id=vote_request.poll_id,
+    )
+
+
+def _vote_result_dict(result) -> dict:
+    # Convert dataclass to dict for JSON serialization
+    return {
+        "nullifier": result.nullifier,
+        "age": result.age,
+        "is_student": result.is_student,
+        "poll_id": result.poll_id,
+    }
+
+
+async def _read_vote(request: Request):
+    """The vote in a /checkvote body: hex JSON, or one binary frame (utils/wire.py)."""
+    body = await request.body()
+    if wire.is_binary(request.headers.get("content-type", "")):
+        try:
+            return wire.decode_vote(body)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    try:
+        return _to_vote_model(VoteRequest.model_validate_json(body))
+    except ValidationError as e:
+        raise RequestValidationError([{**err, "loc": ("body", *err["loc"])} for err in e.errors()])
+
+
+# Both request bodies accepted by /checkvote, for the OpenAPI schema
+_VOTE_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "application/json": {"schema": VoteRequest.model_json_schema()},
+            wire.CONTENT_TYPE: {"schema": {"type": "string", "format": "binary"}},
+        },
+    },
+}
+
+
+@app.post("/checkvote", openapi_extra=_VOTE_BODY)
+async def checkvote_endpoint(request: Request):
+    try:
+        vote = await _read_vote(request)
+    except (HTTPException, RequestValidationError):
+        metrics.count_vote(None, "malformed")
+        raise
     try:
-        vote_model = VoteRequestModel(
-            seal=vote_request.seal,
-            journal=vote_request.journal,
-            journal_abi=vote_request.journal_abi,
-            image_id=vote_request.image_id,
-            nullifier=vote_request.nullifier,
-            age=vote_request.age,
-            is_student=vote_request.is_student,
-            poll_id=vote_request.poll_id,
-        )
-        result = check_vote(vote_model)
-        # Convert dataclass to dict for JSON serialization
-        result_dict = {
-            "nullifier": result.nullifier,
-            "age": result.age,
-            "is_student": result.is_student,
-            "poll_id": result.poll_id,
-        }
-        return {"status": "success", "result": result_dict}
+        admission.precheck(vote)
+    except AdmissionRejected as e:
+        metrics.count_vote(vote, _failure_outcome(e))
+        raise HTTPException(status_code=e.status_code, detail=e.detail, headers=e.headers)
+    except ValueError as e:
+        # Malformed vote: rejected without queueing a verification
+        metrics.count_vote(vote, "malformed")
+        raise HTTPException(status_code=400, detail=str(e))
+    try:
+        admission.admit()
+        result = await batcher.check_vote(vote)
+        admission.accept(result)
     except Exception as e:
+        metrics.count_vote(vote, _failure_outcome(e))
+        if isinstance(e, AdmissionRejected):
+            raise HTTPException(status_code=e.status_code, detail=e.detail, headers=e.headers)
+        if isinstance(e, QueueFullError):
+            raise HTTPException(status_code=503, detail=str(e))
         raise HTTPException(status_code=500, detail=str(e))
+    metrics.count_vote(vote, "accepted")
+    return {"status": "success", "result": _vote_result_dict(result)}
+
+
+# Maximum number of votes accepted by one /checkvote/batch request
+MAX_BATCH_VOTES = int(os.environ.get("CHECKVOTE_MAX_BATCH", "10000"))
+
+
+def _parse_batch_body(body: bytes, content_type: str) -> list:
+    """Parse a JSON array, NDJSON (one vote object per line) or binary frames into vote items."""
+    if wire.is_binary(content_type):
+        return wire.decode_votes(body)
+    if content_type.split(";")[0].strip() in ("application/x-ndjson", "application/ndjson"):
+        return [json.loads(line) for line in body.splitlines() if line.strip()]
+    items = json.loads(body)
+    if not isinstance(items, list):
+        raise ValueError("expected a JSON array of vote requests")
+    return items
+
+
+@app.post("/checkvote/batch")
+async def checkvote_batch_endpoint(request: Request):
+    """Verify many votes in one request; per-vote results are returned in input order."""
+    try:
+        items = _parse_batch_body(await request.body(), request.headers.get("content-type", ""))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"invalid batch body: {e}")
+    if len(items) > MAX_BATCH_VOTES:
+        raise HTTPException(status_code=413, detail=f"batch too large: {len(items)} > {MAX_BATCH_VOTES}")
+
+    results = [None] * len(items)
+    votes = []
+    vote_index = []
+    for i, item in enumerate(items):
+        vote = item
+        try:
+            vote = item if isinstance(item, wire.BinaryVote) else _to_vote_model(VoteRequest.model_validate(item))
+            admission.precheck(vote)
+            votes.append(vote)
+            vote_index.append(i)
+        except (ValidationError, ValueError, AdmissionRejected) as e:
+            metrics.count_vote(vote, "duplicate" if isinstance(e, AdmissionRejected) else "malformed")
+            results[i] = {"status": "error", "detail": str(e)}
+
+    try:
+        admission.admit(len(votes))
+        checked = await verification_pool.check_votes(votes)
+    except (AdmissionRejected, QueueFullError) as e:
+        for vote in votes:
+            metrics.count_vote(vote, "throttled")
+        if isinstance(e, AdmissionRejected):
+            raise HTTPException(status_code=e.status_code, detail=e.detail, headers=e.headers)
+        raise HTTPException(status_code=503, detail=str(e))
+    for i, vote, result in zip(vote_index, votes, checked):
+        try:
+            if isinstance(result, Exception):
+                raise result
+            admission.accept(result)
+            metrics.count_vote(vote, "accepted")
+            results[i] = {"status": "success", "result": _vote_result_dict(result)}
+        except (ValueError, AdmissionRejected) as e:
+            metrics.count_vote(vote, _failure_outcome(e))
+            results[i] = {"status": "error", "detail": str(e)}
+    return {"status": "success", "results": results}
+
+
+# Votes of one /checkvote/stream request between being read and their result being sent
+STREAM_MAX_IN_FLIGHT = int(os.environ.get("CHECKVOTE_STREAM_IN_FLIGHT", "64"))
+# Longest NDJSON line accepted by /checkvote/stream
+STREAM_MAX_LINE = int(os.environ.get("CHECKVOTE_STREAM_MAX_LINE", str(1 << 20)))
+# Longest a /checkvote/stream waits for pool room before a vote is answered as throttled
+STREAM_ADMIT_WAIT = float(os.environ.get("CHECKVOTE_STREAM_ADMIT_WAIT", "30"))
+
+
+class _DuplexStreamingResponse(StreamingResponse):
+    """A StreamingResponse sent while the request body is still being read.
+
+    StreamingResponse listens for the client disconnect on receive(), which
+    would take the body chunks away from request.stream(); here a disconnect
+    surfaces through request.stream() instead.
+    """
+    async def __call__(self, scope, receive, send) -> None:
+        await self.stream_response(send)
+
+
+async def _check_stream_line(line: bytes) -> dict:
+    """Verify one NDJSON vote of a stream; errors become the line's result."""
+    vote = None
+    try:
+        vote = _to_vote_model(VoteRequest.model_validate_json(line))
+        admission.precheck(vote)
+    except Exception as e:
+        metrics.count_vote(vote, "duplicate" if isinstance(e, AdmissionRejected) else "malformed")
+        return {"status": "error", "detail": str(e)}
+    try:
+        admission.admit()
+        result = await batcher.check_vote(vote)
+        admission.accept(result)
+    except Exception as e:
+        # Refused or invalid: reported on the vote's line
+        metrics.count_vote(vote, _failure_outcome(e))
+        if isinstance(e, QueueFullError):
+            e = AdmissionRejected(503, str(e), retry_after=verification_pool.expected_wait())
+        if isinstance(e, AdmissionRejected) and e.retry_after is not None:
+            # The 429/503 of /checkvote, with its Retry-After as a field
+            return {"status": "error", "status_code": e.status_code, "detail": e.detail,
+                    "retry_after": int(e.headers["Retry-After"])}
+        return {"status": "error", "detail": str(e)}
+    metrics.count_vote(vote, "accepted")
+    return {"status": "success", "result": _vote_result_dict(result)}
+
+
+async def _wait_for_stream_room() -> None:
+    # Backpressure: the stream's body is not read further while the pool is full
+    await admission.wait_for_room(timeout=STREAM_ADMIT_WAIT)
+
+
+@app.post("/checkvote/stream")
+async def checkvote_stream_endpoint(request: Request, order: str = "input"):
+    """Verify an NDJSON stream of votes, answering with one NDJSON result per vote.
+
+    Each result carries the input line's index; order=completion sends results
+    as they finish instead of in input order. While the pool has no room, the
+    body is not read; a vote still refused after STREAM_ADMIT_WAIT seconds is
+    answered with the status_code and retry_after of a 429 or 503.
+    """
+    if order not in stream.ORDERS:
+        raise HTTPException(status_code=400, detail=f"order must be one of {', '.join(stream.ORDERS)}")
+    results = stream.verify_stream(
+        stream.iter_lines(request.stream(), STREAM_MAX_LINE),
+        _check_stream_line,
+        STREAM_MAX_IN_FLIGHT,
+        order,
+        ready=_wait_for_stream_room,
+    )
+
+    async def body():
+        async for result in results:
+            yield json.dumps(result) + "\n"
+
+    return _DuplexStreamingResponse(body(), media_type="application/x-ndjson")
 
 
 # Mount static files (pointing to parent directory's web folder)
-import os
 web_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "web")
 if os.path.exists(web_path):
     app.mount("/web", StaticFiles(directory=web_path), name="web")
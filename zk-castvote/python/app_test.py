@@ -0,0 +1,143 @@
+import itertools
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app as app_module
+from benchmarks.fixtures import JOURNAL, SEAL, vote_body
+from utils import wire
+from utils.util import VoteRequest
+
+_nullifiers = itertools.count()
+
+
+def _vote(valid: bool = True, nullifier: str = "") -> dict:
+    """A /checkvote body with a nullifier no other test uses."""
+    nullifier = nullifier or f"app-test-{next(_nullifiers)}"
+    journal = JOURNAL if valid else JOURNAL[:-1] + bytes([JOURNAL[-1] ^ 1])
+    return vote_body(SEAL, journal=journal, nullifier=nullifier)
+
+
+@pytest.fixture(scope="module")
+def client():
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv("CHECKVOTE_WORKERS", "1")
+        mp.setenv("CHECKVOTE_CACHE_SIZE", "0")
+        with TestClient(app_module.app) as client:
+            yield client
+
+
+def _results(response):
+    assert response.status_code == 200, response.text
+    return response.json()["results"]
+
+
+def test_batch_json_array_in_request_order(client):
+    votes = [_vote(), _vote(valid=False), dict(_vote(), seal="zz"), _vote()]
+    results = _results(client.post("/checkvote/batch", json=votes))
+    assert [r["status"] for r in results] == ["success", "error", "error", "success"]
+    assert results[0]["result"]["nullifier"] == votes[0]["nullifier"]
+    assert results[3]["result"]["nullifier"] == votes[3]["nullifier"]
+    assert results[1]["detail"].startswith("Verification failed")
+    assert "Failed to decode seal" in results[2]["detail"]
+
+
+def test_batch_ndjson(client):
+    votes = [_vote(), _vote()]
+    body = "\n".join(json.dumps(v) for v in votes) + "\n\n"
+    results = _results(client.post("/checkvote/batch", content=body, headers={"content-type": "application/x-ndjson"}))
+    assert [r["result"]["nullifier"] for r in results] == [v["nullifier"] for v in votes]
+
+
+def test_batch_duplicate_nullifier(client):
+    vote = _vote()
+    results = _results(client.post("/checkvote/batch", json=[vote, vote]))
+    assert [r["status"] for r in results] == ["success", "error"]
+    assert "already accepted" in results[1]["detail"]
+    # and in a later batch, before any verification
+    results = _results(client.post("/checkvote/batch", json=[vote]))
+    assert "already accepted" in results[0]["detail"]
+
+
+@pytest.mark.parametrize("body, content_type", [
+    (b"{not json", "application/json"),
+    (b'{"seal": "00"}', "application/json"),
+    (b"{}\nnot json\n", "application/x-ndjson"),
+])
+def test_batch_invalid_body(client, body, content_type):
+    response = client.post("/checkvote/batch", content=body, headers={"content-type": content_type})
+    assert response.status_code == 400
+    assert response.json()["detail"].startswith("invalid batch body")
+
+
+def test_batch_too_large(client, monkeypatch):
+    monkeypatch.setattr(app_module, "MAX_BATCH_VOTES", 2)
+    response = client.post("/checkvote/batch", json=[_vote(), _vote(), _vote()])
+    assert response.status_code == 413
+
+
+def _frame(vote: dict) -> bytes:
+    return wire.encode_vote(VoteRequest(**vote))
+
+
+def test_checkvote_binary_frame(client):
+    vote = _vote()
+    headers = {"content-type": wire.CONTENT_TYPE}
+    response = client.post("/checkvote", content=_frame(vote), headers=headers)
+    assert response.status_code == 200, response.text
+    assert response.json()["result"]["nullifier"] == vote["nullifier"]
+
+    response = client.post("/checkvote", content=_frame(_vote())[:-1], headers=headers)
+    assert response.status_code == 400
+    assert response.json()["detail"].startswith("invalid vote frame")
+
+
+def test_batch_binary_frames(client):
+    votes = [_vote(), _vote(valid=False), _vote()]
+    body = b"".join(_frame(v) for v in votes)
+    results = _results(client.post("/checkvote/batch", content=body, headers={"content-type": wire.CONTENT_TYPE}))
+    assert [r["status"] for r in results] == ["success", "error", "success"]
+    assert results[2]["result"]["nullifier"] == votes[2]["nullifier"]
+
+    response = client.post("/checkvote/batch", content=body[:-1], headers={"content-type": wire.CONTENT_TYPE})
+    assert response.status_code == 400
+    assert "invalid vote frame 2" in response.json()["detail"]
+
+
+@pytest.mark.parametrize("order", ["input", "completion"])
+def test_checkvote_stream(client, order):
+    votes = [_vote(), _vote(valid=False), _vote()]
+    lines = [json.dumps(v) for v in votes]
+    lines.insert(2, "not json")
+    body = "\n".join(lines) + "\n"
+    response = client.post(f"/checkvote/stream?order={order}", content=body,
+                           headers={"content-type": "application/x-ndjson"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    results = [json.loads(line) for line in response.text.splitlines()]
+    if order == "input":
+        assert [r["index"] for r in results] == [0, 1, 2, 3]
+    by_index = {r["index"]: r for r in results}
+    assert sorted(by_index) == [0, 1, 2, 3]
+    assert [by_index[i]["status"] for i in range(4)] == ["success", "error", "error", "success"]
+    assert by_index[0]["result"]["nullifier"] == votes[0]["nullifier"]
+    assert by_index[1]["detail"].startswith("Verification failed")
+    assert by_index[3]["result"]["nullifier"] == votes[2]["nullifier"]
+
+
+def test_checkvote_stream_rejects_unknown_order(client):
+    response = client.post("/checkvote/stream?order=random", content=b"")
+    assert response.status_code == 400
+
+
+def test_checkvote_stream_throttled(client, monkeypatch):
+    # Every vote is over the expected-wait limit: it is answered as a 429 once the wait runs out
+    monkeypatch.setattr(app_module.admission, "max_wait", -1.0)
+    monkeypatch.setattr(app_module, "STREAM_ADMIT_WAIT", 0.05)
+    body = "\n".join(json.dumps(_vote()) for _ in range(2)) + "\n"
+    response = client.post("/checkvote/stream", content=body, headers={"content-type": "application/x-ndjson"})
+    assert response.status_code == 200
+    results = [json.loads(line) for line in response.text.splitlines()]
+    assert [(r["status"], r["status_code"]) for r in results] == [("error", 429), ("error", 429)]
+    assert all(r["retry_after"] >= 1 for r in results)
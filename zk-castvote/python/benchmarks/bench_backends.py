@@ -0,0 +1,56 @@
+"""Time of the curve backends' operations: py_ecc reference vs plain ints.
+
+Run from the python/ directory:
+
+    python -m benchmarks.bench_backends [rounds]
+"""
+import sys
+import time
+
+from groth16.backends import set_backend
+from groth16.parameters import get_control_vk_x, get_verifier_parameters2
+from groth16.seal import decode_seal
+from groth16.verifier import verify_integrity
+from groth16.vk import _vk, get_prepared_vk
+from .fixtures import CLAIM_DIGEST, SEAL
+
+
+def _time(fn, rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    return (time.perf_counter() - start) / rounds
+
+
+def _measure(name: str, rounds: int) -> dict:
+    backend = set_backend(name)
+    proof = decode_seal(SEAL[4:])
+    params = get_verifier_parameters2(SEAL[:4])
+    k = 2**253 + 12345
+    start = time.perf_counter()
+    pvk = get_prepared_vk()
+    prepare = time.perf_counter() - start
+    get_control_vk_x(params)
+    pairs = [(proof.A, proof.B), (backend.g1_neg(_vk.IC[0]), pvk.gamma), (backend.g1_neg(proof.C), pvk.delta)]
+    return {
+        "decode_seal": _time(lambda: decode_seal(SEAL[4:]), rounds),
+        "g1_mul": _time(lambda: backend.g1_mul(_vk.Alpha, k), rounds),
+        "prepare_g2": _time(lambda: backend.prepare_g2(proof.B), rounds),
+        "multi_pairing (3 pairs)": _time(lambda: backend.multi_pairing(pairs), rounds),
+        "verify_integrity": _time(lambda: verify_integrity(params, SEAL[4:], CLAIM_DIGEST), rounds),
+        "prepared vk (one-off)": prepare,
+    }
+
+
+def main() -> None:
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 1
+    results = {name: _measure(name, rounds) for name in ("py_ecc", "fast")}
+
+    print(f"{'':26} {'py_ecc':>12} {'fast':>12}")
+    for op in results["py_ecc"]:
+        ref, fast = results["py_ecc"][op], results["fast"][op]
+        print(f"{op:26} {ref * 1000:9.2f} ms {fast * 1000:9.2f} ms ({ref / fast:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+"""Time per proof: verify_integrity one at a time vs verify_batch.
+
+Run from the python/ directory:
+
+    python -m benchmarks.bench_batch [batch_size]
+"""
+import sys
+import time
+
+from groth16.batch import verify_batch
+from groth16.parameters import get_verifier_parameters2
+from groth16.verifier import verify_integrity
+from groth16.vk import get_prepared_vk
+from .fixtures import CLAIM_DIGEST, SEAL
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    params = get_verifier_parameters2(SEAL[:4])
+    items = [(params, SEAL[4:], CLAIM_DIGEST)] * n
+    get_prepared_vk()
+
+    start = time.perf_counter()
+    for item in items:
+        verify_integrity(*item)
+    single = (time.perf_counter() - start) / n
+
+    start = time.perf_counter()
+    assert verify_batch(items) == [None] * n
+    batch = (time.perf_counter() - start) / n
+
+    print(f"verify_integrity x{n}: {single * 1000:10.1f} ms/proof")
+    print(f"verify_batch({n}):     {batch * 1000:10.1f} ms/proof ({single / batch:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
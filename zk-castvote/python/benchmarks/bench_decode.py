@@ -0,0 +1,57 @@
+"""Seal decoding throughput: the previous FQ-object parse vs decode_seal.
+
+Run from the python/ directory:
+
+    python -m benchmarks.bench_decode [rounds]
+"""
+import sys
+import time
+
+from py_ecc.bn128 import FQ, FQ2
+from py_ecc.bn128.bn128_curve import b, b2, is_on_curve
+
+from groth16.backends import set_backend
+from groth16.backends.fast import g2_in_subgroup
+from groth16.seal import decode_seal
+from .fixtures import SEAL
+
+
+def fq_decode(seal: bytes):
+    """The previous parse: a bytes slice and an FQ object per coordinate, curve checks only."""
+    a = (FQ(int.from_bytes(seal[0:32], 'big')), FQ(int.from_bytes(seal[32:64], 'big')))
+    b_point = (
+        FQ2([int.from_bytes(seal[96:128], 'big'), int.from_bytes(seal[64:96], 'big')]),
+        FQ2([int.from_bytes(seal[160:192], 'big'), int.from_bytes(seal[128:160], 'big')]),
+    )
+    c = (FQ(int.from_bytes(seal[192:224], 'big')), FQ(int.from_bytes(seal[224:256], 'big')))
+    if not (is_on_curve(a, b) and is_on_curve(c, b) and is_on_curve(b_point, b2)):
+        raise ValueError("point is not on curve")
+    return a, b_point, c
+
+
+def _rate(fn, rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    return rounds / (time.perf_counter() - start)
+
+
+def main() -> None:
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    set_backend("fast")
+    seal_bytes = bytes(SEAL)
+    view = memoryview(seal_bytes)[4:]
+    proof = decode_seal(view)
+
+    results = {
+        "previous (FQ objects, no subgroup check)": _rate(lambda: fq_decode(seal_bytes[4:]), rounds),
+        "decode_seal (bytes slice)": _rate(lambda: decode_seal(seal_bytes[4:]), rounds),
+        "decode_seal (memoryview)": _rate(lambda: decode_seal(view), rounds),
+        "  of which G2 subgroup check": _rate(lambda: g2_in_subgroup(proof.B), rounds),
+    }
+    for name, rate in results.items():
+        print(f"{name:42} {rate:10.0f} decodes/s  {1e6 / rate:8.1f} us")
+
+
+if __name__ == "__main__":
+    main()
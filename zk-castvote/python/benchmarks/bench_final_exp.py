@@ -0,0 +1,73 @@
+"""The final exponentiation on its own: py_ecc, the fast backend's previous
+generic exponentiation, and the easy part + BN x-chain hard part with
+Granger-Scott cyclotomic squarings. It is a fixed cost per verification,
+whatever the batching.
+
+Run from the python/ directory:
+
+    python -m benchmarks.bench_final_exp [rounds]
+"""
+import sys
+import time
+
+from py_ecc.bn128 import FQ12, final_exponentiate as py_ecc_final_exponentiate
+
+from groth16.backends import fast
+from groth16.backends.fast import (
+    HARD_EXPONENT,
+    _cyclotomic_sqr,
+    _f12_mul,
+    _f12_sqr,
+    final_exponentiate,
+    final_exponentiate_easy,
+    final_exponentiate_hard,
+    to_flat,
+)
+from groth16.vk import _vk
+
+
+def generic_hard(f):
+    """The previous hard part: f^HARD_EXPONENT with a fixed 4-bit window."""
+    table = [fast.FP12_ONE, f]
+    for _ in range(14):
+        table.append(_f12_mul(table[-1], f))
+    result = fast.FP12_ONE
+    for shift in range((HARD_EXPONENT.bit_length() + 3) // 4 * 4 - 4, -1, -4):
+        for _ in range(4):
+            result = _f12_sqr(result)
+        d = (HARD_EXPONENT >> shift) & 15
+        if d:
+            result = _f12_mul(result, table[d])
+    return result
+
+
+def _time(fn, rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    return (time.perf_counter() - start) / rounds
+
+
+def main() -> None:
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    # A Miller-loop value of the kind verification produces
+    f = fast.miller_loop([(_vk.Alpha, fast.prepare_g2(_vk.Beta)), (_vk.IC[0], fast.prepare_g2(_vk.Gamma))])
+    easy = final_exponentiate_easy(f)
+    assert generic_hard(easy) == final_exponentiate_hard(easy)
+    flat = FQ12(list(to_flat(f)))
+
+    results = {
+        "py_ecc final_exponentiate": _time(lambda: py_ecc_final_exponentiate(flat), max(1, rounds // 10)),
+        "easy part + generic hard part": _time(lambda: generic_hard(final_exponentiate_easy(f)), rounds),
+        "final_exponentiate": _time(lambda: final_exponentiate(f), rounds),
+        "  easy part": _time(lambda: final_exponentiate_easy(f), rounds),
+        "  hard part (x-chain)": _time(lambda: final_exponentiate_hard(easy), rounds),
+        "Fp12 squaring": _time(lambda: _f12_sqr(easy), rounds * 100),
+        "cyclotomic squaring": _time(lambda: _cyclotomic_sqr(easy), rounds * 100),
+    }
+    for name, seconds in results.items():
+        print(f"{name:32} {seconds * 1e3:10.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Time per Groth16 verification on the py_ecc reference backend: four
+separate pairings vs one multi-pairing, without and with prepared lines for
+the verifying key's G2 points and the cached e(Alpha, Beta).
+
+Run from the python/ directory:
+
+    python -m benchmarks.bench_pairing [rounds]
+"""
+import sys
+import time
+
+from py_ecc.bn128.bn128_curve import add, multiply, neg
+from py_ecc.bn128.bn128_pairing import pairing
+
+from groth16.backends import load_backend
+from groth16.backends.reference import to_py_ecc_g1, to_py_ecc_g2
+from groth16.pairing import multi_pairing, pairing_check
+from groth16.parameters import get_verifier_parameters2
+from groth16.seal import decode_seal
+from groth16.utils import split_digest, reverse_byte_order_uint256
+from groth16.verifier import verify_integrity
+from groth16.vk import PreparedVerifyingKey, _vk
+from .fixtures import CLAIM_DIGEST, SEAL
+
+
+def _pairs():
+    params = get_verifier_parameters2(SEAL[:4])
+    proof = decode_seal(SEAL[4:])
+    control0, control1 = split_digest(params.control_root)
+    claim0, claim1 = split_digest(CLAIM_DIGEST)
+    inputs = [
+        int.from_bytes(control0, 'big'),
+        int.from_bytes(control1, 'big'),
+        int.from_bytes(claim0, 'big'),
+        int.from_bytes(claim1, 'big'),
+        int.from_bytes(reverse_byte_order_uint256(params.bn254_control_id), 'big'),
+    ]
+    g1, g2 = to_py_ecc_g1, to_py_ecc_g2
+    vk_x = g1(_vk.IC[0])
+    for i, s in enumerate(inputs):
+        vk_x = add(vk_x, multiply(g1(_vk.IC[i + 1]), s))
+    return [
+        (g1(proof.A), g2(proof.B)),
+        (neg(g1(_vk.Alpha)), g2(_vk.Beta)),
+        (neg(vk_x), g2(_vk.Gamma)),
+        (neg(g1(proof.C)), g2(_vk.Delta)),
+    ]
+
+
+def separate_pairings(pairs) -> bool:
+    """The previous verify_groth16 pairing step: one final exponentiation per pair."""
+    result = pairing(pairs[0][1], pairs[0][0])
+    for p, q in pairs[1:]:
+        result = result * pairing(q, p)
+    return result == result.one()
+
+
+def _time(fn, rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    return (time.perf_counter() - start) / rounds
+
+
+def main() -> None:
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 1
+    pairs = _pairs()
+    assert separate_pairings(pairs) and pairing_check(pairs)
+
+    before = _time(lambda: separate_pairings(pairs), rounds)
+    after = _time(lambda: pairing_check(pairs), rounds)
+    start = time.perf_counter()
+    pvk = PreparedVerifyingKey.from_vk(_vk, load_backend("py_ecc"))
+    prepare = time.perf_counter() - start
+    prepared_pairs = [pairs[0]] + [(p, q) for (p, _), q in zip(pairs[1:], (pvk.beta, pvk.gamma, pvk.delta))]
+    with_lines = _time(lambda: pairing_check(prepared_pairs), rounds)
+    without_alpha_beta = [prepared_pairs[0]] + prepared_pairs[2:]
+    with_gt = _time(lambda: multi_pairing(without_alpha_beta) == pvk.alpha_beta, rounds)
+    params = get_verifier_parameters2(SEAL[:4])
+    end_to_end = _time(lambda: verify_integrity(params, SEAL[4:], CLAIM_DIGEST), rounds)
+
+    print(f"4x pairing():          {before * 1000:10.1f} ms/verification")
+    print(f"pairing_check():       {after * 1000:10.1f} ms/verification ({before / after:.2f}x)")
+    print(f"  + prepared vk lines: {with_lines * 1000:10.1f} ms/verification ({before / with_lines:.2f}x)")
+    print(f"  + cached e(Alpha, Beta): {with_gt * 1000:6.1f} ms/verification ({before / with_gt:.2f}x)")
+    print(f"  (one-off prepare:    {prepare * 1000:10.1f} ms)")
+    print(f"verify_integrity():    {end_to_end * 1000:10.1f} ms/verification (selected backend)")
+
+
+if __name__ == "__main__":
+    main()
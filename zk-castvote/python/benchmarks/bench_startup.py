@@ -0,0 +1,84 @@
+"""Cold-start cost of a verifier process: selector table, warmup and first vote.
+
+Each measurement runs in a fresh interpreter. Run from the python/ directory:
+
+    python -m benchmarks.bench_startup [rounds]
+"""
+import json
+import subprocess
+import sys
+
+_PREVIOUS_INIT = """
+from groth16.parameters import vk_digest
+from groth16.utils import sha256, sha256_bytes
+from risc0.risc0 import get_verifier_parameters
+
+def calculate_selector(params):
+    data = bytearray(130)
+    data[0:32] = sha256_bytes(b"risc0.Groth16ReceiptVerifierParameters")
+    data[32:64] = params.control_root
+    data[64:96] = params.bn254_control_id
+    data[96:128] = vk_digest
+    data[128:130] = bytes([0x03, 0x00])
+    return sha256(bytes(data))[:4]
+
+start = time.perf_counter()
+table = {calculate_selector(p): p for p in get_verifier_parameters().values()}
+result = time.perf_counter() - start
+"""
+
+CASES = {
+    # The previous lazy first-request init, for comparison with the import-time table
+    "selector table, previous lazy init": _PREVIOUS_INIT,
+    "selector table, at import": """
+start = time.perf_counter()
+from groth16.parameters import _build_selector_table
+import_time = time.perf_counter() - start
+start = time.perf_counter()
+_build_selector_table()
+result = time.perf_counter() - start
+""",
+    "import groth16": """
+start = time.perf_counter()
+import groth16
+result = time.perf_counter() - start
+""",
+    "warmup()": """
+from groth16 import warmup
+start = time.perf_counter()
+warmup()
+result = time.perf_counter() - start
+""",
+    "first vote, cold": """
+from groth16 import verify_integrity, get_verifier_parameters2
+from benchmarks.fixtures import CLAIM_DIGEST, SEAL
+start = time.perf_counter()
+verify_integrity(get_verifier_parameters2(SEAL[:4]), SEAL[4:], CLAIM_DIGEST)
+result = time.perf_counter() - start
+""",
+    "first vote, after warmup()": """
+from groth16 import verify_integrity, get_verifier_parameters2, warmup
+from benchmarks.fixtures import CLAIM_DIGEST, SEAL
+warmup()
+start = time.perf_counter()
+verify_integrity(get_verifier_parameters2(SEAL[:4]), SEAL[4:], CLAIM_DIGEST)
+result = time.perf_counter() - start
+""",
+}
+
+
+def _run(code: str) -> float:
+    script = "import json, time\n" + code + "\nprint(json.dumps(result))\n"
+    out = subprocess.run([sys.executable, "-c", script], check=True, capture_output=True, text=True).stdout
+    return json.loads(out.splitlines()[-1])
+
+
+def main() -> None:
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    for name, code in CASES.items():
+        best = min(_run(code) for _ in range(rounds))
+        print(f"{name:36} {best * 1000:9.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Time of the vk_x linear combination over vk.IC.
+
+Run from the python/ directory:
+
+    python -m benchmarks.bench_vk_x [rounds]
+"""
+import sys
+import time
+
+from py_ecc.bn128.bn128_curve import add, multiply
+
+from groth16.backends.reference import from_py_ecc_g1, to_py_ecc_g1
+from groth16.msm import fixed_base_msm, from_jacobian, to_jacobian
+from groth16.parameters import control_signals, get_control_vk_x, get_verifier_parameters2
+from groth16.utils import split_digest
+from groth16.vk import _vk, get_prepared_vk
+from .fixtures import CLAIM_DIGEST, SEAL
+
+
+def affine_vk_x(inputs):
+    """The previous verify_groth16 loop: affine double-and-add per signal."""
+    vk_x = None
+    for i, s in enumerate(inputs):
+        vk_x = add(vk_x, multiply(to_py_ecc_g1(_vk.IC[i + 1]), s))
+    return from_py_ecc_g1(add(vk_x, to_py_ecc_g1(_vk.IC[0])))
+
+
+def _time(fn, rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    return (time.perf_counter() - start) / rounds
+
+
+def main() -> None:
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    params = get_verifier_parameters2(SEAL[:4])
+    control0, control1, control_id = control_signals(params)
+    claim0, claim1 = (int.from_bytes(h, 'big') for h in split_digest(CLAIM_DIGEST))
+    inputs = [control0, control1, claim0, claim1, control_id]
+    pvk = get_prepared_vk()
+    get_control_vk_x(params)
+
+    def full_tables():
+        return from_jacobian(fixed_base_msm(pvk.ic_tables, inputs, to_jacobian(_vk.IC[0])))
+
+    def cached_control():
+        return from_jacobian(fixed_base_msm(pvk.ic_tables[2:4], inputs[2:4], get_control_vk_x(params)))
+
+    assert affine_vk_x(inputs) == full_tables() == cached_control()
+    before = _time(lambda: affine_vk_x(inputs), rounds)
+    tables = _time(full_tables, rounds)
+    cached = _time(cached_control, rounds)
+    print(f"affine double-and-add:      {before * 1000:8.2f} ms")
+    print(f"fixed-base tables:          {tables * 1000:8.2f} ms ({before / tables:.1f}x)")
+    print(f"  + cached control signals: {cached * 1000:8.2f} ms ({before / cached:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
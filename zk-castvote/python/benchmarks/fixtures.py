@@ -0,0 +1,114 @@
+"""Vote fixtures for the benchmark suite, stored in benchmarks/votes.json.
+
+There is one real RISC Zero receipt here: SEAL, a Groth16 seal (selector
+50bd1769, RISC Zero 1.1), with the journal and image id whose claim digest
+it proves (the Go risc0 tests use the same journal). The tests and the
+other benchmarks use it too. The corpus is built around it:
+
+- valid: the receipt itself, accepted.
+- selector-<version>: the same proof under the selector of every other
+  entry of risc0.get_verifier_parameters. It decodes and runs the whole
+  verification, then fails the pairing check, so each selector's control
+  signals are exercised at full cost.
+- tampered-journal: one journal byte changed, so the claim digest no longer
+  matches; also rejected by the pairing check.
+- bad-point: the proof's A is moved off the curve; rejected by decode_seal.
+- unknown-selector: rejected at the selector lookup.
+
+Regenerate with:
+
+    python -m benchmarks.fixtures
+"""
+import json
+import os
+import struct
+from typing import List
+
+from groth16.parameters import SELECTORS
+
+PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "votes.json")
+
+# The receipt's claim digest and Groth16 seal (selector || proof)
+CLAIM_DIGEST = bytes.fromhex("9cbe0c90f193cb5e5716c6bc1a780f164ca05254b8bd50485109d9d29544ea33")
+SEAL = bytes.fromhex("50bd1769188540e643a5e4b1548e4c9391b0359afc1488d25fbfe41395e8847079f64d55148c07b36f0d2d44bfbdcdbe9fc79b48062a75dec02bbd5bfd5e3e530f8fa1520a5f1d99b7cf0bd29b0dbdb4fa65186559593e2c415f1e8ce27ab302cacc917a1db4a97e49f4d82194363c3af262c3b0bcf57fe846130012d081cc8c1fc0337d0de1958f4e4c5755815559104d7576a3bfc0f5fffdb630eace4cc76a5f3b617210692dedcde61b1e581a1700476ae51fa573e0adc0405dcef88e6b902f1364be01080d0fbc1429093d77b320405ff81037e7d1ba6e029baa155b71283e10cbee1e6f5375ed061c83c8ce7e3123774ce8debfd9e90e34c95429eda72d688594b1")
+
+IMAGE_ID = bytes.fromhex("e45b67a3c24ff3b77f87fec1533dca31524fc19f02bd433d4e6bba729a7646a7")
+JOURNAL = bytes.fromhex(
+    "a10b726700000000a1acc73eb45794fa1734f14d882e91925b6006f79d3bb2460df9d01b333d7009"
+    "0003000000000100906ed5000015150b07ff800e0000000000000000000000000000000000000000"
+    "00000000000000000000000000000000000000000005000000000000000700000000000000dca1a1"
+    "841ab2e3fa7025c1d175d2c947df760b3baa4a9a0f30f4fd05718fcfe30000000000000000000000"
+    "00000000000000000000000000000000000000000083d719e77deaca1470f6baf62a4d774303c899"
+    "db69020f9c70ee1dfc08c7ce9e000000000000000000000000000000000000000000000000000000"
+    "00000000000000000000000000000000000000000000000000000000000000000000000000000000"
+    "00000000000000000000000000000000000000000000000000000000000000000000000000000000"
+    "00000000000000000000000000000000000000000000000000000000000000000000000000000000"
+    "00000000000000000000000000014fc8f819e864fd03a5d377061e8148d6e5143679000000000000"
+    "00000000000000000000000000000000000000000000000000000000000000000000000000000000"
+    "00000000000000000000000000000000000000000000000000000000200000000000000000000000"
+    "00000000000000000000000000000000000000000200000000000000000000000000000000000000"
+    "00000000000000000000000040000000000000000000000000000000000000000000000000000000"
+    "0000000080000000000000000000000000000000000000000000000000000000000000000e494e54"
+    "454c2d53412d30303333340000000000000000000000000000000000000000000000000000000000"
+    "00000000000000000000000000000000000000000e494e54454c2d53412d30303631350000000000"
+    "00000000000000000000000000"
+)
+
+
+def journal_abi(nullifier: str, age: int = 30, is_student: bool = True, poll_id: int = 7) -> bytes:
+    """The bincode journal ABI the server reads the vote result from."""
+    encoded = nullifier.encode()
+    return struct.pack('<Q', len(encoded)) + encoded + struct.pack('<IBQ', age, int(is_student), poll_id)
+
+
+def vote_body(seal: bytes, journal: bytes = JOURNAL, nullifier: str = "bench", image_id: bytes = IMAGE_ID) -> dict:
+    """A /checkvote JSON body."""
+    return {
+        "seal": seal.hex(),
+        "journal": journal.hex(),
+        "journal_abi": journal_abi(nullifier).hex(),
+        "image_id": image_id.hex(),
+        "nullifier": nullifier,
+        "age": 30,
+        "is_student": True,
+        "poll_id": 7,
+    }
+
+
+def _fixture(name: str, expect: str, seal: bytes, **kwargs) -> dict:
+    entry = SELECTORS.get(seal[:4])
+    return {
+        "name": name,
+        "expect": expect,
+        "selector": seal[:4].hex(),
+        "version": ", ".join(entry.versions) if entry is not None else None,
+        "vote": vote_body(seal, **kwargs),
+    }
+
+
+def build() -> List[dict]:
+    valid_selector = SEAL[:4]
+    fixtures = [_fixture("valid", "accepted", SEAL)]
+    for selector, entry in SELECTORS.items():
+        if selector != valid_selector:
+            fixtures.append(_fixture(f"selector-{entry.versions[0]}", "rejected", selector + SEAL[4:]))
+    tampered = bytearray(JOURNAL)
+    tampered[-1] ^= 1
+    fixtures.append(_fixture("tampered-journal", "rejected", SEAL, journal=bytes(tampered)))
+    bad_a = bytearray(SEAL)
+    bad_a[4 + 63] ^= 1
+    fixtures.append(_fixture("bad-point", "rejected", bytes(bad_a)))
+    fixtures.append(_fixture("unknown-selector", "rejected", bytes.fromhex("deadbeef") + SEAL[4:]))
+    return fixtures
+
+
+def load(path: str = PATH) -> List[dict]:
+    with open(path) as f:
+        return json.load(f)
+
+
+if __name__ == "__main__":
+    with open(PATH, "w") as f:
+        json.dump(build(), f, indent=1)
+        f.write("\n")
+    print(f"wrote {PATH}")
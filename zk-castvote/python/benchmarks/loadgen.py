@@ -0,0 +1,293 @@
+"""Load generator for /checkvote: replays the vote fixtures against a local server.
+
+It starts `uvicorn app:app` itself with the verification cache disabled,
+because the corpus repeats the same proofs. Each request carries a fresh
+nullifier, so accepted votes are not refused as replays. Two modes:
+
+- open: requests are sent at --rate per second (evenly spaced, or with
+  Poisson arrivals), whether or not earlier ones have been answered. The
+  latency of a request counts from when it was due, so a server that falls
+  behind shows its whole queueing delay instead of slowing the generator
+  down (no coordinated omission).
+- closed: --concurrency clients each send their next request as soon as
+  their previous one is answered; latency counts from the actual send.
+
+Run from the python/ directory:
+
+    python -m benchmarks.loadgen open --rate 40 --duration 30
+    python -m benchmarks.loadgen closed --concurrency 8 --duration 30 --workers 2
+
+It reports throughput, latency percentiles, the outcome of every request
+against what its fixture expects, and the server's CPU use over time
+(Linux only). The generator and the server share the machine, so leave it
+cores to run on. --output also writes the report as JSON.
+"""
+import argparse
+import asyncio
+import datetime
+import itertools
+import json
+import math
+import random
+import sys
+from collections import Counter
+from typing import Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+import httpx
+
+from . import fixtures
+from .server import local_server
+from .suite import machine_info
+
+# Outcomes a fixture may end in without counting as an error
+EXPECTED_OUTCOMES = {
+    "accepted": {"accepted"},
+    "rejected": {"rejected", "malformed"},
+}
+
+
+class Sample(NamedTuple):
+    fixture: str
+    # Seconds from the start of the run until the request was due, and until it was answered
+    due: float
+    done: float
+    outcome: str
+    status: Optional[int]
+
+    @property
+    def latency(self) -> float:
+        return self.done - self.due
+
+
+def requests(corpus: Sequence[dict], names: Optional[Sequence[str]] = None) -> Iterator[Tuple[str, dict]]:
+    """(fixture name, /checkvote body) pairs cycling through the corpus, each with its own nullifier."""
+    selected = [f for f in corpus if names is None or f["name"] in names]
+    if not selected:
+        raise ValueError(f"no fixtures named {', '.join(names)}")
+    for n, fixture in enumerate(itertools.cycle(selected)):
+        nullifier = f"load-{n}"
+        yield fixture["name"], dict(fixture["vote"], nullifier=nullifier, journal_abi=fixtures.journal_abi(nullifier).hex())
+
+
+def classify(status: int, detail: str = "") -> str:
+    """The outcome of a /checkvote response, as counted by checkvote_votes_total."""
+    if status == 200:
+        return "accepted"
+    if status in (400, 422):
+        return "malformed"
+    if status == 409:
+        return "duplicate"
+    if status in (429, 503):
+        return "throttled"
+    if status == 500 and detail.startswith("Verification failed"):
+        return "rejected"
+    return f"http {status}"
+
+
+async def _send(client: httpx.AsyncClient, name: str, body: dict, due: float, t0: float) -> Sample:
+    loop = asyncio.get_running_loop()
+    try:
+        response = await client.post("/checkvote", json=body)
+    except httpx.HTTPError as e:
+        return Sample(name, due, loop.time() - t0, type(e).__name__, None)
+    detail = ""
+    if response.status_code != 200:
+        try:
+            detail = str(response.json().get("detail", ""))
+        except ValueError:
+            pass
+    return Sample(name, due, loop.time() - t0, classify(response.status_code, detail), response.status_code)
+
+
+async def open_loop(client: httpx.AsyncClient, bodies: Iterator[Tuple[str, dict]], rate: float,
+                    duration: float, poisson: bool = False, seed: int = 0) -> List[Sample]:
+    """Send requests on a fixed schedule of `rate` per second for `duration` seconds."""
+    loop = asyncio.get_running_loop()
+    rng = random.Random(seed)
+    t0 = loop.time()
+    tasks = []
+    due = 0.0
+    while due < duration:
+        delay = t0 + due - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        name, body = next(bodies)
+        tasks.append(asyncio.ensure_future(_send(client, name, body, due, t0)))
+        due += rng.expovariate(rate) if poisson else 1 / rate
+    return list(await asyncio.gather(*tasks))
+
+
+async def closed_loop(client: httpx.AsyncClient, bodies: Iterator[Tuple[str, dict]], concurrency: int,
+                      duration: float) -> List[Sample]:
+    """Keep `concurrency` requests in flight for `duration` seconds."""
+    loop = asyncio.get_running_loop()
+    t0 = loop.time()
+    samples: List[Sample] = []
+
+    async def client_loop():
+        while loop.time() - t0 < duration:
+            name, body = next(bodies)
+            samples.append(await _send(client, name, body, loop.time() - t0, t0))
+
+    await asyncio.gather(*(client_loop() for _ in range(concurrency)))
+    return samples
+
+
+async def sample_cpu(server, interval: float, stop: asyncio.Event) -> List[Tuple[float, float]]:
+    """(seconds since start, server CPU seconds) every `interval` seconds until `stop` is set."""
+    loop = asyncio.get_running_loop()
+    t0 = loop.time()
+    readings = []
+    while True:
+        cpu = server.cpu_seconds()
+        if cpu is None:
+            return []
+        readings.append((loop.time() - t0, cpu))
+        try:
+            await asyncio.wait_for(stop.wait(), interval)
+        except asyncio.TimeoutError:
+            continue
+        readings.append((loop.time() - t0, server.cpu_seconds()))
+        return readings
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """The nearest-rank q-quantile (0 < q <= 1) of values."""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+
+
+def summarize(samples: Sequence[Sample], expected: Dict[str, str], warmup: float) -> dict:
+    """Throughput, latency and outcome counts of the requests due after the warmup.
+
+    Throughput is the requests answered per second from the end of the warmup
+    until the last answer, so a server that falls behind an open-loop rate
+    shows its real capacity instead of the rate.
+    """
+    measured = [s for s in samples if s.due >= warmup]
+    latencies = [s.latency * 1000 for s in measured]
+    errors = Counter(
+        f"{s.fixture}: {s.outcome}" for s in measured if s.outcome not in EXPECTED_OUTCOMES[expected[s.fixture]]
+    )
+    elapsed = max((s.done for s in measured), default=warmup) - warmup
+    summary = {
+        "requests": len(measured),
+        "throughput_rps": len(measured) / elapsed if elapsed > 0 else 0.0,
+        "outcomes": dict(Counter(s.outcome for s in measured)),
+        "errors": dict(errors),
+    }
+    if latencies:
+        summary["latency_ms"] = {
+            "p50": percentile(latencies, 0.50),
+            "p95": percentile(latencies, 0.95),
+            "p99": percentile(latencies, 0.99),
+            "max": max(latencies),
+            "mean": sum(latencies) / len(latencies),
+        }
+    return summary
+
+
+def timeline(samples: Sequence[Sample], cpu: Sequence[Tuple[float, float]], interval: float) -> List[dict]:
+    """Per-interval completed requests, their median latency and the server's CPU use in cores."""
+    buckets: Dict[int, List[float]] = {}
+    for s in samples:
+        buckets.setdefault(int(s.done // interval), []).append(s.latency * 1000)
+    rows = []
+    for i in range(max(buckets, default=-1) + 1):
+        latencies = buckets.get(i, [])
+        rows.append({
+            "t": (i + 1) * interval,
+            "completed": len(latencies),
+            "p50_ms": percentile(latencies, 0.5) if latencies else None,
+            "cpu_cores": None,
+        })
+    for (t_prev, cpu_prev), (t, cpu_now) in zip(cpu, cpu[1:]):
+        i = int(t_prev // interval)
+        if i < len(rows) and t > t_prev:
+            rows[i]["cpu_cores"] = (cpu_now - cpu_prev) / (t - t_prev)
+    return rows
+
+
+async def _run(args, server) -> Tuple[List[Sample], List[Tuple[float, float]]]:
+    bodies = requests(fixtures.load(args.fixtures), args.only)
+    limits = httpx.Limits(max_connections=args.concurrency if args.mode == "closed" else None)
+    total = args.warmup + args.duration
+    stop = asyncio.Event()
+    async with httpx.AsyncClient(base_url=server.url, timeout=args.timeout, limits=limits) as client:
+        cpu_task = asyncio.ensure_future(sample_cpu(server, args.interval, stop))
+        if args.mode == "open":
+            samples = await open_loop(client, bodies, args.rate, total, poisson=args.poisson, seed=args.seed)
+        else:
+            samples = await closed_loop(client, bodies, args.concurrency, total)
+        stop.set()
+        return samples, await cpu_task
+
+
+def _print_report(report: dict) -> None:
+    summary = report["summary"]
+    print(f"{summary['requests']} requests measured: {summary['throughput_rps']:.1f} req/s")
+    latency = summary.get("latency_ms")
+    if latency:
+        print("latency ms: " + "  ".join(f"{k} {latency[k]:.1f}" for k in ("p50", "p95", "p99", "max")))
+    print("outcomes: " + ", ".join(f"{k} {v}" for k, v in sorted(summary["outcomes"].items())))
+    if summary["errors"]:
+        print("errors:")
+        for key, count in sorted(summary["errors"].items()):
+            print(f"  {key}: {count}")
+    print("    t  done   p50 ms  cpu cores")
+    for row in report["timeline"]:
+        p50 = f"{row['p50_ms']:8.1f}" if row["p50_ms"] is not None else "       -"
+        cpu = f"{row['cpu_cores']:9.2f}" if row["cpu_cores"] is not None else "        -"
+        print(f"{row['t']:5.0f} {row['completed']:5d} {p50} {cpu}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.loadgen", description=__doc__.split("\n")[0])
+    parser.add_argument("mode", choices=("open", "closed"))
+    parser.add_argument("--rate", type=float, default=20.0, help="open loop: requests per second (default 20)")
+    parser.add_argument("--poisson", action="store_true", help="open loop: Poisson instead of even arrivals")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--concurrency", type=int, default=4, help="closed loop: requests in flight (default 4)")
+    parser.add_argument("--duration", type=float, default=30.0, help="measured seconds (default 30)")
+    parser.add_argument("--warmup", type=float, default=2.0, help="seconds of load before measuring (default 2)")
+    parser.add_argument("--interval", type=float, default=1.0, help="timeline resolution in seconds (default 1)")
+    parser.add_argument("--timeout", type=float, default=60.0, help="per-request timeout in seconds (default 60)")
+    parser.add_argument("--fixtures", default=fixtures.PATH)
+    parser.add_argument("--only", nargs="+", metavar="NAME", help="replay only these fixtures")
+    parser.add_argument("--workers", type=int, help="CHECKVOTE_WORKERS of the server")
+    parser.add_argument("--env", action="append", default=[], metavar="NAME=VALUE", help="more server environment")
+    parser.add_argument("--output", help="also write the report as JSON")
+    args = parser.parse_args(argv)
+
+    env = {"CHECKVOTE_CACHE_SIZE": "0"}
+    if args.workers:
+        env["CHECKVOTE_WORKERS"] = str(args.workers)
+    for item in args.env:
+        name, _, value = item.partition("=")
+        env[name] = value
+    expected = {f["name"]: f["expect"] for f in fixtures.load(args.fixtures)}
+
+    with local_server(env) as server:
+        print(f"server ready at {server.url} in {server.health.get('cold_start', {}).get('seconds', 0):.1f}s",
+              file=sys.stderr)
+        samples, cpu = asyncio.run(_run(args, server))
+
+    config = {k: v for k, v in vars(args).items() if k not in ("output", "fixtures")}
+    report = {
+        "created": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "machine": machine_info(),
+        "config": config,
+        "server_env": env,
+        "summary": summarize(samples, expected, args.warmup),
+        "timeline": timeline(samples, cpu, args.interval),
+    }
+    _print_report(report)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=1)
+            f.write("\n")
+    return 1 if report["summary"]["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from . import fixtures
+from .loadgen import Sample, classify, closed_loop, open_loop, percentile, requests, summarize, timeline
+
+
+async def _fake_app(scope, receive, send):
+    """Accepts the valid fixture's seal and rejects the rest, like /checkvote."""
+    body = b""
+    while True:
+        message = await receive()
+        body += message.get("body", b"")
+        if not message.get("more_body"):
+            break
+    vote = json.loads(body)
+    await asyncio.sleep(0.002)
+    if vote["seal"] == fixtures.SEAL.hex():
+        status, payload = 200, {"status": "success"}
+    else:
+        status, payload = 500, {"detail": "Verification failed: invalid proofs"}
+    await send({"type": "http.response.start", "status": status, "headers": [(b"content-type", b"application/json")]})
+    await send({"type": "http.response.body", "body": json.dumps(payload).encode()})
+
+
+def _client():
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=_fake_app), base_url="http://test")
+
+
+def test_requests_use_fresh_nullifiers():
+    bodies = requests(fixtures.build(), ["valid", "tampered-journal"])
+    sent = [next(bodies) for _ in range(4)]
+    assert [name for name, _ in sent] == ["valid", "tampered-journal"] * 2
+    assert len({body["journal_abi"] for _, body in sent}) == 4
+
+
+def test_open_and_closed_loops():
+    corpus = fixtures.build()
+    expected = {f["name"]: f["expect"] for f in corpus}
+
+    async def run():
+        async with _client() as client:
+            opened = await open_loop(client, requests(corpus, ["valid", "selector-1.0"]), rate=200, duration=0.1)
+            closed = await closed_loop(client, requests(corpus, ["valid"]), concurrency=3, duration=0.05)
+        return opened, closed
+
+    opened, closed = asyncio.run(run())
+    assert len(opened) == 20
+    # Due times follow the schedule, not the answers
+    assert [round(s.due, 3) for s in opened[:3]] == [0.0, 0.005, 0.01]
+    summary = summarize(opened, expected, warmup=0.0)
+    assert summary["outcomes"] == {"accepted": 10, "rejected": 10}
+    assert summary["errors"] == {}
+    assert {s.outcome for s in closed} == {"accepted"}
+
+
+def test_summary_and_timeline():
+    samples = [Sample("valid", i * 0.1, i * 0.1 + 0.05 * (i + 1), "accepted", 200) for i in range(10)]
+    samples.append(Sample("valid", 0.5, 0.6, "throttled", 503))
+    summary = summarize(samples, {"valid": "accepted"}, warmup=0.2)
+    assert summary["requests"] == 9
+    assert summary["errors"] == {"valid: throttled": 1}
+    assert summary["latency_ms"]["max"] == pytest.approx(500.0)
+    rows = timeline(samples, [(0.0, 1.0), (1.0, 1.5)], interval=1.0)
+    assert [row["completed"] for row in rows] == [8, 3]
+    assert rows[0]["cpu_cores"] == 0.5 and rows[1]["cpu_cores"] is None
+
+
+def test_percentile_and_classify():
+    assert percentile([5, 1, 4, 2, 3], 0.5) == 3
+    assert percentile(list(range(1, 101)), 0.99) == 99
+    assert [classify(s) for s in (200, 400, 409, 429, 503, 500)] == [
+        "accepted", "malformed", "duplicate", "throttled", "throttled", "http 500",
+    ]
+    assert classify(500, "Verification failed: bad") == "rejected"
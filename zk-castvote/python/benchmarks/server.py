@@ -0,0 +1,119 @@
+"""A local uvicorn instance of app.py for the HTTP benchmarks."""
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import IO, Dict, Iterator, List, Optional
+
+import httpx
+
+PYTHON_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Every vote is verified on its own: no cached outcomes, no batching of single votes
+BENCH_ENV = {
+    "CHECKVOTE_CACHE_SIZE": "0",
+    "CHECKVOTE_BATCH_MAX": "1",
+}
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@contextmanager
+def local_server(env: Optional[Dict[str, str]] = None, timeout: float = 120.0) -> Iterator["LocalServer"]:
+    """Start `uvicorn app:app` on a free port and wait until /health answers.
+
+    `env` (for instance BENCH_ENV) is added to the current environment. The server's
+    stdout is discarded; a failed startup raises RuntimeError with the tail
+    of its stderr.
+    """
+    port = free_port()
+    log = tempfile.TemporaryFile()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=PYTHON_DIR,
+        env={**os.environ, **(env or {})},
+        stdout=subprocess.DEVNULL,
+        stderr=log,
+    )
+    server = LocalServer(proc, f"http://127.0.0.1:{port}", log)
+    try:
+        server.wait_ready(timeout)
+        yield server
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
+        log.close()
+
+
+class LocalServer:
+    def __init__(self, proc: subprocess.Popen, url: str, log: IO[bytes]):
+        # proc.pid is the uvicorn process; the verification workers are its children
+        self.proc = proc
+        self.url = url
+        self.log = log
+        self.health: dict = {}
+
+    def wait_ready(self, timeout: float) -> None:
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.proc.poll() is not None:
+                self.log.seek(0)
+                raise RuntimeError(f"server exited with {self.proc.returncode}: {self.log.read().decode()[-2000:]}")
+            try:
+                self.health = httpx.get(f"{self.url}/health", timeout=1.0).json()
+                return
+            except httpx.HTTPError:
+                time.sleep(0.1)
+        raise RuntimeError(f"server not ready after {timeout:.0f}s")
+
+    def cpu_seconds(self) -> Optional[float]:
+        """User + system CPU seconds of the server and its live worker processes.
+
+        Read from /proc, so None on systems without it.
+        """
+        return process_tree_cpu_seconds(self.proc.pid)
+
+
+def _proc_stat(pid: int) -> Optional[List[str]]:
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            data = f.read()
+    except OSError:
+        return None
+    # The command name in parentheses may contain spaces
+    return data[data.rindex(")") + 2:].split()
+
+
+def process_tree_cpu_seconds(root: int) -> Optional[float]:
+    """CPU seconds of a process and all its descendants, from /proc."""
+    if not os.path.isdir("/proc"):
+        return None
+    children: Dict[int, List[int]] = {}
+    for entry in os.listdir("/proc"):
+        if entry.isdigit():
+            fields = _proc_stat(int(entry))
+            if fields is not None:
+                # fields[1] is the parent pid
+                children.setdefault(int(fields[1]), []).append(int(entry))
+    ticks = 0
+    stack = [root]
+    while stack:
+        pid = stack.pop()
+        fields = _proc_stat(pid)
+        if fields is None:
+            continue
+        # utime and stime, the 14th and 15th fields of stat
+        ticks += int(fields[11]) + int(fields[12])
+        stack.extend(children.get(pid, ()))
+    return ticks / os.sysconf("SC_CLK_TCK")
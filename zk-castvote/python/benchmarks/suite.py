@@ -0,0 +1,270 @@
+"""Benchmark suite over the vote fixtures of benchmarks/votes.json.
+
+Every fixture is timed stage by stage - calculate_claim_digest, decode_seal,
+vk_x, the pairing check, check_vote end to end - and a few of them through
+HTTP /checkvote on a local server. A stage a fixture never reaches (the
+pairing of a seal that does not decode) is skipped for it. Results go to a
+JSON file with the machine they were taken on; `compare` checks them
+against a stored baseline. Run from the python/ directory:
+
+    python -m benchmarks.suite run [--rounds N] [--output results.json] [--skip-http]
+    python -m benchmarks.suite compare benchmarks/baseline.json results.json [--threshold 0.10]
+
+compare exits with status 1 when a benchmark's median is slower than the
+baseline's by more than the threshold.
+"""
+import argparse
+import datetime
+import hashlib
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from risc0.risc0 import calculate_claim_digest
+
+from groth16 import warmup
+from groth16.backends import get_backend
+from groth16.msm import fixed_base_msm, from_jacobian
+from groth16.parameters import get_control_vk_x, get_verifier_parameters2
+from groth16.seal import decode_seal
+from groth16.utils import split_digest
+from groth16.verifier import _verify_pairing
+from groth16.vk import get_prepared_vk
+from utils.util import VoteRequest, check_vote
+
+from . import fixtures
+from .server import BENCH_ENV, PYTHON_DIR, local_server
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+# Fixtures also timed through HTTP: accepted, rejected by the pairing, rejected by decoding
+HTTP_FIXTURES = ("valid", "selector-1.0", "bad-point")
+
+
+def summarize(samples: List[float]) -> dict:
+    """Statistics of a list of durations in seconds, in milliseconds."""
+    ms = [s * 1000 for s in samples]
+    return {
+        "median_ms": statistics.median(ms),
+        "mean_ms": statistics.fmean(ms),
+        "min_ms": min(ms),
+        "max_ms": max(ms),
+        "stdev_ms": statistics.stdev(ms) if len(ms) > 1 else 0.0,
+        "rounds": len(ms),
+    }
+
+
+def _measure(fn: Callable[[], object], rounds: int) -> dict:
+    fn()
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+
+def _rejected(fn: Callable[[], object]) -> Callable[[], None]:
+    """fn, with the ValueError an invalid fixture ends in swallowed."""
+    def run():
+        try:
+            fn()
+        except ValueError:
+            pass
+    return run
+
+
+def _check_vote(vote: VoteRequest) -> str:
+    try:
+        check_vote(vote)
+        return "accepted"
+    except ValueError:
+        return "rejected"
+
+
+def stage_benchmarks(fixture: dict) -> Dict[str, Callable[[], object]]:
+    """The stages of a fixture's verification, as callables, up to the first that fails."""
+    vote = fixture["vote"]
+    image_id = bytes.fromhex(vote["image_id"])
+    journal_digest = hashlib.sha256(bytes.fromhex(vote["journal"])).digest()
+    seal = bytes.fromhex(vote["seal"])
+    stages: Dict[str, Callable[[], object]] = {
+        "claim_digest": lambda: calculate_claim_digest(image_id, journal_digest),
+    }
+    params = get_verifier_parameters2(seal[:4])
+    try:
+        proof = decode_seal(memoryview(seal)[4:])
+    except ValueError:
+        stages["decode_seal"] = _rejected(lambda: decode_seal(memoryview(seal)[4:]))
+        return stages
+    stages["decode_seal"] = lambda: decode_seal(memoryview(seal)[4:])
+    if params is None:
+        return stages
+
+    pvk = get_prepared_vk()
+    claim = [int.from_bytes(h, 'big') for h in split_digest(calculate_claim_digest(image_id, journal_digest))]
+
+    def vk_x():
+        return from_jacobian(fixed_base_msm(pvk.ic_tables[2:4], claim, get_control_vk_x(params)))
+
+    point = vk_x()
+    stages["vk_x"] = vk_x
+    stages["pairing"] = _rejected(lambda: _verify_pairing(pvk.vk, pvk, proof, point))
+    return stages
+
+
+def run_local(corpus: List[dict], rounds: int) -> Dict[str, dict]:
+    results = {}
+    for fixture in corpus:
+        name = fixture["name"]
+        vote = VoteRequest(**fixture["vote"])
+        outcome = _check_vote(vote)
+        if outcome != fixture["expect"]:
+            raise RuntimeError(f"fixture {name}: expected {fixture['expect']}, got {outcome}")
+        for stage, fn in stage_benchmarks(fixture).items():
+            results[f"{stage}/{name}"] = _measure(fn, rounds)
+        results[f"check_vote/{name}"] = _measure(lambda: _check_vote(vote), rounds)
+        print(f"  {name}: {results[f'check_vote/{name}']['median_ms']:.2f} ms check_vote", file=sys.stderr)
+    return results
+
+
+def run_http(corpus: List[dict], rounds: int) -> Dict[str, dict]:
+    import httpx
+
+    results = {}
+    by_name = {f["name"]: f for f in corpus}
+    with local_server({**BENCH_ENV, "CHECKVOTE_WORKERS": "1"}) as server, httpx.Client(base_url=server.url, timeout=60.0) as client:
+        for name in HTTP_FIXTURES:
+            fixture = by_name[name]
+            expected = 200 if fixture["expect"] == "accepted" else None
+            sent = 0
+
+            def post():
+                nonlocal sent
+                # A fresh nullifier per request, so accepted votes are not refused as replays
+                sent += 1
+                body = dict(fixture["vote"], journal_abi=fixtures.journal_abi(f"bench-{name}-{sent}").hex())
+                response = client.post("/checkvote", json=body)
+                if (response.status_code == 200) != (expected == 200):
+                    raise RuntimeError(f"fixture {name}: unexpected HTTP {response.status_code}: {response.text[:200]}")
+
+            results[f"http/{name}"] = _measure(post, rounds)
+            print(f"  {name}: {results[f'http/{name}']['median_ms']:.2f} ms over HTTP", file=sys.stderr)
+    return results
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=PYTHON_DIR, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def machine_info() -> dict:
+    return {
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "backend": get_backend().name,
+        "commit": _git_commit(),
+    }
+
+
+def run(rounds: int, http: bool = True, corpus_path: str = fixtures.PATH) -> dict:
+    # Every check_vote round must run the whole verification; the cache is
+    # configured on first use
+    os.environ["CHECKVOTE_CACHE_SIZE"] = "0"
+    corpus = fixtures.load(corpus_path)
+    warmup()
+    benchmarks = run_local(corpus, rounds)
+    if http:
+        benchmarks.update(run_http(corpus, rounds))
+    return {
+        "created": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "machine": machine_info(),
+        "rounds": rounds,
+        "benchmarks": benchmarks,
+    }
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> Tuple[List[tuple], List[str]]:
+    """Compare the medians of two run() results.
+
+    Returns (rows, missing): one (name, baseline ms, current ms, ratio,
+    status) row per benchmark in both, with status "regression", "improved"
+    or "ok" by the threshold, and the baseline benchmarks absent from current.
+    """
+    rows = []
+    before, after = baseline["benchmarks"], current["benchmarks"]
+    for name in sorted(before.keys() & after.keys()):
+        old, new = before[name]["median_ms"], after[name]["median_ms"]
+        ratio = new / old if old > 0 else float("inf")
+        if ratio > 1 + threshold:
+            status = "regression"
+        elif ratio < 1 - threshold:
+            status = "improved"
+        else:
+            status = "ok"
+        rows.append((name, old, new, ratio, status))
+    return rows, sorted(before.keys() - after.keys())
+
+
+def _compare_main(args) -> int:
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+    for key, value in baseline["machine"].items():
+        if key != "commit" and current["machine"].get(key) != value:
+            print(f"warning: machine {key} differs: {value!r} -> {current['machine'].get(key)!r}")
+    rows, missing = compare(baseline, current, args.threshold)
+    width = max((len(row[0]) for row in rows), default=10)
+    for name, old, new, ratio, status in rows:
+        flag = "" if status == "ok" else f"  {status.upper()}"
+        print(f"{name:<{width}} {old:10.3f} ms {new:10.3f} ms {ratio:6.2f}x{flag}")
+    for name in missing:
+        print(f"{name:<{width}} missing from {args.current}")
+    regressions = [row for row in rows if row[4] == "regression"]
+    print(f"{len(rows)} compared, {len(regressions)} regressions beyond {args.threshold:.0%}, {len(missing)} missing")
+    return 1 if regressions else 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.suite", description=__doc__.split("\n")[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    run_parser = commands.add_parser("run", help="time every stage of every fixture")
+    run_parser.add_argument("--rounds", type=int, default=10)
+    run_parser.add_argument("--output", default="-", help="results file (default: stdout)")
+    run_parser.add_argument("--fixtures", default=fixtures.PATH)
+    run_parser.add_argument("--skip-http", action="store_true", help="skip the /checkvote benchmarks")
+    compare_parser = commands.add_parser("compare", help="flag regressions against a baseline")
+    compare_parser.add_argument("baseline", nargs="?", default=BASELINE)
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.10, help="tolerated slowdown (default 0.10)")
+    args = parser.parse_args(argv)
+
+    if args.command == "compare":
+        return _compare_main(args)
+    results = run(args.rounds, http=not args.skip_http, corpus_path=args.fixtures)
+    text = json.dumps(results, indent=1) + "\n"
+    if args.output == "-":
+        sys.stdout.write(text)
+    else:
+        with open(args.output, "w") as f:
+            f.write(text)
+        print(f"wrote {args.output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,36 @@
+from . import fixtures
+from .suite import compare, stage_benchmarks, summarize
+
+
+def _results(**medians):
+    return {"benchmarks": {name.replace("__", "/"): {"median_ms": ms} for name, ms in medians.items()}}
+
+
+def test_stored_fixtures_are_current():
+    # Regenerate with `python -m benchmarks.fixtures` when the corpus changes
+    assert fixtures.load() == fixtures.build()
+
+
+def test_stages_stop_at_the_first_failure():
+    corpus = {f["name"]: f for f in fixtures.build()}
+    assert list(stage_benchmarks(corpus["valid"])) == ["claim_digest", "decode_seal", "vk_x", "pairing"]
+    assert list(stage_benchmarks(corpus["bad-point"])) == ["claim_digest", "decode_seal"]
+    assert list(stage_benchmarks(corpus["unknown-selector"])) == ["claim_digest", "decode_seal"]
+
+
+def test_compare_flags_changes_beyond_threshold():
+    baseline = _results(pairing__valid=10.0, vk_x__valid=1.0, http__valid=20.0, decode_seal__valid=2.0)
+    current = _results(pairing__valid=11.5, vk_x__valid=0.5, http__valid=21.0)
+    rows, missing = compare(baseline, current, threshold=0.10)
+    assert [(name, status) for name, _, _, _, status in rows] == [
+        ("http/valid", "ok"),
+        ("pairing/valid", "regression"),
+        ("vk_x/valid", "improved"),
+    ]
+    assert missing == ["decode_seal/valid"]
+
+
+def test_summarize():
+    stats = summarize([0.001, 0.003, 0.002])
+    assert stats["median_ms"] == 2.0 and stats["min_ms"] == 1.0 and stats["max_ms"] == 3.0
+    assert stats["rounds"] == 3
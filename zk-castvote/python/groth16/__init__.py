@@ -1,5 +1,23 @@
 from .verifier import verify_integrity
 from .parameters import get_verifier_parameters2
+from .batch import verify_batch
+from .warmup import warmup
+from .backends.fast import final_exponentiate_flat
 
-__all__ = ["verify_integrity", "get_verifier_parameters2"]
+__all__ = [
+    "verify_integrity",
+    "get_verifier_parameters2",
+    "pairing_check",
+    "verify_batch",
+    "warmup",
+    "final_exponentiate_flat",
+]
 
+
+def __getattr__(name):
+    # groth16.pairing is the py_ecc reference pairing; importing py_ecc takes
+    # most of a second, so it is only loaded when asked for
+    if name == "pairing_check":
+        from .pairing import pairing_check
+        return pairing_check
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,165 @@
+"""Curve backends for the Groth16 verifier.
+
+A backend implements the BN254 operations the verifier needs: G1/G2 decoding
+and validation, G1 addition and scalar multiplication, and the multi-pairing.
+Points cross the interface as plain integers, so callers never depend on a
+backend's internal field types:
+
+    G1: (x, y)                          or None for the point at infinity
+    G2: ((x_re, x_im), (y_re, y_im))    or None for the point at infinity
+
+Prepared G2 points and GT elements are opaque to callers; a backend only
+needs to compare its own GT elements with == and serialize them.
+
+Backends:
+    fast    plain-int field arithmetic (default)
+    py_ecc  the py_ecc.bn128 reference implementation
+
+The backend is chosen with GROTH16_BACKEND or set_backend().
+"""
+import os
+import threading
+from typing import Dict, Optional, Sequence, Tuple, Union
+
+
+G1 = Optional[Tuple[int, int]]
+G2 = Optional[Tuple[Tuple[int, int], Tuple[int, int]]]
+
+BACKEND_ENV = "GROTH16_BACKEND"
+DEFAULT_BACKEND = "fast"
+
+FIELD_MODULUS = 21888242871839275222246405745257275088696311157297823662689037894645226208583
+# Order r of G1, G2 and GT
+CURVE_ORDER = 21888242871839275222246405745257275088548364400416034343698204186575808495617
+
+
+class CurveBackend:
+    """BN254 operations used by the verifier."""
+    name = ""
+
+    def g1_is_on_curve(self, p: G1) -> bool:
+        raise NotImplementedError
+
+    def g2_is_on_curve(self, q: G2) -> bool:
+        raise NotImplementedError
+
+    def g2_is_in_subgroup(self, q: G2) -> bool:
+        """Check that a point on the twist is in the order-r subgroup G2."""
+        raise NotImplementedError
+
+    def g1_add(self, p: G1, q: G1) -> G1:
+        raise NotImplementedError
+
+    def g1_mul(self, p: G1, k: int) -> G1:
+        raise NotImplementedError
+
+    def g1_msm(self, points: Sequence[G1], scalars: Sequence[int]) -> G1:
+        """sum(scalars[i] * points[i])."""
+        acc = None
+        for p, k in zip(points, scalars):
+            acc = self.g1_add(acc, self.g1_mul(p, k))
+        return acc
+
+    def g1_neg(self, p: G1) -> G1:
+        if p is None:
+            return None
+        return (p[0], -p[1] % FIELD_MODULUS)
+
+    def decode_g1(self, data: Union[bytes, memoryview]) -> G1:
+        """Decode a 64-byte x || y point, as marshalled by Go's bn256.
+
+        All zeros is the point at infinity. G1 has cofactor 1, so a point on
+        the curve is in the order-r subgroup.
+        """
+        p = (int.from_bytes(data[0:32], 'big'), int.from_bytes(data[32:64], 'big'))
+        if p == (0, 0):
+            return None
+        if p[0] >= FIELD_MODULUS or p[1] >= FIELD_MODULUS:
+            raise ValueError("coordinate is not in the field")
+        if not self.g1_is_on_curve(p):
+            raise ValueError(f"({p[0]}, {p[1]}) is not on the curve")
+        return p
+
+    def decode_g2(self, data: Union[bytes, memoryview]) -> G2:
+        """Decode a 128-byte point; Go's bn256 stores each FQ2 as imaginary || real.
+
+        All zeros is the point at infinity. Other points must be on the
+        twist and in G2.
+        """
+        x_im, x_re, y_im, y_re = (int.from_bytes(data[i:i + 32], 'big') for i in range(0, 128, 32))
+        if not (x_im or x_re or y_im or y_re):
+            return None
+        if max(x_im, x_re, y_im, y_re) >= FIELD_MODULUS:
+            raise ValueError("coordinate is not in the field")
+        q = ((x_re, x_im), (y_re, y_im))
+        if not self.g2_is_on_curve(q):
+            raise ValueError("point is not on the twist curve")
+        if not self.g2_is_in_subgroup(q):
+            raise ValueError("point is not in the G2 subgroup")
+        return q
+
+    def prepare_g2(self, q: G2):
+        """Precompute the Miller-loop lines of a fixed G2 point."""
+        raise NotImplementedError
+
+    def multi_pairing(self, pairs: Sequence[Tuple[G1, object]]):
+        """prod e(P_i, Q_i) in GT; Q_i is a G2 point or a prepare_g2() result."""
+        raise NotImplementedError
+
+    def gt_one(self):
+        raise NotImplementedError
+
+    def pairing_check(self, pairs: Sequence[Tuple[G1, object]]) -> bool:
+        """Check that prod e(P_i, Q_i) == 1."""
+        return self.multi_pairing(pairs) == self.gt_one()
+
+    def prepared_to_json(self, prepared) -> list:
+        raise NotImplementedError
+
+    def prepared_from_json(self, data: list):
+        raise NotImplementedError
+
+    def gt_to_json(self, x) -> list:
+        raise NotImplementedError
+
+    def gt_from_json(self, data: list):
+        raise NotImplementedError
+
+
+_backends: Dict[str, CurveBackend] = {}
+_backend: Optional[CurveBackend] = None
+_backend_lock = threading.Lock()
+
+
+def _create(name: str) -> CurveBackend:
+    if name == "fast":
+        from .fast import FastBackend
+        return FastBackend()
+    if name == "py_ecc":
+        from .reference import PyEccBackend
+        return PyEccBackend()
+    raise ValueError(f"unknown groth16 backend: {name!r} (expected 'fast' or 'py_ecc')")
+
+
+def load_backend(name: str) -> CurveBackend:
+    """The backend instance registered under name, created on first use."""
+    with _backend_lock:
+        backend = _backends.get(name)
+        if backend is None:
+            backend = _backends[name] = _create(name)
+        return backend
+
+
+def get_backend() -> CurveBackend:
+    """The selected backend: set_backend(), else GROTH16_BACKEND, else fast."""
+    global _backend
+    if _backend is None:
+        _backend = load_backend(os.environ.get(BACKEND_ENV) or DEFAULT_BACKEND)
+    return _backend
+
+
+def set_backend(name: str) -> CurveBackend:
+    """Select the backend used by the verifier from now on."""
+    global _backend
+    _backend = load_backend(name)
+    return _backend
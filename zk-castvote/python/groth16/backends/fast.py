@@ -0,0 +1,743 @@
+"""BN254 pairing on plain Python ints.
+
+Field elements are ints (Fp), 2-tuples (Fp2 = Fp[i]/(i^2 + 1), stored as
+(re, im)) and, inside the pairing, the tower Fp6 = Fp2[v]/(v^3 - (9 + i)),
+Fp12 = Fp6[w]/(w^2 - v) with Karatsuba products. Results leave the backend
+as 12-tuples in py_ecc's flat basis, Fp[w]/(w^12 - 18w^6 + 82), so they can
+be compared coefficient by coefficient with the reference backend. Every
+operation is a handful of int multiplications reduced with %, without
+per-operation objects.
+
+G2 points stay on the twist y^2 = x^3 + 3/(9 + i) over Fp2, where the Miller
+loop lines are computed in homogeneous projective coordinates, so no step
+inverts (an inversion costs about 50 multiplications here). A line only has
+Fp12 coefficients at w^0, w^1 and w^3, and is multiplied into the
+accumulator in that sparse shape. G1 sums stay in Jacobian
+coordinates until a result leaves the backend.
+The loop follows the signed binary (NAF) form of the optimal ate loop count
+6x + 2, which needs 22 addition steps instead of 36.
+"""
+from operator import add
+from time import perf_counter
+from typing import List, Sequence, Tuple
+
+from ..msm import (
+    P,
+    from_jacobian,
+    jacobian_add,
+    jacobian_multiply,
+    to_jacobian,
+)
+from .. import timing
+from . import CURVE_ORDER, G1, G2, CurveBackend
+
+
+# The BN parameter, p = 36x^4 + 36x^3 + 24x^2 + 6x + 1
+BN_X = 4965661367192848881
+# 6x + 2
+ATE_LOOP_COUNT = 6 * BN_X + 2
+
+Fp2 = Tuple[int, int]
+Fp6 = Tuple[int, int, int, int, int, int]
+Fp12 = Tuple[Fp6, Fp6]
+
+# A line evaluated at a G1 point (px, py) is, with s, c and d in Fp2
+#   -py + s*px w + c w^3          for (s.re, s.im, c.re, c.im)
+#   d*py + s*px w + c w^3         for (d.re, d.im, s.re, s.im, c.re, c.im)
+#   px + a w^2                    for a vertical line (a.re, a.im)
+# The six-int form is a line scaled by an Fp2 factor, which the final
+# exponentiation removes.
+Line = Tuple[int, ...]
+
+
+def _f2_mul(a: Fp2, b: Fp2) -> Fp2:
+    a0, a1 = a
+    b0, b1 = b
+    t0 = a0 * b0
+    t1 = a1 * b1
+    return ((t0 - t1) % P, ((a0 + a1) * (b0 + b1) - t0 - t1) % P)
+
+
+def _f2_add(a: Fp2, b: Fp2) -> Fp2:
+    return ((a[0] + b[0]) % P, (a[1] + b[1]) % P)
+
+
+def _f2_sub(a: Fp2, b: Fp2) -> Fp2:
+    return ((a[0] - b[0]) % P, (a[1] - b[1]) % P)
+
+
+def _f2_sqr(a: Fp2) -> Fp2:
+    a0, a1 = a
+    return ((a0 + a1) * (a0 - a1) % P, 2 * a0 * a1 % P)
+
+
+def _f2_inv(a: Fp2) -> Fp2:
+    a0, a1 = a
+    inv = pow(a0 * a0 + a1 * a1, -1, P)
+    return (a0 * inv % P, -a1 * inv % P)
+
+
+def _f2_pow(a: Fp2, k: int) -> Fp2:
+    result = (1, 0)
+    for bit in bin(k)[2:]:
+        result = _f2_sqr(result)
+        if bit == '1':
+            result = _f2_mul(result, a)
+    return result
+
+
+XI = (9, 1)
+B2 = _f2_mul((3, 0), _f2_inv(XI))
+
+# Frobenius on the twist: pi(x, y) = (conj(x) * XI^((p-1)/3), conj(y) * XI^((p-1)/2))
+FROB_X = _f2_pow(XI, (P - 1) // 3)
+FROB_Y = _f2_pow(XI, (P - 1) // 2)
+
+
+def _naf(k: int) -> List[int]:
+    """Signed binary digits of k, least significant first."""
+    digits = []
+    while k:
+        d = 2 - (k & 3) if k & 1 else 0
+        digits.append(d)
+        k = (k - d) >> 1
+    return digits
+
+
+# Digits below the leading one, most significant first
+_LOOP_DIGITS = _naf(ATE_LOOP_COUNT)[-2::-1]
+
+
+def _miller_schedule() -> List[bool]:
+    """Steps of the Miller loop, one line each; True means "square f first"."""
+    steps = []
+    for digit in _LOOP_DIGITS:
+        steps.append(True)
+        if digit:
+            steps.append(False)
+    steps.extend([False, False])
+    return steps
+
+
+_SCHEDULE = _miller_schedule()
+
+
+# Fp6 = Fp2[v]/(v^3 - XI), an element x0 + x1 v + x2 v^2 stored as the six
+# ints (x0.re, x0.im, x1.re, x1.im, x2.re, x2.im). The products below spell
+# the Fp2 arithmetic out on those ints and leave their results unreduced: a
+# % costs more than a multiplication, so each Fp12 result is reduced once.
+
+def _f6_add(a: Fp6, b: Fp6) -> Fp6:
+    """Unreduced sum."""
+    return tuple(map(add, a, b))
+
+
+def _f6_mul_v(a: Fp6) -> Fp6:
+    """a * v = XI x2 + x0 v + x1 v^2, unreduced."""
+    a0, a1, a2, a3, a4, a5 = a
+    return (9 * a4 - a5, a4 + 9 * a5, a0, a1, a2, a3)
+
+
+def _f6_mul(a: Fp6, b: Fp6) -> Fp6:
+    """Karatsuba over Fp2 (six Fp2 products, each Karatsuba too), unreduced."""
+    a0, a1, a2, a3, a4, a5 = a
+    b0, b1, b2, b3, b4, b5 = b
+    t0, t1 = a0 * b0, a1 * b1
+    v0r, v0i = t0 - t1, (a0 + a1) * (b0 + b1) - t0 - t1
+    t0, t1 = a2 * b2, a3 * b3
+    v1r, v1i = t0 - t1, (a2 + a3) * (b2 + b3) - t0 - t1
+    t0, t1 = a4 * b4, a5 * b5
+    v2r, v2i = t0 - t1, (a4 + a5) * (b4 + b5) - t0 - t1
+    # c0 = v0 + XI ((x1 + x2)(y1 + y2) - v1 - v2)
+    xr, xi, yr, yi = a2 + a4, a3 + a5, b2 + b4, b3 + b5
+    t0, t1 = xr * yr, xi * yi
+    sr = t0 - t1 - v1r - v2r
+    si = (xr + xi) * (yr + yi) - t0 - t1 - v1i - v2i
+    # c1 = (x0 + x1)(y0 + y1) - v0 - v1 + XI v2
+    xr, xi, yr, yi = a0 + a2, a1 + a3, b0 + b2, b1 + b3
+    t0, t1 = xr * yr, xi * yi
+    c1r = t0 - t1 - v0r - v1r + 9 * v2r - v2i
+    c1i = (xr + xi) * (yr + yi) - t0 - t1 - v0i - v1i + v2r + 9 * v2i
+    # c2 = (x0 + x2)(y0 + y2) - v0 - v2 + v1
+    xr, xi, yr, yi = a0 + a4, a1 + a5, b0 + b4, b1 + b5
+    t0, t1 = xr * yr, xi * yi
+    c2r = t0 - t1 - v0r - v2r + v1r
+    c2i = (xr + xi) * (yr + yi) - t0 - t1 - v0i - v2i + v1i
+    return (v0r + 9 * sr - si, v0i + sr + 9 * si, c1r, c1i, c2r, c2i)
+
+
+def _f6_mul_01(a: Fp6, b0: int, b1: int, b2: int, b3: int) -> Fp6:
+    """a * (y0 + y1 v) for y0 = b0 + b1 i, y1 = b2 + b3 i: five Fp2 products, unreduced."""
+    a0, a1, a2, a3, a4, a5 = a
+    t0, t1 = a0 * b0, a1 * b1
+    v0r, v0i = t0 - t1, (a0 + a1) * (b0 + b1) - t0 - t1
+    t0, t1 = a2 * b2, a3 * b3
+    v1r, v1i = t0 - t1, (a2 + a3) * (b2 + b3) - t0 - t1
+    # c0 = v0 + XI x2 y1
+    t0, t1 = a4 * b2, a5 * b3
+    sr, si = t0 - t1, (a4 + a5) * (b2 + b3) - t0 - t1
+    # c1 = (x0 + x1)(y0 + y1) - v0 - v1
+    xr, xi, yr, yi = a0 + a2, a1 + a3, b0 + b2, b1 + b3
+    t0, t1 = xr * yr, xi * yi
+    c1r = t0 - t1 - v0r - v1r
+    c1i = (xr + xi) * (yr + yi) - t0 - t1 - v0i - v1i
+    # c2 = v1 + x2 y0
+    t0, t1 = a4 * b0, a5 * b1
+    c2r = v1r + t0 - t1
+    c2i = v1i + (a4 + a5) * (b0 + b1) - t0 - t1
+    return (v0r + 9 * sr - si, v0i + sr + 9 * si, c1r, c1i, c2r, c2i)
+
+
+def _f6_mul_fp2(a: Fp6, b0: int, b1: int) -> Fp6:
+    """a * (b0 + b1 i), unreduced."""
+    a0, a1, a2, a3, a4, a5 = a
+    t0, t1, t2, t3, t4, t5 = a0 * b0, a1 * b1, a2 * b0, a3 * b1, a4 * b0, a5 * b1
+    bs = b0 + b1
+    return (
+        t0 - t1, (a0 + a1) * bs - t0 - t1,
+        t2 - t3, (a2 + a3) * bs - t2 - t3,
+        t4 - t5, (a4 + a5) * bs - t4 - t5,
+    )
+
+
+def _f6_inv(a: Fp6) -> Fp6:
+    a0, a1, a2 = a[0:2], a[2:4], a[4:6]
+    # A = x0^2 - XI x1 x2, B = XI x2^2 - x0 x1, C = x1^2 - x0 x2
+    c0 = _f2_sub(_f2_sqr(a0), _f2_mul(XI, _f2_mul(a1, a2)))
+    c1 = _f2_sub(_f2_mul(XI, _f2_sqr(a2)), _f2_mul(a0, a1))
+    c2 = _f2_sub(_f2_sqr(a1), _f2_mul(a0, a2))
+    # norm = x0 A + XI (x2 B + x1 C)
+    t = _f2_mul(XI, _f2_add(_f2_mul(a2, c1), _f2_mul(a1, c2)))
+    inv = _f2_inv(_f2_add(_f2_mul(a0, c0), t))
+    return _f2_mul(c0, inv) + _f2_mul(c1, inv) + _f2_mul(c2, inv)
+
+
+# Fp12 = Fp6[w]/(w^2 - v), an element c0 + c1 w stored as (c0, c1). This is
+# the same field as py_ecc's Fp[w]/(w^12 - 18w^6 + 82), with i = w^6 - 9:
+# the Fp2 coefficient e0 + e1 i of w^k is (e0 - 9 e1) w^k + e1 w^(k+6) there.
+
+FP12_ONE: Fp12 = ((1, 0, 0, 0, 0, 0), (0,) * 6)
+FLAT_ONE: Tuple[int, ...] = (1,) + (0,) * 11
+
+
+def to_flat(f: Fp12) -> Tuple[int, ...]:
+    """f in py_ecc's basis, as 12 coefficients of w^0..w^11."""
+    c0, c1 = f
+    # Fp2 coefficients of w^0, w^1, ..., w^5
+    coeffs = (c0[0:2], c1[0:2], c0[2:4], c1[2:4], c0[4:6], c1[4:6])
+    return tuple((e0 - 9 * e1) % P for e0, e1 in coeffs) + tuple(e1 for _, e1 in coeffs)
+
+
+def from_flat(x: Sequence[int]) -> Fp12:
+    coeffs = [((x[k] + 9 * x[k + 6]) % P, x[k + 6] % P) for k in range(6)]
+    return (coeffs[0] + coeffs[2] + coeffs[4], coeffs[1] + coeffs[3] + coeffs[5])
+
+
+def _karatsuba_reduce(t0: Fp6, t1: Fp6, t2: Fp6) -> Fp12:
+    """(t0 + v t1, t2 - t0 - t1) reduced, for t0 = a0 b0, t1 = a1 b1 and
+    t2 = (a0 + a1)(b0 + b1): the product (a0 + a1 w)(b0 + b1 w)."""
+    x0, x1, x2, x3, x4, x5 = t0
+    y0, y1, y2, y3, y4, y5 = t1
+    z0, z1, z2, z3, z4, z5 = t2
+    return (
+        ((x0 + 9 * y4 - y5) % P, (x1 + y4 + 9 * y5) % P,
+         (x2 + y0) % P, (x3 + y1) % P, (x4 + y2) % P, (x5 + y3) % P),
+        ((z0 - x0 - y0) % P, (z1 - x1 - y1) % P, (z2 - x2 - y2) % P,
+         (z3 - x3 - y3) % P, (z4 - x4 - y4) % P, (z5 - x5 - y5) % P),
+    )
+
+
+def _f12_mul(a: Fp12, b: Fp12) -> Fp12:
+    """Karatsuba over Fp6: three Fp6 products."""
+    a0, a1 = a
+    b0, b1 = b
+    return _karatsuba_reduce(_f6_mul(a0, b0), _f6_mul(a1, b1), _f6_mul(_f6_add(a0, a1), _f6_add(b0, b1)))
+
+
+def _f12_sqr(a: Fp12) -> Fp12:
+    """Complex squaring: two Fp6 products,
+    c0 = (a0 + a1)(a0 + v a1) - t - v t and c1 = 2t for t = a0 a1."""
+    a0, a1 = a
+    t0, t1, t2, t3, t4, t5 = _f6_mul(a0, a1)
+    s0, s1, s2, s3, s4, s5 = _f6_mul(_f6_add(a0, a1), _f6_add(a0, _f6_mul_v(a1)))
+    return (
+        ((s0 - t0 - 9 * t4 + t5) % P, (s1 - t1 - t4 - 9 * t5) % P,
+         (s2 - t2 - t0) % P, (s3 - t3 - t1) % P, (s4 - t4 - t2) % P, (s5 - t5 - t3) % P),
+        (2 * t0 % P, 2 * t1 % P, 2 * t2 % P, 2 * t3 % P, 2 * t4 % P, 2 * t5 % P),
+    )
+
+
+def _mul_by_line(f: Fp12, line: Line, px: int, py: int) -> Fp12:
+    """f times a line, using its shape l0 + (l3 + l4 v) w (only the w^0,
+    w^1 and w^3 coefficients are non-zero), or l0 + l2 v for a vertical line."""
+    f0, f1 = f
+    if len(line) == 2:
+        a0, a1 = line
+        c0 = _f6_mul_01(f0, px, 0, a0, a1)
+        c1 = _f6_mul_01(f1, px, 0, a0, a1)
+        return (tuple(x % P for x in c0), tuple(x % P for x in c1))
+    if len(line) == 4:
+        s0, s1, c0, c1 = line
+        l0r, l0i = -py, 0
+        t0 = tuple(x * l0r for x in f0)
+    else:
+        d0, d1, s0, s1, c0, c1 = line
+        l0r, l0i = d0 * py % P, d1 * py % P
+        t0 = _f6_mul_fp2(f0, l0r, l0i)
+    l3r, l3i = s0 * px % P, s1 * px % P
+    t1 = _f6_mul_01(f1, l3r, l3i, c0, c1)
+    t2 = _f6_mul_01(_f6_add(f0, f1), l0r + l3r, l0i + l3i, c0, c1)
+    return _karatsuba_reduce(t0, t1, t2)
+
+
+def _f12_conj(a: Fp12) -> Fp12:
+    """a^(p^6): w^(p^6) = -w."""
+    return (a[0], tuple(-x % P for x in a[1]))
+
+
+# Frobenius: (g w^k)^(p^n) = g^(p^n) w^k XI^(k (p^n - 1) / 6) for g in Fp2,
+# where g^(p^n) is the conjugate of g for odd n. FROBENIUS[n] has those
+# factors per stored Fp2 coefficient: w^0, w^2, w^4 (c0), then w^1, w^3, w^5 (c1).
+FROBENIUS = {
+    n: tuple(_f2_pow(XI, k * (P**n - 1) // 6) for k in (0, 2, 4, 1, 3, 5))
+    for n in (1, 2, 3)
+}
+
+
+def _f12_frobenius(a: Fp12, n: int) -> Fp12:
+    """a^(p^n) for n = 1, 2, 3."""
+    coeffs = FROBENIUS[n]
+    flat = a[0] + a[1]
+    out = []
+    for k in range(6):
+        x0, x1 = flat[2 * k], flat[2 * k + 1]
+        if n & 1:
+            x1 = -x1
+        g0, g1 = coeffs[k]
+        t0, t1 = x0 * g0, x1 * g1
+        out.append((t0 - t1) % P)
+        out.append(((x0 + x1) * (g0 + g1) - t0 - t1) % P)
+    return (tuple(out[:6]), tuple(out[6:]))
+
+
+def _f12_inv(a: Fp12) -> Fp12:
+    """(c0 + c1 w)^-1 = (c0 - c1 w) / (c0^2 - v c1^2)."""
+    c0, c1 = a
+    norm = tuple((x - y) % P for x, y in zip(_f6_mul(c0, c0), _f6_mul_v(_f6_mul(c1, c1))))
+    inv = _f6_inv(norm)
+    return (tuple(x % P for x in _f6_mul(c0, inv)), tuple(-x % P for x in _f6_mul(c1, inv)))
+
+
+def _fp4_sqr(a0: int, a1: int, b0: int, b1: int) -> Tuple[int, int, int, int]:
+    """(a + b y)^2 = (a^2 + XI b^2) + 2ab y in Fp4 = Fp2[y]/(y^2 - XI), for
+    a = a0 + a1 i and b = b0 + b1 i, with three Fp2 squarings; unreduced."""
+    aa0, aa1 = (a0 + a1) * (a0 - a1), 2 * a0 * a1
+    bb0, bb1 = (b0 + b1) * (b0 - b1), 2 * b0 * b1
+    s0, s1 = a0 + b0, a1 + b1
+    ss0, ss1 = (s0 + s1) * (s0 - s1), 2 * s0 * s1
+    return (
+        aa0 + 9 * bb0 - bb1, aa1 + bb0 + 9 * bb1,
+        ss0 - aa0 - bb0, ss1 - aa1 - bb1,
+    )
+
+
+def _cyclotomic_sqr(f: Fp12) -> Fp12:
+    """Granger-Scott squaring, valid for f in the cyclotomic subgroup (any
+    f after the easy part of the final exponentiation): three Fp4 squarings,
+    18 multiplications instead of the 36 of _f12_sqr."""
+    (z0r, z0i, z4r, z4i, z3r, z3i), (z2r, z2i, z1r, z1i, z5r, z5i) = f
+    t0r, t0i, t1r, t1i = _fp4_sqr(z0r, z0i, z1r, z1i)
+    t2r, t2i, t3r, t3i = _fp4_sqr(z2r, z2i, z3r, z3i)
+    t4r, t4i, t5r, t5i = _fp4_sqr(z4r, z4i, z5r, z5i)
+    # XI t5
+    u0, u1 = 9 * t5r - t5i, t5r + 9 * t5i
+    return (
+        ((3 * t0r - 2 * z0r) % P, (3 * t0i - 2 * z0i) % P,
+         (3 * t2r - 2 * z4r) % P, (3 * t2i - 2 * z4i) % P,
+         (3 * t4r - 2 * z3r) % P, (3 * t4i - 2 * z3i) % P),
+        ((3 * u0 + 2 * z2r) % P, (3 * u1 + 2 * z2i) % P,
+         (3 * t1r + 2 * z1r) % P, (3 * t1i + 2 * z1i) % P,
+         (3 * t3r + 2 * z5r) % P, (3 * t3i + 2 * z5i) % P),
+    )
+
+
+# Digits of x below the leading one, most significant first
+_X_DIGITS = _naf(BN_X)[-2::-1]
+
+
+def _cyclotomic_pow_x(f: Fp12) -> Fp12:
+    """f^x for f in the cyclotomic subgroup, where f^-1 is the conjugate."""
+    f_inv = _f12_conj(f)
+    result = f
+    for digit in _X_DIGITS:
+        result = _cyclotomic_sqr(result)
+        if digit == 1:
+            result = _f12_mul(result, f)
+        elif digit == -1:
+            result = _f12_mul(result, f_inv)
+    return result
+
+
+HARD_EXPONENT = (P**4 - P**2 + 1) // CURVE_ORDER
+
+
+def final_exponentiate_easy(f: Fp12) -> Fp12:
+    """f^((p^6 - 1)(p^2 + 1)): the conjugate, one inversion and the p^2-Frobenius.
+    The result is in the cyclotomic subgroup."""
+    f = _f12_mul(_f12_conj(f), _f12_inv(f))
+    return _f12_mul(_f12_frobenius(f, 2), f)
+
+
+def final_exponentiate_hard(f: Fp12) -> Fp12:
+    """f^HARD_EXPONENT for f in the cyclotomic subgroup.
+
+    HARD_EXPONENT = (p^4 - p^2 + 1) / r = l0 + l1 p + l2 p^2 + p^3 with
+    l2 = 6x^2 + 1, l1 = -36x^3 - 18x^2 - 12x + 1, l0 = -36x^3 - 30x^2 - 18x - 2
+    (Scott et al., "On the final exponentiation for calculating pairings on
+    ordinary elliptic curves"): three powers by the 63-bit x, a few
+    Frobenius maps and 13 multiplications, against about 760 squarings for
+    the exponent itself. This is the exact exponent, not a multiple of it,
+    so results match py_ecc's.
+    """
+    fx = _cyclotomic_pow_x(f)
+    fx2 = _cyclotomic_pow_x(fx)
+    fx3 = _cyclotomic_pow_x(fx2)
+    y0 = _f12_mul(_f12_mul(_f12_frobenius(f, 1), _f12_frobenius(f, 2)), _f12_frobenius(f, 3))
+    y1 = _f12_conj(f)
+    y2 = _f12_frobenius(fx2, 2)
+    y3 = _f12_conj(_f12_frobenius(fx, 1))
+    y4 = _f12_conj(_f12_mul(fx, _f12_frobenius(fx2, 1)))
+    y5 = _f12_conj(fx2)
+    y6 = _f12_conj(_f12_mul(fx3, _f12_frobenius(fx3, 1)))
+    # y0 y1^2 y2^6 y3^12 y4^18 y5^30 y6^36
+    t0 = _f12_mul(_f12_mul(_cyclotomic_sqr(y6), y4), y5)
+    t1 = _f12_mul(_f12_mul(y3, y5), t0)
+    t0 = _f12_mul(t0, y2)
+    t1 = _cyclotomic_sqr(_f12_mul(_cyclotomic_sqr(t1), t0))
+    t0 = _f12_mul(t1, y1)
+    t1 = _f12_mul(t1, y0)
+    return _f12_mul(_cyclotomic_sqr(t0), t1)
+
+
+def final_exponentiate(f: Fp12) -> Fp12:
+    """f^((p^12 - 1) / r), the easy part then the hard part."""
+    return final_exponentiate_hard(final_exponentiate_easy(f))
+
+
+def final_exponentiate_flat(coeffs: Sequence[int]) -> Tuple[int, ...]:
+    """final_exponentiate for a Miller-loop value in py_ecc's flat basis (the
+    12 coefficients of w^0..w^11, as FQ12.coeffs or gt_to_json give them)."""
+    if len(coeffs) != 12:
+        raise ValueError(f"expected 12 Fp12 coefficients, got {len(coeffs)}")
+    return to_flat(final_exponentiate(from_flat([int(c) for c in coeffs])))
+
+
+# Lines on the twist
+
+# Homogeneous projective coordinates (X, Y, Z) on the twist, x = X/Z, y = Y/Z
+G2Projective = Tuple[Fp2, Fp2, Fp2]
+
+# A line before normalization: (den, slope, const) with each value in Fp2,
+# for the line -py + (slope/den) px w + (const/den) w^3 at a G1 point
+RawLine = Tuple[Fp2, Fp2, Fp2]
+
+INV2 = pow(2, -1, P)
+B2_3 = (3 * B2[0] % P, 3 * B2[1] % P)
+
+
+def _double_step(R: G2Projective) -> Tuple[RawLine, G2Projective]:
+    """Tangent line at R and 2R, without inversions (Costello-Lange-Naehrig
+    doubling for y^2 = x^3 + b', the line scaled by 2YZ^3)."""
+    X, Y, Z = R
+    a = _f2_mul(X, Y)
+    a = (a[0] * INV2 % P, a[1] * INV2 % P)
+    b = _f2_sqr(Y)
+    c = _f2_sqr(Z)
+    e = _f2_mul(B2_3, c)
+    f = (3 * e[0], 3 * e[1])
+    g = ((b[0] + f[0]) * INV2 % P, (b[1] + f[1]) * INV2 % P)
+    h = _f2_sqr((Y[0] + Z[0], Y[1] + Z[1]))
+    h = ((h[0] - b[0] - c[0]) % P, (h[1] - b[1] - c[1]) % P)
+    j = _f2_sqr(X)
+    gg = _f2_sqr(g)
+    ee = _f2_sqr(e)
+    R3 = (
+        _f2_mul(a, (b[0] - f[0], b[1] - f[1])),
+        ((gg[0] - 3 * ee[0]) % P, (gg[1] - 3 * ee[1]) % P),
+        _f2_mul(b, h),
+    )
+    # 2y l = -2y py + 3x^2 px w + (3b' - y^2) w^3, times Z^2
+    return (h, (3 * j[0], 3 * j[1]), ((e[0] - b[0]) % P, (e[1] - b[1]) % P)), R3
+
+
+def _add_step(R: G2Projective, Q: Tuple[Fp2, Fp2]):
+    """Line through R and the affine point Q, and R + Q, without inversions.
+
+    Returns a vertical line (already normalized) and None when R = -Q.
+    """
+    X1, Y1, Z1 = R
+    x2, y2 = Q
+    t = _f2_mul(y2, Z1)
+    theta = ((Y1[0] - t[0]) % P, (Y1[1] - t[1]) % P)
+    t = _f2_mul(x2, Z1)
+    lam = ((X1[0] - t[0]) % P, (X1[1] - t[1]) % P)
+    if lam == (0, 0):
+        if theta == (0, 0):
+            return _double_step(R)
+        # The vertical line px - x2 w^2, and R + Q is infinity
+        return (-x2[0] % P, -x2[1] % P), None
+    c = _f2_sqr(theta)
+    d = _f2_sqr(lam)
+    e = _f2_mul(lam, d)
+    f = _f2_mul(Z1, c)
+    g = _f2_mul(X1, d)
+    h = ((e[0] + f[0] - 2 * g[0]) % P, (e[1] + f[1] - 2 * g[1]) % P)
+    ey = _f2_mul(e, Y1)
+    t = _f2_mul(theta, (g[0] - h[0], g[1] - h[1]))
+    R3 = (_f2_mul(lam, h), ((t[0] - ey[0]) % P, (t[1] - ey[1]) % P), _f2_mul(Z1, e))
+    # lam l = -lam py + theta px w + (lam y2 - theta x2) w^3
+    ly = _f2_mul(lam, y2)
+    tx = _f2_mul(theta, x2)
+    return (lam, theta, ((ly[0] - tx[0]) % P, (ly[1] - tx[1]) % P)), R3
+
+
+def _scaled_lines(raw: List[Tuple[int, ...]]) -> List[Line]:
+    """Flatten each line as it is, den included."""
+    lines: List[Line] = []
+    for line in raw:
+        if len(line) != 3:
+            lines.append(line)
+            continue
+        den, slope, const = line
+        lines.append((-den[0] % P, -den[1] % P) + slope + const)
+    return lines
+
+
+def _normalize_lines(raw: List[Tuple[int, ...]]) -> List[Line]:
+    """Divide each line by its den with a single Fp2 inversion (Montgomery's
+    trick)."""
+    prefix = []
+    acc = (1, 0)
+    for line in raw:
+        prefix.append(acc)
+        if len(line) == 3:
+            acc = _f2_mul(acc, line[0])
+    inv = _f2_inv(acc)
+    lines: List[Line] = [()] * len(raw)
+    for i in range(len(raw) - 1, -1, -1):
+        line = raw[i]
+        if len(line) != 3:
+            lines[i] = line
+            continue
+        den, slope, const = line
+        den_inv = _f2_mul(inv, prefix[i])
+        inv = _f2_mul(inv, den)
+        s = _f2_mul(slope, den_inv)
+        c = _f2_mul(const, den_inv)
+        lines[i] = s + c
+    return lines
+
+
+class G2Prepared:
+    """Miller-loop lines of a G2 point, one per step of _SCHEDULE."""
+    __slots__ = ("lines",)
+
+    def __init__(self, lines: List[Line]):
+        if len(lines) != len(_SCHEDULE):
+            raise ValueError(f"invalid prepared G2 point: {len(lines)} lines, expected {len(_SCHEDULE)}")
+        self.lines = lines
+
+
+def prepare_g2(Q: Tuple[Fp2, Fp2], normalize: bool = True) -> G2Prepared:
+    """Miller-loop lines of an affine G2 point. The loop runs in projective
+    coordinates. With normalize, the lines are divided by their scale
+    factors at the end, which makes them cheaper to multiply in; that pays
+    off for fixed points, not for a point used once."""
+    x, y = Q
+    neg_Q = (x, (-y[0] % P, -y[1] % P))
+    R = (x, y, (1, 0))
+    raw = []
+    for digit in _LOOP_DIGITS:
+        if R is None:
+            raise ValueError("Miller loop reached the point at infinity")
+        line, R = _double_step(R)
+        raw.append(line)
+        if digit:
+            line, R = _add_step(R, Q if digit == 1 else neg_Q)
+            raw.append(line)
+    # Q1 = pi(Q), -Q2 = -pi^2(Q)
+    Q1 = (_f2_mul((x[0], -x[1] % P), FROB_X), _f2_mul((y[0], -y[1] % P), FROB_Y))
+    x2 = _f2_mul((Q1[0][0], -Q1[0][1] % P), FROB_X)
+    y2 = _f2_mul((Q1[1][0], -Q1[1][1] % P), FROB_Y)
+    neg_Q2 = (x2, (-y2[0] % P, -y2[1] % P))
+    if R is None:
+        raise ValueError("Miller loop reached the point at infinity")
+    line, R = _add_step(R, Q1)
+    raw.append(line)
+    if R is None:
+        raise ValueError("Miller loop reached the point at infinity")
+    raw.append(_add_step(R, neg_Q2)[0])
+    return G2Prepared(_normalize_lines(raw) if normalize else _scaled_lines(raw))
+
+
+def miller_loop(pairs: Sequence[Tuple[Tuple[int, int], G2Prepared]]) -> Fp12:
+    """Product of the Miller loops of (G1 point, prepared G2 point) pairs,
+    run in lockstep so f is squared once per doubling step for all pairs."""
+    points = [(p[0], p[1], q.lines) for p, q in pairs]
+    f = FP12_ONE
+    for k, square in enumerate(_SCHEDULE):
+        if square:
+            f = _f12_sqr(f)
+        for px, py, lines in points:
+            f = _mul_by_line(f, lines[k], px, py)
+    return f
+
+
+# G2 subgroup membership: for Q on the twist, Q is in G2 iff psi(Q) = [6x^2]Q,
+# where psi is the Frobenius endomorphism (p = 6x^2 mod r on G2). The scalar
+# has 127 bits, half of a check against the group order r.
+G2_SUBGROUP_DIGITS = _naf(6 * BN_X**2)[-2::-1]
+
+# Jacobian coordinates (X, Y, Z) on the twist, x = X/Z^2, y = Y/Z^3
+G2Jacobian = Tuple[Fp2, Fp2, Fp2]
+
+
+def _g2_double(R: G2Jacobian) -> G2Jacobian:
+    """dbl-2009-l over Fp2."""
+    X, Y, Z = R
+    a = _f2_sqr(X)
+    b = _f2_sqr(Y)
+    c = _f2_sqr(b)
+    t = _f2_sqr((X[0] + b[0], X[1] + b[1]))
+    d = (2 * (t[0] - a[0] - c[0]) % P, 2 * (t[1] - a[1] - c[1]) % P)
+    e = (3 * a[0], 3 * a[1])
+    f = _f2_sqr(e)
+    x3 = ((f[0] - 2 * d[0]) % P, (f[1] - 2 * d[1]) % P)
+    t = _f2_mul(e, (d[0] - x3[0], d[1] - x3[1]))
+    y3 = ((t[0] - 8 * c[0]) % P, (t[1] - 8 * c[1]) % P)
+    yz = _f2_mul(Y, Z)
+    return (x3, y3, (2 * yz[0] % P, 2 * yz[1] % P))
+
+
+def _g2_add_affine(R: G2Jacobian, Q: Tuple[Fp2, Fp2]) -> G2Jacobian:
+    """madd-2007-bl over Fp2; returns None for infinity."""
+    X1, Y1, Z1 = R
+    x2, y2 = Q
+    zz = _f2_sqr(Z1)
+    u2 = _f2_mul(x2, zz)
+    s2 = _f2_mul(y2, _f2_mul(Z1, zz))
+    h = ((u2[0] - X1[0]) % P, (u2[1] - X1[1]) % P)
+    r = (2 * (s2[0] - Y1[0]) % P, 2 * (s2[1] - Y1[1]) % P)
+    if h == (0, 0):
+        return _g2_double(R) if r == (0, 0) else None
+    hh = _f2_sqr(h)
+    i = (4 * hh[0], 4 * hh[1])
+    j = _f2_mul(h, i)
+    v = _f2_mul(X1, i)
+    rr = _f2_sqr(r)
+    x3 = ((rr[0] - j[0] - 2 * v[0]) % P, (rr[1] - j[1] - 2 * v[1]) % P)
+    t = _f2_mul(r, (v[0] - x3[0], v[1] - x3[1]))
+    yj = _f2_mul(Y1, j)
+    y3 = ((t[0] - 2 * yj[0]) % P, (t[1] - 2 * yj[1]) % P)
+    t = _f2_sqr((Z1[0] + h[0], Z1[1] + h[1]))
+    z3 = ((t[0] - zz[0] - hh[0]) % P, (t[1] - zz[1] - hh[1]) % P)
+    return (x3, y3, z3)
+
+
+def g2_in_subgroup(Q: Tuple[Fp2, Fp2]) -> bool:
+    """Check psi(Q) == [6x^2]Q for a point Q on the twist."""
+    x, y = Q
+    neg_Q = (x, (-y[0] % P, -y[1] % P))
+    R = (x, y, (1, 0))
+    for digit in G2_SUBGROUP_DIGITS:
+        R = _g2_double(R)
+        if digit:
+            R = _g2_add_affine(R, Q if digit == 1 else neg_Q)
+            if R is None:
+                return False
+    X, Y, Z = R
+    if Z == (0, 0):
+        return False
+    # Compare with psi(Q) without leaving Jacobian coordinates
+    zz = _f2_sqr(Z)
+    px = _f2_mul((x[0], -x[1] % P), FROB_X)
+    py = _f2_mul((y[0], -y[1] % P), FROB_Y)
+    return _f2_mul(px, zz) == X and _f2_mul(py, _f2_mul(zz, Z)) == Y
+
+
+class FastBackend(CurveBackend):
+    """Plain-int BN254 arithmetic; G1 in Jacobian coordinates, Fp12 as a tower of int tuples."""
+    name = "fast"
+
+    def g1_is_on_curve(self, p: G1) -> bool:
+        if p is None:
+            return True
+        x, y = p
+        return (y * y - x * x * x - 3) % P == 0
+
+    def g2_is_on_curve(self, q: G2) -> bool:
+        if q is None:
+            return True
+        x, y = q
+        yy = _f2_sqr(y)
+        xxx = _f2_mul(_f2_sqr(x), x)
+        return (yy[0] - xxx[0] - B2[0]) % P == 0 and (yy[1] - xxx[1] - B2[1]) % P == 0
+
+    def g2_is_in_subgroup(self, q: G2) -> bool:
+        return q is None or g2_in_subgroup(q)
+
+    def g1_add(self, p: G1, q: G1) -> G1:
+        return from_jacobian(jacobian_add(to_jacobian(p), to_jacobian(q)))
+
+    def g1_mul(self, p: G1, k: int) -> G1:
+        return from_jacobian(jacobian_multiply(to_jacobian(p), k % CURVE_ORDER))
+
+    def g1_msm(self, points: Sequence[G1], scalars: Sequence[int]) -> G1:
+        # Accumulate in Jacobian coordinates, normalize once
+        acc = to_jacobian(None)
+        for p, k in zip(points, scalars):
+            acc = jacobian_add(acc, jacobian_multiply(to_jacobian(p), k % CURVE_ORDER))
+        return from_jacobian(acc)
+
+    def prepare_g2(self, q: G2) -> G2Prepared:
+        return prepare_g2(q)
+
+    def multi_pairing(self, pairs: Sequence[Tuple[G1, object]]) -> Tuple[int, ...]:
+        start = perf_counter()
+        prepared = []
+        for i, (p, q) in enumerate(pairs):
+            if p is None or q is None:
+                # e(O, Q) = e(P, O) = 1
+                continue
+            if not self.g1_is_on_curve(p):
+                raise ValueError(f"pair {i}: G1 point is not on curve")
+            if not isinstance(q, G2Prepared):
+                if not self.g2_is_on_curve(q):
+                    raise ValueError(f"pair {i}: G2 point is not on the twist curve")
+                q = prepare_g2(q, normalize=False)
+            prepared.append((p, q))
+        f = miller_loop(prepared)
+        start = timing.observe("miller_loop", start)
+        f = to_flat(final_exponentiate(f))
+        timing.observe("final_exponentiation", start)
+        return f
+
+    def gt_one(self) -> Tuple[int, ...]:
+        return FLAT_ONE
+
+    def prepared_to_json(self, prepared: G2Prepared) -> list:
+        # Lines as their Fp2 coefficients, [[re, im], ...]
+        return [[list(line[k:k + 2]) for k in range(0, len(line), 2)] for line in prepared.lines]
+
+    def prepared_from_json(self, data: list) -> G2Prepared:
+        if not all(isinstance(coeff, list) for line in data for coeff in line):
+            raise ValueError("prepared lines are in the flat Fp12 layout of an older version; delete the file to rebuild it")
+        return G2Prepared([tuple(x for coeff in line for x in coeff) for line in data])
+
+    def gt_to_json(self, x: Tuple[int, ...]) -> list:
+        return list(x)
+
+    def gt_from_json(self, data: list) -> Tuple[int, ...]:
+        if len(data) != 12:
+            raise ValueError(f"invalid GT element: {len(data)} coefficients, expected 12")
+        return tuple(data)
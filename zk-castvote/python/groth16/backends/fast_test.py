@@ -0,0 +1,172 @@
+import random
+
+import pytest
+from py_ecc.bn128 import FQ12, G1, G2, curve_order, final_exponentiate, pairing
+from py_ecc.bn128.bn128_curve import multiply
+
+from benchmarks.fixtures import CLAIM_DIGEST, SEAL
+from .. import backends
+from ..parameters import control_signals, get_verifier_parameters2
+from ..seal import decode_seal
+from ..seal_test import twist_point_outside_g2
+from ..utils import split_digest
+from ..verifier import verify_groth16, verify_integrity
+from ..vk import _vk
+from . import load_backend
+from . import fast as fast_module
+from .fast import P, from_flat, to_flat
+from .reference import from_py_ecc_g1, from_py_ecc_g2, to_py_ecc_g1, to_py_ecc_g2
+
+
+fast = load_backend("fast")
+reference = load_backend("py_ecc")
+
+G1_INTS = from_py_ecc_g1(G1)
+G2_INTS = from_py_ecc_g2(G2)
+
+
+def _gt(backend, x):
+    return backend.gt_to_json(x)
+
+
+def test_g1_ops_match_reference():
+    for k in (0, 1, 2, 3, 2**128 + 7, curve_order - 1, curve_order + 5):
+        assert fast.g1_mul(_vk.Alpha, k) == reference.g1_mul(_vk.Alpha, k)
+    for p, q in ((_vk.IC[0], _vk.IC[1]), (_vk.IC[2], _vk.IC[2]), (_vk.IC[3], fast.g1_neg(_vk.IC[3])), (None, _vk.IC[4])):
+        assert fast.g1_add(p, q) == reference.g1_add(p, q)
+    scalars = [1, 2**200 + 3, 0, curve_order - 2, 77, 5]
+    assert fast.g1_msm(_vk.IC, scalars) == reference.g1_msm(_vk.IC, scalars)
+
+
+def test_on_curve_matches_reference():
+    bad_g1 = (_vk.Alpha[0], (_vk.Alpha[1] + 1) % P)
+    bad_g2 = (_vk.Beta[0], (_vk.Beta[1][0], (_vk.Beta[1][1] + 1) % P))
+    for p in (_vk.Alpha, bad_g1, None):
+        assert fast.g1_is_on_curve(p) == reference.g1_is_on_curve(p)
+    for q in (_vk.Beta, _vk.Delta, bad_g2, None):
+        assert fast.g2_is_on_curve(q) == reference.g2_is_on_curve(q)
+
+
+def test_g2_subgroup_check_matches_reference():
+    outside = twist_point_outside_g2()
+    assert fast.g2_is_on_curve(outside)
+    for q in (_vk.Beta, G2_INTS, outside):
+        assert fast.g2_is_in_subgroup(q) == reference.g2_is_in_subgroup(q)
+    assert not fast.g2_is_in_subgroup(outside)
+
+
+def test_decode_matches_reference():
+    a, b = SEAL[4:68], SEAL[68:196]
+    assert fast.decode_g1(a) == reference.decode_g1(a)
+    assert fast.decode_g2(b) == reference.decode_g2(b)
+    with pytest.raises(ValueError, match="not on the curve"):
+        fast.decode_g1(a[:63] + bytes([a[63] ^ 1]))
+    with pytest.raises(ValueError, match="not in the field"):
+        fast.decode_g1(P.to_bytes(32, 'big') + a[32:])
+    assert fast.decode_g1(bytes(64)) is None
+    assert fast.decode_g2(bytes(128)) is None
+
+
+def _random_fp12(rng):
+    return from_flat([rng.randrange(P) for _ in range(12)])
+
+
+def _flat(x):
+    return FQ12(list(to_flat(x)))
+
+
+def test_tower_ops_match_flat_fp12():
+    rng = random.Random(12)
+    a, b = _random_fp12(rng), _random_fp12(rng)
+    assert from_flat(to_flat(a)) == a
+    assert _flat(fast_module._f12_mul(a, b)) == _flat(a) * _flat(b)
+    assert _flat(fast_module._f12_sqr(a)) == _flat(a) ** 2
+    assert fast_module._f12_mul(a, fast_module._f12_inv(a)) == fast_module.FP12_ONE
+    frob = fast_module._f12_frobenius
+    assert _flat(frob(a, 1)) == _flat(a) ** P
+    assert frob(frob(a, 1), 1) == frob(a, 2) and frob(frob(a, 2), 1) == frob(a, 3)
+    assert frob(frob(a, 3), 3) == fast_module._f12_conj(a)
+
+
+def test_final_exponentiation_matches_py_ecc():
+    f = _random_fp12(random.Random(56))
+    easy = fast_module.final_exponentiate_easy(f)
+    # Granger-Scott squaring holds in the cyclotomic subgroup only
+    assert fast_module._cyclotomic_sqr(easy) == fast_module._f12_sqr(easy)
+    assert fast_module._cyclotomic_sqr(f) != fast_module._f12_sqr(f)
+    assert list(to_flat(fast_module.final_exponentiate(f))) == [c.n for c in final_exponentiate(_flat(f)).coeffs]
+
+
+def test_sparse_line_product_matches_dense():
+    rng = random.Random(34)
+    f = _random_fp12(rng)
+    px, py = _vk.IC[1]
+    s, c, d = ((rng.randrange(P), rng.randrange(P)) for _ in range(3))
+    # -py + s px w + c w^3, d py + s px w + c w^3 and px + d w^2 as dense tower elements
+    dense = [
+        (s + c, ((-py % P, 0, 0, 0, 0, 0), (s[0] * px % P, s[1] * px % P) + c + (0, 0))),
+        (d + s + c, ((d[0] * py % P, d[1] * py % P, 0, 0, 0, 0), (s[0] * px % P, s[1] * px % P) + c + (0, 0))),
+        (d, ((px, 0) + d + (0, 0), (0,) * 6)),
+    ]
+    for line, element in dense:
+        assert fast_module._mul_by_line(f, line, px, py) == fast_module._f12_mul(f, element)
+
+
+def test_pairing_matches_py_ecc():
+    # The VK's (Alpha, Beta) and the sample seal's (A, B)
+    proof = decode_seal(SEAL[4:])
+    for p, q in ((_vk.Alpha, _vk.Beta), (proof.A, proof.B)):
+        expected = pairing(to_py_ecc_g2(q), to_py_ecc_g1(p))
+        assert list(fast.multi_pairing([(p, q)])) == [c.n for c in expected.coeffs]
+        assert list(fast.multi_pairing([(p, fast.prepare_g2(q))])) == [c.n for c in expected.coeffs]
+
+
+def test_multi_pairing_matches_reference():
+    pairs = [(fast.g1_neg(_vk.Alpha), _vk.Beta), (G1_INTS, G2_INTS)]
+    assert _gt(fast, fast.multi_pairing(pairs)) == _gt(reference, reference.multi_pairing(pairs))
+
+
+def test_prepared_lines_give_same_pairing():
+    # Normalized lines (prepare_g2) and scaled ones (raw G2 points) agree
+    # once the final exponentiation is applied
+    prepared = fast.prepare_g2(_vk.Gamma)
+    restored = fast.prepared_from_json(fast.prepared_to_json(prepared))
+    assert len(prepared.lines[0]) == 4
+    assert fast.multi_pairing([(_vk.IC[0], restored)]) == fast.multi_pairing([(_vk.IC[0], _vk.Gamma)])
+    # Files from before the tower layout hold flat int lines
+    with pytest.raises(ValueError, match="older version"):
+        fast.prepared_from_json([list(line) for line in prepared.lines])
+
+
+def test_pairing_is_bilinear():
+    q3 = from_py_ecc_g2(multiply(G2, 3))
+    e = fast.multi_pairing([(fast.g1_mul(G1_INTS, 3), G2_INTS)])
+    assert e == fast.multi_pairing([(G1_INTS, q3)])
+    assert e != fast.gt_one()
+    assert fast.pairing_check([(fast.g1_mul(G1_INTS, 3), G2_INTS), (fast.g1_neg(G1_INTS), q3)])
+    assert fast.pairing_check([(None, G2_INTS), (G1_INTS, None)])
+
+
+def test_multi_pairing_rejects_invalid_points():
+    bad_g2 = (_vk.Beta[0], (_vk.Beta[1][0], (_vk.Beta[1][1] + 1) % P))
+    with pytest.raises(ValueError, match="pair 1: G2 point is not on the twist curve"):
+        fast.multi_pairing([(G1_INTS, G2_INTS), (G1_INTS, bad_g2)])
+    with pytest.raises(ValueError, match="pair 0: G1 point is not on curve"):
+        fast.multi_pairing([((1, 3), G2_INTS)])
+
+
+@pytest.mark.parametrize("name", ["fast", "py_ecc"])
+def test_verify_integrity_with_backend(name, monkeypatch):
+    monkeypatch.setattr(backends, "_backend", load_backend(name))
+    verify_integrity(get_verifier_parameters2(SEAL[:4]), SEAL[4:], CLAIM_DIGEST)
+
+
+def test_verify_groth16_unprepared_vk(monkeypatch):
+    monkeypatch.setattr(backends, "_backend", fast)
+    params = get_verifier_parameters2(SEAL[:4])
+    control0, control1, control_id = control_signals(params)
+    claim0, claim1 = (int.from_bytes(h, 'big') for h in split_digest(CLAIM_DIGEST))
+    proof = decode_seal(SEAL[4:])
+    verify_groth16(_vk, proof, [control0, control1, claim0, claim1, control_id])
+    with pytest.raises(ValueError, match="invalid proofs"):
+        verify_groth16(_vk, proof, [control0, control1, claim1, claim0, control_id])
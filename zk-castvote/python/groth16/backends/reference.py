@@ -0,0 +1,80 @@
+from typing import Optional, Sequence, Tuple
+from py_ecc.bn128 import FQ, FQ2, FQ12, curve_order
+from py_ecc.bn128.bn128_curve import (
+    add,
+    b as b1,
+    b2,
+    is_on_curve,
+    multiply,
+)
+
+from ..pairing import G2Prepared, multi_pairing, prepare_g2
+from . import G1, G2, CurveBackend
+
+
+def to_py_ecc_g1(p: G1) -> Optional[Tuple[FQ, FQ]]:
+    if p is None:
+        return None
+    return (FQ(p[0]), FQ(p[1]))
+
+
+def to_py_ecc_g2(q: G2) -> Optional[Tuple[FQ2, FQ2]]:
+    if q is None:
+        return None
+    return (FQ2(list(q[0])), FQ2(list(q[1])))
+
+
+def from_py_ecc_g1(p: Optional[Tuple[FQ, FQ]]) -> G1:
+    if p is None:
+        return None
+    return (p[0].n, p[1].n)
+
+
+def from_py_ecc_g2(q: Optional[Tuple[FQ2, FQ2]]) -> G2:
+    if q is None:
+        return None
+    return (tuple(c.n for c in q[0].coeffs), tuple(c.n for c in q[1].coeffs))
+
+
+class PyEccBackend(CurveBackend):
+    """Reference backend: py_ecc.bn128 field objects and the Miller loop of groth16.pairing."""
+    name = "py_ecc"
+
+    def g1_is_on_curve(self, p: G1) -> bool:
+        return is_on_curve(to_py_ecc_g1(p), b1)
+
+    def g2_is_on_curve(self, q: G2) -> bool:
+        return is_on_curve(to_py_ecc_g2(q), b2)
+
+    def g2_is_in_subgroup(self, q: G2) -> bool:
+        return multiply(to_py_ecc_g2(q), curve_order) is None
+
+    def g1_add(self, p: G1, q: G1) -> G1:
+        return from_py_ecc_g1(add(to_py_ecc_g1(p), to_py_ecc_g1(q)))
+
+    def g1_mul(self, p: G1, k: int) -> G1:
+        return from_py_ecc_g1(multiply(to_py_ecc_g1(p), k))
+
+    def prepare_g2(self, q: G2) -> G2Prepared:
+        return prepare_g2(to_py_ecc_g2(q))
+
+    def multi_pairing(self, pairs: Sequence[Tuple[G1, object]]) -> FQ12:
+        return multi_pairing([
+            (to_py_ecc_g1(p), q if isinstance(q, G2Prepared) else to_py_ecc_g2(q))
+            for p, q in pairs
+        ])
+
+    def gt_one(self) -> FQ12:
+        return FQ12.one()
+
+    def prepared_to_json(self, prepared: G2Prepared) -> list:
+        return prepared.to_json()
+
+    def prepared_from_json(self, data: list) -> G2Prepared:
+        return G2Prepared.from_json(data)
+
+    def gt_to_json(self, x: FQ12) -> list:
+        return [c.n for c in x.coeffs]
+
+    def gt_from_json(self, data: list) -> FQ12:
+        return FQ12(data)
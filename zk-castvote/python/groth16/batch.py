@@ -0,0 +1,130 @@
+import secrets
+from time import perf_counter
+from typing import List, Optional, Sequence, Tuple
+
+from risc0.risc0 import VerifierParameters
+from . import timing
+from .backends import CURVE_ORDER
+from .msm import (
+    batch_to_affine,
+    fixed_base_msm,
+    jacobian_add,
+    jacobian_multiply,
+    to_jacobian,
+    JACOBIAN_ZERO,
+)
+from .parameters import control_signals
+from .seal import decode_seal, ProofPairingData
+from .utils import split_digest
+from .verifier import verify_decoded
+from .vk import PreparedVerifyingKey, get_prepared_vk
+
+
+BatchItem = Tuple[VerifierParameters, bytes, bytes]
+
+# Bit length of the random weights; a batch containing an invalid proof
+# passes with probability at most 2^-WEIGHT_BITS.
+WEIGHT_BITS = 128
+
+
+class _Decoded:
+    """A batch item after decoding, ready to be combined."""
+    def __init__(self, index: int, params: VerifierParameters, proof: ProofPairingData, signals: List[int]):
+        self.index = index
+        self.params = params
+        self.proof = proof
+        self.signals = signals
+
+
+def _decode_item(index: int, params: VerifierParameters, seal: bytes, claim_digest: bytes) -> _Decoded:
+    """Decode an item; raise the ValueError verify_integrity would for a malformed one."""
+    try:
+        proof = decode_seal(seal)
+    except Exception as e:
+        raise ValueError(f"Failed to decode seal: {e}") from e
+    try:
+        control0, control1, control_id = control_signals(params)
+        claim0, claim1 = split_digest(claim_digest)
+    except Exception as e:
+        raise ValueError(f"Failed to split digests: {e}") from e
+    signals = [control0, control1, int.from_bytes(claim0, 'big'), int.from_bytes(claim1, 'big'), control_id]
+    for i, signal in enumerate(signals):
+        if signal >= CURVE_ORDER:
+            raise ValueError(f"Groth16 verification failed: input value {i} is not in the fields: {signal} >= {CURVE_ORDER}")
+    return _Decoded(index, params, proof, signals)
+
+
+def _batch_holds(pvk: PreparedVerifyingKey, items: Sequence[_Decoded]) -> bool:
+    """Check all Groth16 equations at once with random weights r_i:
+
+        prod e(r_i A_i, B_i) * e(-(sum r_i) Alpha, Beta)
+            * e(-sum r_i vkX_i, Gamma) * e(-sum r_i C_i, Delta) == 1
+
+    N + 3 Miller loops and a single final exponentiation. The weighted points
+    are kept in Jacobian coordinates and normalized with one inversion.
+    """
+    vk = pvk.vk
+    backend = pvk.backend
+    weighted_a = []
+    r_sum = 0
+    ic_scalars = [0] * len(pvk.ic_tables)
+    c_acc = JACOBIAN_ZERO
+    for item in items:
+        r = secrets.randbits(WEIGHT_BITS) | 1
+        r_sum += r
+        for j, signal in enumerate(item.signals):
+            ic_scalars[j] += r * signal
+        weighted_a.append(jacobian_multiply(to_jacobian(item.proof.A), r))
+        c_acc = jacobian_add(c_acc, jacobian_multiply(to_jacobian(item.proof.C), r))
+
+    # sum r_i vkX_i = (sum r_i) IC[0] + sum_j (sum_i r_i s_ij) IC[j+1]
+    r_sum %= CURVE_ORDER
+    ic_scalars = [s % CURVE_ORDER for s in ic_scalars]
+    start = perf_counter()
+    vk_x_acc = fixed_base_msm(pvk.ic_tables, ic_scalars, jacobian_multiply(to_jacobian(vk.IC[0]), r_sum))
+    timing.observe("vk_x_msm", start)
+    alpha_acc = jacobian_multiply(to_jacobian(vk.Alpha), r_sum)
+
+    affine = batch_to_affine(weighted_a + [alpha_acc, vk_x_acc, c_acc])
+    pairs = [(a, item.proof.B) for a, item in zip(affine, items)]
+    alpha_sum, vk_x_sum, c_sum = affine[len(items):]
+    pairs.append((backend.g1_neg(alpha_sum), pvk.beta))
+    pairs.append((backend.g1_neg(vk_x_sum), pvk.gamma))
+    pairs.append((backend.g1_neg(c_sum), pvk.delta))
+    return backend.pairing_check(pairs)
+
+
+def verify_batch(items: Sequence[BatchItem]) -> List[Optional[ValueError]]:
+    """Verify many (params, seal, claim_digest) proofs together.
+
+    Returns one entry per item, in order: None if the proof is valid, or the
+    ValueError verify_integrity raises for it. Valid batches cost one
+    multi-pairing; a failing batch is bisected so each invalid proof still
+    gets its own error.
+    """
+    results: List[Optional[ValueError]] = [None] * len(items)
+    decoded = []
+    for i, (params, seal, claim_digest) in enumerate(items):
+        try:
+            decoded.append(_decode_item(i, params, seal, claim_digest))
+        except ValueError as e:
+            results[i] = e
+
+    pvk = get_prepared_vk()
+    pending = [decoded] if decoded else []
+    while pending:
+        group = pending.pop()
+        if len(group) == 1:
+            # The single Groth16 check, on the proof decoded above
+            item = group[0]
+            try:
+                verify_decoded(item.params, item.proof, item.signals[2], item.signals[3])
+            except ValueError as e:
+                results[item.index] = e
+            continue
+        if _batch_holds(pvk, group):
+            continue
+        mid = len(group) // 2
+        pending.append(group[mid:])
+        pending.append(group[:mid])
+    return results
@@ -0,0 +1,53 @@
+from benchmarks.fixtures import CLAIM_DIGEST, SEAL
+from . import timing
+from .batch import verify_batch
+from .parameters import get_verifier_parameters2
+from .verifier import verify_integrity
+
+
+def test_verify_batch():
+    p = get_verifier_parameters2(SEAL[:4])
+    assert verify_batch([(p, SEAL[4:], CLAIM_DIGEST), (p, SEAL[4:], CLAIM_DIGEST)]) == [None, None]
+
+
+def test_verify_batch_reports_invalid_items():
+    p = get_verifier_parameters2(SEAL[:4])
+    wrong_claim = bytes([CLAIM_DIGEST[0] ^ 1]) + CLAIM_DIGEST[1:]
+    results = verify_batch([
+        (p, SEAL[4:], CLAIM_DIGEST),
+        (p, SEAL[4:], wrong_claim),
+        (p, SEAL[4:-1], CLAIM_DIGEST),
+    ])
+    assert results[0] is None
+    assert "invalid proofs" in str(results[1])
+    assert "invalid seal length" in str(results[2])
+
+
+def _integrity_error(params, seal, claim_digest):
+    try:
+        verify_integrity(params, seal, claim_digest)
+    except ValueError as e:
+        return str(e)
+    return None
+
+
+def test_verify_batch_errors_match_verify_integrity():
+    p = get_verifier_parameters2(SEAL[:4])
+    wrong_claim = bytes([CLAIM_DIGEST[0] ^ 1]) + CLAIM_DIGEST[1:]
+    off_curve = SEAL[4:67] + bytes([SEAL[67] ^ 1]) + SEAL[68:]
+    items = [(p, SEAL[4:], wrong_claim), (p, SEAL[4:-1], CLAIM_DIGEST), (p, off_curve, CLAIM_DIGEST), (p, SEAL[4:], b"\x01")]
+    for item in items:
+        assert str(verify_batch([item])[0]) == _integrity_error(*item)
+    assert [str(e) for e in verify_batch(items)] == [_integrity_error(*item) for item in items]
+
+
+def test_batch_of_one_decodes_once():
+    p = get_verifier_parameters2(SEAL[:4])
+    stages = []
+    previous = timing._observer
+    timing.set_observer(lambda stage, seconds: stages.append(stage))
+    try:
+        assert verify_batch([(p, SEAL[4:], CLAIM_DIGEST)]) == [None]
+    finally:
+        timing.set_observer(previous)
+    assert stages.count("decode_seal") == 1
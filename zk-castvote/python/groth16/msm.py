@@ -0,0 +1,169 @@
+from typing import List, Optional, Sequence, Tuple
+
+
+P = 21888242871839275222246405745257275088696311157297823662689037894645226208583
+
+# Jacobian coordinates (X, Y, Z) represent the affine point (X/Z^2, Y/Z^3);
+# Z == 0 is the point at infinity. Curve: y^2 = x^3 + 3 (a = 0).
+Jacobian = Tuple[int, int, int]
+Affine = Tuple[int, int]
+
+JACOBIAN_ZERO: Jacobian = (1, 1, 0)
+
+
+def to_jacobian(pt: Optional[Affine]) -> Jacobian:
+    if pt is None:
+        return JACOBIAN_ZERO
+    return (pt[0], pt[1], 1)
+
+
+def from_jacobian(pt: Jacobian) -> Optional[Affine]:
+    """Normalize to affine coordinates (None for infinity)."""
+    x, y, z = pt
+    if z == 0:
+        return None
+    zinv = pow(z, -1, P)
+    zinv2 = zinv * zinv % P
+    return (x * zinv2 % P, y * zinv2 * zinv % P)
+
+
+def jacobian_double(pt: Jacobian) -> Jacobian:
+    """dbl-2009-l: 2M + 5S, no inversion."""
+    x1, y1, z1 = pt
+    if z1 == 0 or y1 == 0:
+        return JACOBIAN_ZERO
+    a = x1 * x1 % P
+    b = y1 * y1 % P
+    c = b * b % P
+    d = 2 * ((x1 + b) * (x1 + b) - a - c) % P
+    e = 3 * a % P
+    x3 = (e * e - 2 * d) % P
+    y3 = (e * (d - x3) - 8 * c) % P
+    z3 = 2 * y1 * z1 % P
+    return (x3, y3, z3)
+
+
+def jacobian_add(p1: Jacobian, p2: Jacobian) -> Jacobian:
+    """add-2007-bl: 11M + 5S, no inversion."""
+    x1, y1, z1 = p1
+    x2, y2, z2 = p2
+    if z1 == 0:
+        return p2
+    if z2 == 0:
+        return p1
+    z1z1 = z1 * z1 % P
+    z2z2 = z2 * z2 % P
+    u1 = x1 * z2z2 % P
+    u2 = x2 * z1z1 % P
+    s1 = y1 * z2 * z2z2 % P
+    s2 = y2 * z1 * z1z1 % P
+    h = (u2 - u1) % P
+    r = 2 * (s2 - s1) % P
+    if h == 0:
+        return jacobian_double(p1) if r == 0 else JACOBIAN_ZERO
+    i = 4 * h * h % P
+    j = h * i % P
+    v = u1 * i % P
+    x3 = (r * r - j - 2 * v) % P
+    y3 = (r * (v - x3) - 2 * s1 * j) % P
+    z3 = ((z1 + z2) * (z1 + z2) - z1z1 - z2z2) * h % P
+    return (x3, y3, z3)
+
+
+def jacobian_add_affine(p1: Jacobian, p2: Affine) -> Jacobian:
+    """madd-2007-bl: 7M + 4S, no inversion; p2 must not be infinity."""
+    x1, y1, z1 = p1
+    x2, y2 = p2
+    if z1 == 0:
+        return (x2, y2, 1)
+    z1z1 = z1 * z1 % P
+    u2 = x2 * z1z1 % P
+    s2 = y2 * z1 * z1z1 % P
+    h = (u2 - x1) % P
+    r = 2 * (s2 - y1) % P
+    if h == 0:
+        return jacobian_double(p1) if r == 0 else JACOBIAN_ZERO
+    hh = h * h % P
+    i = 4 * hh
+    j = h * i % P
+    v = x1 * i % P
+    x3 = (r * r - j - 2 * v) % P
+    y3 = (r * (v - x3) - 2 * y1 * j) % P
+    z3 = ((z1 + h) * (z1 + h) - z1z1 - hh) % P
+    return (x3, y3, z3)
+
+
+def jacobian_multiply(pt: Jacobian, k: int) -> Jacobian:
+    """Double-and-add k * pt for a variable base, most significant bit first."""
+    acc = JACOBIAN_ZERO
+    for bit in bin(k)[2:]:
+        acc = jacobian_double(acc)
+        if bit == '1':
+            acc = jacobian_add(acc, pt)
+    return acc
+
+
+def batch_to_affine(points: Sequence[Jacobian]) -> List[Optional[Affine]]:
+    """Normalize many points with a single field inversion (Montgomery's trick)."""
+    prefix = []
+    acc = 1
+    for _, _, z in points:
+        prefix.append(acc)
+        if z != 0:
+            acc = acc * z % P
+    inv = pow(acc, -1, P)
+    out: List[Optional[Affine]] = [None] * len(points)
+    for i in range(len(points) - 1, -1, -1):
+        x, y, z = points[i]
+        if z == 0:
+            continue
+        zinv = inv * prefix[i] % P
+        inv = inv * z % P
+        zinv2 = zinv * zinv % P
+        out[i] = (x * zinv2 % P, y * zinv2 * zinv % P)
+    return out
+
+
+class FixedBaseTable:
+    """Precomputed multiples of a fixed G1 point for windowed scalar multiplication.
+
+    Row j holds d * 2^(window * j) * base for d = 1 .. 2^window - 1 in affine
+    form, so k * base is one mixed addition per non-zero window of k and no
+    doublings.
+    """
+    def __init__(self, base: Affine, window: int = 4, bits: int = 256):
+        self.window = window
+        self.mask = (1 << window) - 1
+        rows = (bits + window - 1) // window
+        points = []
+        row_base = to_jacobian(base)
+        for _ in range(rows):
+            acc = row_base
+            for _ in range(self.mask):
+                points.append(acc)
+                acc = jacobian_add(acc, row_base)
+            row_base = acc  # 2^window * row_base
+        affine = batch_to_affine(points)
+        self.rows = [affine[r * self.mask:(r + 1) * self.mask] for r in range(rows)]
+
+    def accumulate(self, acc: Jacobian, k: int) -> Jacobian:
+        """Return acc + k * base."""
+        for row in self.rows:
+            if k == 0:
+                break
+            d = k & self.mask
+            if d:
+                pt = row[d - 1]
+                if pt is not None:
+                    acc = jacobian_add_affine(acc, pt)
+            k >>= self.window
+        if k:
+            raise ValueError("scalar too large for fixed-base table")
+        return acc
+
+
+def fixed_base_msm(tables: Sequence[FixedBaseTable], scalars: Sequence[int], acc: Jacobian = JACOBIAN_ZERO) -> Jacobian:
+    """Return acc + sum(scalars[i] * tables[i].base) in Jacobian coordinates."""
+    for table, k in zip(tables, scalars):
+        acc = table.accumulate(acc, k)
+    return acc
@@ -0,0 +1,28 @@
+from py_ecc.bn128 import curve_order
+from py_ecc.bn128.bn128_curve import add, multiply
+
+from .backends.reference import from_py_ecc_g1, to_py_ecc_g1
+from .msm import FixedBaseTable, fixed_base_msm, from_jacobian, jacobian_multiply, to_jacobian
+from .vk import _vk
+
+
+def test_fixed_base_msm_matches_py_ecc():
+    scalars = [0, 1, 2**128 - 1, curve_order - 1, 0xdeadbeef]
+    tables = [FixedBaseTable(ic) for ic in _vk.IC[1:]]
+    expected = to_py_ecc_g1(_vk.IC[0])
+    for ic, k in zip(_vk.IC[1:], scalars):
+        expected = add(expected, multiply(to_py_ecc_g1(ic), k))
+    actual = from_jacobian(fixed_base_msm(tables, scalars, to_jacobian(_vk.IC[0])))
+    assert actual == from_py_ecc_g1(expected)
+
+
+def test_fixed_base_table_infinity():
+    table = FixedBaseTable((1, 2))
+    assert from_jacobian(table.accumulate(to_jacobian(None), curve_order)) is None
+    assert from_jacobian(table.accumulate(to_jacobian((1, 2)), curve_order - 1)) is None
+
+
+def test_jacobian_multiply_matches_py_ecc():
+    for k in (0, 1, 2, 2**128 + 12345, curve_order - 1):
+        expected = from_py_ecc_g1(multiply(to_py_ecc_g1(_vk.Alpha), k))
+        assert from_jacobian(jacobian_multiply(to_jacobian(_vk.Alpha), k)) == expected
@@ -0,0 +1,162 @@
+from time import perf_counter
+from typing import List, Optional, Sequence, Tuple, Union
+from py_ecc.bn128 import FQ, FQ2, FQ12
+from py_ecc.bn128.bn128_curve import (
+    add,
+    b as b1,
+    b2,
+    double,
+    is_on_curve,
+    twist,
+)
+from py_ecc.bn128.bn128_pairing import (
+    ate_loop_count,
+    log_ate_loop_count,
+    final_exponentiate,
+    field_modulus,
+)
+
+from . import timing
+
+
+G1Point = Optional[Tuple[FQ, FQ]]
+G2Point = Optional[Tuple[FQ2, FQ2]]
+
+# A line through points of the twisted curve, evaluated at a G1 point P as
+#   slope * P.x + const - P.y   (vertical=False)
+#   P.x + const                 (vertical=True)
+# slope and const are FQ12 coefficient tuples.
+Line = Tuple[Tuple[int, ...], Tuple[int, ...], bool]
+
+
+def _miller_schedule() -> List[bool]:
+    """Steps of the optimal ate Miller loop; True means "square f first".
+
+    One doubling step per bit of ate_loop_count, an addition step after each
+    set bit, then the two Frobenius addition steps.
+    """
+    steps = []
+    for i in range(log_ate_loop_count, -1, -1):
+        steps.append(True)
+        if ate_loop_count & (2**i):
+            steps.append(False)
+    steps.extend([False, False])
+    return steps
+
+
+_SCHEDULE = _miller_schedule()
+
+
+class G2Prepared:
+    """Miller-loop line coefficients of a fixed G2 point, one per step of _SCHEDULE."""
+    def __init__(self, lines: List[Line]):
+        if len(lines) != len(_SCHEDULE):
+            raise ValueError(f"invalid prepared G2 point: {len(lines)} lines, expected {len(_SCHEDULE)}")
+        self.lines = lines
+
+    def to_json(self) -> list:
+        return [[list(slope), list(const), vertical] for slope, const, vertical in self.lines]
+
+    @classmethod
+    def from_json(cls, data: list) -> "G2Prepared":
+        return cls([(tuple(slope), tuple(const), bool(vertical)) for slope, const, vertical in data])
+
+
+def _coeffs(x: FQ12) -> Tuple[int, ...]:
+    return tuple(c.n for c in x.coeffs)
+
+
+def _line(R1: Tuple[FQ12, FQ12], R2: Tuple[FQ12, FQ12]) -> Line:
+    """Coefficients of py_ecc's linefunc(R1, R2, .), independent of the evaluation point."""
+    x1, y1 = R1
+    x2, y2 = R2
+    if x1 != x2:
+        m = (y2 - y1) / (x2 - x1)
+    elif y1 == y2:
+        m = 3 * x1**2 / (2 * y1)
+    else:
+        return (_coeffs(FQ12.one()), _coeffs(-x1), True)
+    # m * (xt - x1) - (yt - y1) = m * xt + (y1 - m * x1) - yt
+    return (_coeffs(m), _coeffs(y1 - m * x1), False)
+
+
+def prepare_g2(Q: Tuple[FQ2, FQ2]) -> G2Prepared:
+    """Precompute the Miller-loop lines of a G2 point.
+
+    Same doubling/addition sequence as py_ecc's bn128_pairing.miller_loop; only
+    the evaluation at the G1 point is left for miller_loop().
+    """
+    Qt = twist(Q)
+    R = Qt
+    lines = []
+    for i in range(log_ate_loop_count, -1, -1):
+        lines.append(_line(R, R))
+        R = double(R)
+        if ate_loop_count & (2**i):
+            lines.append(_line(R, Qt))
+            R = add(R, Qt)
+    Q1 = (Qt[0] ** field_modulus, Qt[1] ** field_modulus)
+    nQ2 = (Q1[0] ** field_modulus, -Q1[1] ** field_modulus)
+    lines.append(_line(R, Q1))
+    R = add(R, Q1)
+    lines.append(_line(R, nQ2))
+    return G2Prepared(lines)
+
+
+def _evaluate(line: Line, px: int, py: int) -> FQ12:
+    slope, const, vertical = line
+    if vertical:
+        coeffs = list(const)
+        coeffs[0] += px
+    else:
+        coeffs = [(s * px + c) % field_modulus for s, c in zip(slope, const)]
+        coeffs[0] -= py
+    return FQ12(coeffs)
+
+
+def miller_loop(pairs: Sequence[Tuple[Tuple[FQ, FQ], G2Prepared]]) -> FQ12:
+    """Product of the Miller loops of several (G1 point, prepared G2 point) pairs.
+
+    The loops run in lockstep so the accumulator is squared once per doubling
+    step for all pairs. The final exponentiation is left to the caller.
+    """
+    points = [(p[0].n, p[1].n, q.lines) for p, q in pairs]
+    f = FQ12.one()
+    for k, square in enumerate(_SCHEDULE):
+        if square:
+            f = f * f
+        for px, py, lines in points:
+            f = f * _evaluate(lines[k], px, py)
+    return f
+
+
+def multi_pairing(pairs: Sequence[Tuple[G1Point, Union[G2Point, G2Prepared]]]) -> FQ12:
+    """Compute prod e(P_i, Q_i) for the given (G1, G2) pairs.
+
+    Pairs are given in Go's PairingCheck order (G1 first). Q_i may be a
+    G2Prepared for fixed points. All Miller loops are multiplied together in
+    FQ12 and a single final exponentiation is applied to the product.
+    """
+    start = perf_counter()
+    prepared = []
+    for i, (p, q) in enumerate(pairs):
+        if p is None or q is None:
+            # e(O, Q) = e(P, O) = 1
+            continue
+        if not is_on_curve(p, b1):
+            raise ValueError(f"pair {i}: G1 point is not on curve")
+        if not isinstance(q, G2Prepared):
+            if not is_on_curve(q, b2):
+                raise ValueError(f"pair {i}: G2 point is not on the twist curve")
+            q = prepare_g2(q)
+        prepared.append((p, q))
+    f = miller_loop(prepared)
+    start = timing.observe("miller_loop", start)
+    f = final_exponentiate(f)
+    timing.observe("final_exponentiation", start)
+    return f
+
+
+def pairing_check(pairs: Sequence[Tuple[G1Point, Union[G2Point, G2Prepared]]]) -> bool:
+    """Check that prod e(P_i, Q_i) == 1 for the given (G1, G2) pairs."""
+    return multi_pairing(pairs) == FQ12.one()
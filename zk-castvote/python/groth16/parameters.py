@@ -1,29 +1,34 @@
-import hashlib
-from typing import Optional, Dict
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Tuple
 from risc0.risc0 import VerifierParameters, get_verifier_parameters as risc0_get_verifier_parameters
-from .vk import vk_digest
-from .utils import sha256, sha256_bytes
+from .backends import CURVE_ORDER
+from .msm import Jacobian, fixed_base_msm, to_jacobian
+from .vk import PreparedVerifyingKey, get_prepared_vk, vk_digest
+from .utils import sha256, sha256_bytes, split_digest, reverse_byte_order_uint256
 
 
-# selector -> verifier parameters
-_risc0_selector_verifier_parameters: Dict[bytes, VerifierParameters] = {}
+# Public signals are [control0, control1, claim0, claim1, bn254_control_id];
+# these indices depend only on the verifier parameters.
+CONTROL_SIGNAL_INDICES = (0, 1, 4)
 
+# Domain tag of the selector hash
+VERIFIER_PARAMETERS_TAG = sha256_bytes(b"risc0.Groth16ReceiptVerifierParameters")
 
-def _init_selector_parameters():
-    """Initialize selector to verifier parameters mapping."""
-    global _risc0_selector_verifier_parameters
-    verifier_params = risc0_get_verifier_parameters()  # Call the risc0 function (no args)
-    _risc0_selector_verifier_parameters = {}
-    for params in verifier_params.values():
-        selector = calculate_selector(params)
-        _risc0_selector_verifier_parameters[selector] = params
+
+@dataclass(frozen=True)
+class SelectorEntry:
+    """A known selector: its verifier parameters and their fixed public signals."""
+    selector: bytes
+    versions: Tuple[str, ...]
+    params: VerifierParameters
+    signals: Tuple[int, int, int]  # in CONTROL_SIGNAL_INDICES order
 
 
 def calculate_selector(params: VerifierParameters) -> bytes:
     """Calculate the selector from the verifier parameters."""
     data = bytearray(130)
-    tag = sha256_bytes(b"risc0.Groth16ReceiptVerifierParameters")
-    data[0:32] = tag
+    data[0:32] = VERIFIER_PARAMETERS_TAG
     data[32:64] = params.control_root
     data[64:96] = params.bn254_control_id
     data[96:128] = vk_digest
@@ -32,19 +37,80 @@ def calculate_selector(params: VerifierParameters) -> bytes:
     return h[:4]
 
 
+def _compute_control_signals(params: VerifierParameters) -> Tuple[int, int, int]:
+    control0, control1 = split_digest(params.control_root)
+    return (
+        int.from_bytes(control0, 'big'),
+        int.from_bytes(control1, 'big'),
+        int.from_bytes(reverse_byte_order_uint256(params.bn254_control_id), 'big'),
+    )
+
+
+def _build_selector_table() -> Mapping[bytes, SelectorEntry]:
+    """Selector -> entry for every RISC Zero version; versions sharing parameters share an entry."""
+    versions: Dict[bytes, List[str]] = {}
+    params_by_selector: Dict[bytes, VerifierParameters] = {}
+    for version, params in risc0_get_verifier_parameters().items():
+        selector = calculate_selector(params)
+        versions.setdefault(selector, []).append(version)
+        params_by_selector.setdefault(selector, params)
+    return MappingProxyType({
+        selector: SelectorEntry(selector, tuple(versions[selector]), params, _compute_control_signals(params))
+        for selector, params in params_by_selector.items()
+    })
+
+
+# selector -> entry, built once at import and never modified
+SELECTORS: Mapping[bytes, SelectorEntry] = _build_selector_table()
+
+# control_root || bn254_control_id -> entry, to find the entry of a VerifierParameters
+_entries_by_params: Mapping[bytes, SelectorEntry] = MappingProxyType({
+    entry.params.control_root + entry.params.bn254_control_id: entry for entry in SELECTORS.values()
+})
+
+# selector -> IC[0] + vk_x terms of the control signals, for the prepared vk it was computed with
+_risc0_selector_control_vk_x: Dict[bytes, Tuple[PreparedVerifyingKey, Jacobian]] = {}
+
+
+def _entry_of(params: VerifierParameters) -> Optional[SelectorEntry]:
+    return _entries_by_params.get(params.control_root + params.bn254_control_id)
+
+
 def get_verifier_parameters(selector: bytes) -> Optional[VerifierParameters]:
     """Get verifier parameters corresponding to the given selector."""
-    if len(_risc0_selector_verifier_parameters) == 0:
-        _init_selector_parameters()
-    
-    if len(selector) < 4:
-        return None
-    
-    selector_4 = selector[:4]
-    return _risc0_selector_verifier_parameters.get(selector_4)
+    entry = SELECTORS.get(bytes(selector[:4]))
+    return entry.params if entry is not None else None
 
 
 def get_verifier_parameters2(selector: bytes) -> Optional[VerifierParameters]:
     """Get verifier parameters corresponding to the given selector (flexible length)."""
     return get_verifier_parameters(selector)
 
+
+def control_signals(params: VerifierParameters) -> Tuple[int, int, int]:
+    """Public signals fixed by the verifier parameters, in CONTROL_SIGNAL_INDICES order."""
+    entry = _entry_of(params)
+    return entry.signals if entry is not None else _compute_control_signals(params)
+
+
+def get_control_vk_x(params: VerifierParameters) -> Jacobian:
+    """IC[0] plus the vk_x terms of the control signals, cached per selector.
+
+    Only the claim digest signals then remain to be added per proof.
+    """
+    pvk = get_prepared_vk()
+    entry = _entry_of(params)
+    selector = entry.selector if entry is not None else calculate_selector(params)
+    cached = _risc0_selector_control_vk_x.get(selector)
+    if cached is not None and cached[0] is pvk:
+        return cached[1]
+
+    signals = control_signals(params)
+    for i, signal in zip(CONTROL_SIGNAL_INDICES, signals):
+        if signal >= CURVE_ORDER:
+            raise ValueError(f"input value {i} is not in the fields: {signal} >= {CURVE_ORDER}")
+    tables = [pvk.ic_tables[i] for i in CONTROL_SIGNAL_INDICES]
+    vk_x = fixed_base_msm(tables, signals, to_jacobian(pvk.vk.IC[0]))
+    _risc0_selector_control_vk_x[selector] = (pvk, vk_x)
+    return vk_x
+
@@ -0,0 +1,25 @@
+import pytest
+
+from benchmarks.fixtures import SEAL
+from risc0.risc0 import get_verifier_parameters as risc0_get_verifier_parameters
+from .parameters import (
+    SELECTORS,
+    _compute_control_signals,
+    calculate_selector,
+    control_signals,
+    get_verifier_parameters2,
+)
+
+
+def test_selector_table():
+    versions = risc0_get_verifier_parameters()
+    assert {calculate_selector(p) for p in versions.values()} == set(SELECTORS)
+    assert sum(len(entry.versions) for entry in SELECTORS.values()) == len(versions)
+    entry = SELECTORS[SEAL[:4]]
+    assert entry.versions == ("1.1",)
+    assert get_verifier_parameters2(SEAL) is entry.params
+    assert get_verifier_parameters2(b"\x00\x00\x00\x00") is None
+    assert get_verifier_parameters2(SEAL[:3]) is None
+    assert control_signals(entry.params) == _compute_control_signals(entry.params)
+    with pytest.raises(TypeError):
+        SELECTORS[b"new!"] = entry
@@ -1,61 +1,59 @@
-from typing import Tuple
-from py_ecc.bn128 import FQ, FQ2
-from py_ecc.bn128.bn128_curve import (
-    b as b1,
-    is_on_curve as g1_is_on_curve,
-)
+from time import perf_counter
+from typing import Union
+
+from . import timing
+from .backends import G1, G2, get_backend
+
+
+# A (64 bytes) || B (128 bytes) || C (64 bytes)
+SEAL_LENGTH = 256
 
 
 class ProofPairingData:
-    """Proof pairing data structure."""
-    def __init__(self, a: Tuple[FQ, FQ], b: Tuple[FQ2, FQ2], c: Tuple[FQ, FQ]):
+    """Proof pairing data structure; points in the backends' int form."""
+    __slots__ = ("A", "B", "C")
+
+    def __init__(self, a: G1, b: G2, c: G1):
         self.A = a
         self.B = b
         self.C = c
 
 
-def decode_seal(seal: bytes) -> ProofPairingData:
+def decode_seal(seal: Union[bytes, bytearray, memoryview]) -> ProofPairingData:
     """Decode seal bytes into proof pairing data.
     
     The seal format matches Go's bn256.Unmarshal format:
     - A (G1): 64 bytes (32 bytes x, 32 bytes y)
     - B (G2): 128 bytes (32 bytes x1, 32 bytes x2, 32 bytes y1, 32 bytes y2)
     - C (G1): 64 bytes (32 bytes x, 32 bytes y)
+    
+    A and C must be on the curve, B on the twist and in G2; none of them may
+    be the point at infinity. Coordinates are read in place through a
+    memoryview, one int.from_bytes each, without copying the seal.
     """
-    if len(seal) != 256:
-        raise ValueError(f"invalid seal length: {len(seal)}, expected 256")
+    if len(seal) != SEAL_LENGTH:
+        raise ValueError(f"invalid seal length: {len(seal)}, expected {SEAL_LENGTH}")
     
+    start = perf_counter()
+    backend = get_backend()
+    view = memoryview(seal)
     try:
-        # Extract A (G1 point, 64 bytes)
-        a_bytes = seal[0:64]
-        a_x = FQ(int.from_bytes(a_bytes[0:32], 'big'))
-        a_y = FQ(int.from_bytes(a_bytes[32:64], 'big'))
-        a = (a_x, a_y)
-        
-        # Extract B (G2 point, 128 bytes)
-        b_bytes = seal[64:192]
-        # Go's bn256 marshaling stores the FQ2 coefficients in order (imaginary, real).
-        # Reconstruct FQ2 elements accordingly: [real, imaginary].
-        b_x_im = FQ(int.from_bytes(b_bytes[0:32], 'big'))
-        b_x_re = FQ(int.from_bytes(b_bytes[32:64], 'big'))
-        b_y_im = FQ(int.from_bytes(b_bytes[64:96], 'big'))
-        b_y_re = FQ(int.from_bytes(b_bytes[96:128], 'big'))
-        b = (FQ2([b_x_re, b_x_im]), FQ2([b_y_re, b_y_im]))
-        
-        # Extract C (G1 point, 64 bytes)
-        c_bytes = seal[192:256]
-        c_x = FQ(int.from_bytes(c_bytes[0:32], 'big'))
-        c_y = FQ(int.from_bytes(c_bytes[32:64], 'big'))
-        c = (c_x, c_y)
-        
-        # Validate points are on the curve
-        if not g1_is_on_curve(a, b1):
-            raise ValueError(f"A is not a valid G1 point: ({a_x}, {a_y})")
-        if not g1_is_on_curve(c, b1):
-            raise ValueError(f"C is not a valid G1 point: ({c_x}, {c_y})")
-        
-        # Note: G2 point validation happens during pairing operations
-        return ProofPairingData(a, b, c)
+        # Cheap checks first: field range and curve equation of A and C,
+        # then B's twist equation and G2 subgroup membership
+        a = _decode_point("A", "G1", backend.decode_g1, view[0:64])
+        c = _decode_point("C", "G1", backend.decode_g1, view[192:256])
+        b = _decode_point("B", "G2", backend.decode_g2, view[64:192])
     except Exception as e:
         raise ValueError(f"Failed to decode seal: {e}") from e
+    timing.observe("decode_seal", start)
+    return ProofPairingData(a, b, c)
+
 
+def _decode_point(name: str, group: str, decode, chunk: memoryview):
+    try:
+        point = decode(chunk)
+    except ValueError as e:
+        raise ValueError(f"{name} is not a valid {group} point: {e}") from e
+    if point is None:
+        raise ValueError(f"{name} is the point at infinity")
+    return point
@@ -0,0 +1,70 @@
+import pytest
+
+from benchmarks.fixtures import SEAL
+from .backends.fast import B2, P, _f2_mul, _f2_sqr
+from .seal import decode_seal
+
+
+PROOF = SEAL[4:]
+
+
+def _sqrt(a):
+    """Square root in Fp (p = 3 mod 4), or None."""
+    r = pow(a, (P + 1) // 4, P)
+    return r if r * r % P == a % P else None
+
+
+def _f2_sqrt(a):
+    """Square root in Fp2, or None."""
+    n = _sqrt((a[0] * a[0] + a[1] * a[1]) % P)
+    if n is None:
+        return None
+    for t in (n, P - n):
+        x0 = _sqrt((a[0] + t) * pow(2, -1, P) % P)
+        if x0:
+            x = (x0, a[1] * pow(2 * x0, -1, P) % P)
+            if _f2_sqr(x) == (a[0] % P, a[1] % P):
+                return x
+    return None
+
+
+def twist_point_outside_g2():
+    """A point on the twist y^2 = x^3 + b' that is not in G2."""
+    for k in range(1, 100):
+        x = (k, 1)
+        xxx = _f2_mul(_f2_sqr(x), x)
+        y = _f2_sqrt(((xxx[0] + B2[0]) % P, (xxx[1] + B2[1]) % P))
+        if y is not None:
+            return (x, y)
+
+
+def _encode_g2(q):
+    (x_re, x_im), (y_re, y_im) = q
+    return b"".join(v.to_bytes(32, 'big') for v in (x_im, x_re, y_im, y_re))
+
+
+def test_decode_seal():
+    proof = decode_seal(PROOF)
+    assert proof.A == (int.from_bytes(PROOF[0:32], 'big'), int.from_bytes(PROOF[32:64], 'big'))
+    assert proof.B[0] == (int.from_bytes(PROOF[96:128], 'big'), int.from_bytes(PROOF[64:96], 'big'))
+
+
+def test_decode_seal_from_view():
+    vote = memoryview(b"\x00" * 4 + PROOF)[4:]
+    proof, expected = decode_seal(vote), decode_seal(PROOF)
+    assert (proof.A, proof.B, proof.C) == (expected.A, expected.B, expected.C)
+    assert not hasattr(proof, "__dict__")
+
+
+@pytest.mark.parametrize("seal, message", [
+    (bytes(64) + PROOF[64:], "A is the point at infinity"),
+    (PROOF[:192] + bytes(64), "C is the point at infinity"),
+    (PROOF[:64] + bytes(128) + PROOF[192:], "B is the point at infinity"),
+    (PROOF[:63] + bytes([PROOF[63] ^ 1]) + PROOF[64:], "A is not a valid G1 point: .* is not on the curve"),
+    (PROOF[:64] + b"\xff" * 32 + PROOF[96:], "B is not a valid G2 point: coordinate is not in the field"),
+    (PROOF[:191] + bytes([PROOF[191] ^ 1]) + PROOF[192:], "B is not a valid G2 point: point is not on the twist curve"),
+    (PROOF[:64] + _encode_g2(twist_point_outside_g2()) + PROOF[192:], "B is not a valid G2 point: point is not in the G2 subgroup"),
+])
+def test_decode_seal_rejects(seal, message):
+    with pytest.raises(ValueError, match=message):
+        decode_seal(seal)
@@ -0,0 +1,36 @@
+"""Per-stage timings of vote verification, reported to an optional observer.
+
+Instrumented code calls observe(stage, start) when a stage ends; with no
+observer set this costs one perf_counter() call. The observer is set by the
+process that exports the timings (utils.metrics).
+"""
+from contextlib import contextmanager
+from time import perf_counter
+from typing import Callable, Iterator, Optional
+
+# Called with (stage, seconds) for every finished stage
+_observer: Optional[Callable[[str, float], None]] = None
+
+
+def set_observer(observer: Optional[Callable[[str, float], None]]) -> None:
+    global _observer
+    _observer = observer
+
+
+def observe(stage: str, start: float) -> float:
+    """Report the stage that began at start (a perf_counter() value); return the time now."""
+    now = perf_counter()
+    if _observer is not None:
+        _observer(stage, now - start)
+    return now
+
+
+@contextmanager
+def paused() -> Iterator[None]:
+    """Report no stages inside the block, for work that is timed where it is repeated."""
+    global _observer
+    observer, _observer = _observer, None
+    try:
+        yield
+    finally:
+        _observer = observer
@@ -1,56 +1,64 @@
 import os
-from typing import List
-from py_ecc.bn128 import FQ, FQ2, FQ12, curve_order
-from py_ecc.bn128.bn128_curve import (
-    add as g1_add,
-    multiply as g1_multiply,
-    neg as g1_neg,
-    Z1 as g1_zero,
-)
-from py_ecc.bn128.bn128_pairing import pairing
+from time import perf_counter
+from typing import List, Optional
 
 from risc0.risc0 import VerifierParameters
+from . import timing
+from .backends import CURVE_ORDER, G1, get_backend
 from .seal import decode_seal, ProofPairingData
-from .vk import _vk
-from .utils import split_digest, reverse_byte_order_uint256
+from .msm import fixed_base_msm, from_jacobian, to_jacobian
+from .parameters import control_signals, get_control_vk_x
+from .vk import PreparedVerifyingKey, get_prepared_vk
+from .utils import split_digest
 
 
 # Field order
-Q = curve_order
+Q = CURVE_ORDER
 
 
 def verify_groth16(vk, proof: ProofPairingData, inputs: List[int]) -> None:
-    """Verify Groth16 zkSNARK proof."""
+    """Verify Groth16 zkSNARK proof.
+
+    vk may be a VK or a PreparedVerifyingKey; the latter skips the Miller-loop
+    line computations for Gamma and Delta and the whole e(-Alpha, Beta) pairing.
+    A plain VK is checked with the selected backend's group operations.
+    """
+    prepared = None
+    backend = get_backend()
+    if isinstance(vk, PreparedVerifyingKey):
+        prepared, vk = vk, vk.vk
     if len(inputs) + 1 != len(vk.IC):
         raise ValueError(f"len(inputs)+1 != len(vk.IC): {len(inputs)+1} != {len(vk.IC)}")
     
     try:
-        # Start with zero point
-        vk_x = g1_zero
-        
-        # Compute vkX = IC[0] + sum(IC[i+1] * inputs[i])
+        # Check inputs are in field
         for i in range(len(inputs)):
-            # Check input is in field
             if inputs[i] >= Q:
                 raise ValueError(f"input value {i} is not in the fields: {inputs[i]} >= {Q}")
-            
-            # vkX += IC[i+1] * inputs[i]
-            ic_point = vk.IC[i + 1]
-            scaled = g1_multiply(ic_point, inputs[i])
-            vk_x = g1_add(vk_x, scaled)
         
-        # Add IC[0]
-        vk_x = g1_add(vk_x, vk.IC[0])
+        if prepared is not None:
+            # vkX = IC[0] + sum(IC[i+1] * inputs[i]) over the fixed-base tables
+            vk_x = from_jacobian(fixed_base_msm(prepared.ic_tables, inputs, to_jacobian(vk.IC[0])))
+        else:
+            # Compute vkX = IC[0] + sum(IC[i+1] * inputs[i]); the backend
+            # accumulates in its own coordinates and normalizes once
+            vk_x = backend.g1_msm(vk.IC, [1] + list(inputs))
     except AssertionError as e:
         raise ValueError(f"Assertion error in vkX computation: {e}") from e
     except Exception as e:
         raise ValueError(f"Error computing vkX: {e}") from e
     
+    return _verify_pairing(vk, prepared, proof, vk_x)
+
+
+def _verify_pairing(vk, prepared: Optional[PreparedVerifyingKey], proof: ProofPairingData, vk_x: G1) -> None:
+    """Pairing check of verify_groth16 once vkX is known."""
+    backend = prepared.backend if prepared is not None else get_backend()
     try:
         # Negate vkX and Alpha
-        vk_x_neg = g1_neg(vk_x)
-        alpha_neg = g1_neg(vk.Alpha)
-        c_neg = g1_neg(proof.C)
+        vk_x_neg = backend.g1_neg(vk_x)
+        alpha_neg = backend.g1_neg(vk.Alpha)
+        c_neg = backend.g1_neg(proof.C)
     except AssertionError as e:
         raise ValueError(f"Assertion error in point negation: {e}") from e
     except Exception as e:
@@ -71,44 +79,28 @@ def verify_groth16(vk, proof: ProofPairingData, inputs: List[int]) -> None:
             raise ValueError(f"G2 point {i} is None (point at infinity)")
     
     try:
-        # Perform pairing check: e(A, B) * e(-Alpha, Beta) * e(-vkX, Gamma) * e(-C, Delta) == 1
-        # Note: py_ecc pairing takes (G2, G1) while Go's PairingCheck takes (G1, G2), so we reverse
-        # Compute pairing product one at a time with better error reporting
-        try:
-            result = pairing(g2_points[0], g1_points[0])  # e(A, B)
-        except AssertionError as e:
-            raise ValueError(f"Assertion error in pairing e(A, B): {e}. This suggests the G2 point B from the seal may be invalid.") from e
-        
-        try:
-            result = result * pairing(g2_points[1], g1_points[1])  # e(-Alpha, Beta)
-        except AssertionError as e:
-            raise ValueError(f"Assertion error in pairing e(-Alpha, Beta): {e}") from e
-        
-        try:
-            result = result * pairing(g2_points[2], g1_points[2])  # e(-vkX, Gamma)
-        except AssertionError as e:
-            raise ValueError(f"Assertion error in pairing e(-vkX, Gamma): {e}") from e
-        
-        try:
-            result = result * pairing(g2_points[3], g1_points[3])  # e(-C, Delta)
-        except AssertionError as e:
-            raise ValueError(f"Assertion error in pairing e(-C, Delta): {e}") from e
+        if prepared is not None:
+            # e(A, B) * e(-vkX, Gamma) * e(-C, Delta) == e(Alpha, Beta), with the
+            # right-hand side cached in GT and precomputed lines for Gamma and Delta
+            ok = backend.multi_pairing([
+                (proof.A, proof.B),
+                (vk_x_neg, prepared.gamma),
+                (c_neg, prepared.delta),
+            ]) == prepared.alpha_beta
+        else:
+            # e(A, B) * e(-Alpha, Beta) * e(-vkX, Gamma) * e(-C, Delta) == 1
+            # The four Miller loops share a single final exponentiation.
+            ok = backend.pairing_check(list(zip(g1_points, g2_points)))
     except ValueError:
-        # Re-raise our custom ValueError
         raise
     except AssertionError as e:
         raise ValueError(f"Assertion error in pairing computation: {e}. This may indicate invalid curve points.") from e
     except Exception as e:
         raise ValueError(f"Error in pairing computation: {e}") from e
     
-    # Check if result is identity (1 in GT)
-    # In py_ecc, the pairing returns an FQ12 element, we need to check if it equals the identity
-    identity = FQ12.one()
-    # Compare FQ12 elements properly
-    # The pairing product should equal 1 (identity) for a valid proof
-    if result != identity:
-        # Provide more detailed error
-        raise ValueError(f"invalid proofs: pairing result is not identity. Result: {result}")
+    # The pairing product should equal 1 (identity in GT) for a valid proof
+    if not ok:
+        raise ValueError("invalid proofs: pairing result is not identity")
     
     return None
 
@@ -123,7 +115,7 @@ def verify_integrity(params: VerifierParameters, seal: bytes, claim_digest: byte
     
     try:
         # Split digests
-        control0, control1 = split_digest(params.control_root)
+        control0, control1, control_id = control_signals(params)
         claim0, claim1 = split_digest(claim_digest)
     except Exception as e:
         raise ValueError(f"Failed to split digests: {e}") from e
@@ -131,29 +123,39 @@ def verify_integrity(params: VerifierParameters, seal: bytes, claim_digest: byte
     try:
         # Prepare public signals
         pub_signals = [
-            int.from_bytes(control0, 'big'),
-            int.from_bytes(control1, 'big'),
+            control0,
+            control1,
             int.from_bytes(claim0, 'big'),
             int.from_bytes(claim1, 'big'),
-            int.from_bytes(reverse_byte_order_uint256(params.bn254_control_id), 'big'),
+            control_id,
         ]
         if os.environ.get("GROTH16_DEBUG") == "1":
             print("Public signals (hex):")
             for idx, ps in enumerate(pub_signals):
                 print(f"  s{idx}: {ps:032x}")
             print("Proof points:")
-            print("  A:", proof.A[0].n, proof.A[1].n)
-            print("  Bx:", proof.B[0].coeffs[0].n, proof.B[0].coeffs[1].n)
-            print("  By:", proof.B[1].coeffs[0].n, proof.B[1].coeffs[1].n)
-            print("  C:", proof.C[0].n, proof.C[1].n)
+            print("  A:", proof.A[0], proof.A[1])
+            print("  Bx:", proof.B[0][0], proof.B[0][1])
+            print("  By:", proof.B[1][0], proof.B[1][1])
+            print("  C:", proof.C[0], proof.C[1])
     except Exception as e:
         raise ValueError(f"Failed to prepare public signals: {e}") from e
     
+    verify_decoded(params, proof, pub_signals[2], pub_signals[3])
+
+
+def verify_decoded(params: VerifierParameters, proof: ProofPairingData, claim0: int, claim1: int) -> None:
+    """The Groth16 check of verify_integrity, for a decoded seal and the two
+    claim digest signals; raises the ValueError verify_integrity would."""
     try:
-        # Verify
-        verify_groth16(_vk, proof, pub_signals)
+        # Verify. The control signals' part of vkX is cached per selector, so
+        # only the two claim digest signals are multiplied in per proof.
+        pvk = get_prepared_vk()
+        start = perf_counter()
+        vk_x = fixed_base_msm(pvk.ic_tables[2:4], [claim0, claim1], get_control_vk_x(params))
+        timing.observe("vk_x_msm", start)
+        _verify_pairing(pvk.vk, pvk, proof, from_jacobian(vk_x))
     except AssertionError as e:
         raise ValueError(f"Assertion error in Groth16 verification: {e}. This may indicate invalid curve points or pairing computation failure.") from e
     except Exception as e:
         raise ValueError(f"Groth16 verification failed: {e}") from e
-
@@ -0,0 +1,19 @@
+import pytest
+
+from benchmarks.fixtures import CLAIM_DIGEST, SEAL
+from .parameters import get_verifier_parameters2
+from .verifier import verify_integrity
+
+
+
+def test_verify_integrity():
+    p = get_verifier_parameters2(SEAL[:4])
+    assert p is not None, "GetVerifierParameters2 failed"
+    verify_integrity(p, SEAL[4:], CLAIM_DIGEST)
+
+
+def test_verify_integrity_wrong_claim():
+    p = get_verifier_parameters2(SEAL[:4])
+    claim_digest = bytes([CLAIM_DIGEST[0] ^ 1]) + CLAIM_DIGEST[1:]
+    with pytest.raises(ValueError, match="invalid proofs"):
+        verify_integrity(p, SEAL[4:], claim_digest)
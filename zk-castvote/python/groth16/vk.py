@@ -1,7 +1,16 @@
-from typing import List, Tuple
-from py_ecc.bn128 import FQ, FQ2
+import json
+import logging
+import os
+import tempfile
+import threading
+from typing import List, Optional, Tuple
+from . import timing
+from .backends import CurveBackend, get_backend
+from .msm import FixedBaseTable
 from .utils import sha256, sha256_bytes, sha256_items, tagged_list, concat_bytes32
 
+logger = logging.getLogger(__name__)
+
 
 def parse_big_int(s: str) -> bytes:
     """Parse a big integer string and return as 32-byte array."""
@@ -9,13 +18,13 @@ def parse_big_int(s: str) -> bytes:
     return bi.to_bytes(32, 'big')
 
 
-def fq_from_bytes(chunk: bytes) -> FQ:
-    return FQ(int.from_bytes(chunk, 'big'))
+def fq_from_bytes(chunk: bytes) -> int:
+    return int.from_bytes(chunk, 'big')
 
 
-def fq2_from_go_chunks(chunk_im: bytes, chunk_re: bytes) -> FQ2:
-    """Go bn256 encodes FQ2 as [imaginary || real]. Convert to py_ecc format."""
-    return FQ2([fq_from_bytes(chunk_re), fq_from_bytes(chunk_im)])
+def fq2_from_go_chunks(chunk_im: bytes, chunk_re: bytes) -> Tuple[int, int]:
+    """Go bn256 encodes FQ2 as [imaginary || real]. Convert to (real, imaginary)."""
+    return (fq_from_bytes(chunk_re), fq_from_bytes(chunk_im))
 
 
 # Verification key constants
@@ -130,31 +139,138 @@ class VK:
             self.IC.append(ic_point)
 
 
-def verifier_key_digest() -> bytes:
-    """Calculate verification key digest."""
-    ics = get_ics()
-    ic_digests = []
-    for ic in ics:
-        ic_digest = sha256(concat_bytes32(ic[0], ic[1]))
-        ic_digests.append(ic_digest)
-    
-    alphas = get_alphas()
-    betas = get_betas()
-    gammas = get_gammas()
-    deltas = get_deltas()
+def _g2_go_chunks(q) -> List[bytes]:
+    """A G2 point as Go bn256 encodes it: [x.im, x.re, y.im, y.re]."""
+    (x_re, x_im), (y_re, y_im) = q
+    return [c.to_bytes(32, 'big') for c in (x_im, x_re, y_im, y_re)]
+
+
+def verifier_key_digest(vk: Optional[VK] = None) -> bytes:
+    """Calculate verification key digest, of the RISC Zero key unless vk is given."""
+    vk = vk or VK()
+    ic_digests = [sha256(concat_bytes32(x.to_bytes(32, 'big'), y.to_bytes(32, 'big'))) for x, y in vk.IC]
     
     data = bytearray()
     data.extend(sha256_bytes(b"risc0_groth16.VerifyingKey"))
-    data.extend(sha256_items(alphas[0], alphas[1]))
-    data.extend(sha256_items(betas[0], betas[1], betas[2], betas[3]))
-    data.extend(sha256_items(gammas[0], gammas[1], gammas[2], gammas[3]))
-    data.extend(sha256_items(deltas[0], deltas[1], deltas[2], deltas[3]))
+    data.extend(sha256_items(vk.Alpha[0].to_bytes(32, 'big'), vk.Alpha[1].to_bytes(32, 'big')))
+    data.extend(sha256_items(*_g2_go_chunks(vk.Beta)))
+    data.extend(sha256_items(*_g2_go_chunks(vk.Gamma)))
+    data.extend(sha256_items(*_g2_go_chunks(vk.Delta)))
     data.extend(tagged_list(sha256(b"risc0_groth16.VerifyingKey.IC"), ic_digests))
     data.extend(bytes([0x05, 0x00]))
     return sha256(bytes(data))
 
 
+class PreparedVerifyingKey:
+    """Verification key with the Miller-loop lines of Beta, Gamma and Delta
+    precomputed, the constant pairing e(Alpha, Beta) cached in GT, and
+    fixed-base tables for IC[1:] (ic_tables[i] multiplies public signal i).
+
+    Lines and GT elements are in the representation of the given backend."""
+    def __init__(self, vk: VK, backend: CurveBackend, beta, gamma, delta, alpha_beta):
+        self.vk = vk
+        self.backend = backend
+        self.ic_tables = [FixedBaseTable(ic) for ic in vk.IC[1:]]
+        self.beta = beta
+        self.gamma = gamma
+        self.delta = delta
+        self.alpha_beta = alpha_beta
+
+    @classmethod
+    def from_vk(cls, vk: VK, backend: Optional[CurveBackend] = None) -> "PreparedVerifyingKey":
+        backend = backend or get_backend()
+        beta = backend.prepare_g2(vk.Beta)
+        alpha_beta = backend.multi_pairing([(vk.Alpha, beta)])
+        return cls(vk, backend, beta, backend.prepare_g2(vk.Gamma), backend.prepare_g2(vk.Delta), alpha_beta)
+
+    def save(self, path: str) -> None:
+        """Write the prepared lines as JSON, tagged with the digest of self.vk and the backend."""
+        backend = self.backend
+        data = {
+            "vk_digest": verifier_key_digest(self.vk).hex(),
+            "backend": backend.name,
+            "beta": backend.prepared_to_json(self.beta),
+            "gamma": backend.prepared_to_json(self.gamma),
+            "delta": backend.prepared_to_json(self.delta),
+            "alpha_beta": backend.gt_to_json(self.alpha_beta),
+        }
+        # A temporary file of our own: workers warming up together may all be
+        # writing the same path
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path) or ".", prefix=f"{os.path.basename(path)}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(data, f)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    @classmethod
+    def load(cls, path: str, vk: VK, backend: Optional[CurveBackend] = None) -> "PreparedVerifyingKey":
+        """Load prepared lines written by save() for the given verification key and backend.
+
+        e(Alpha, Beta) is recomputed from the loaded Beta lines and must match
+        the stored one; a damaged file raises ValueError.
+        """
+        backend = backend or get_backend()
+        with open(path) as f:
+            data = json.load(f)
+        digest = verifier_key_digest(vk).hex()
+        if data.get("vk_digest") != digest:
+            raise ValueError(f"prepared verifying key {path} does not match vk digest {digest}")
+        if data.get("backend", "py_ecc") != backend.name:
+            raise ValueError(f"prepared verifying key {path} was built by the {data.get('backend', 'py_ecc')} backend, not {backend.name}")
+        beta = backend.prepared_from_json(data["beta"])
+        alpha_beta = backend.gt_from_json(data["alpha_beta"])
+        with timing.paused():
+            if backend.multi_pairing([(vk.Alpha, beta)]) != alpha_beta:
+                raise ValueError(f"prepared verifying key {path} is damaged: alpha_beta does not match its beta lines")
+        return cls(
+            vk,
+            backend,
+            beta,
+            backend.prepared_from_json(data["gamma"]),
+            backend.prepared_from_json(data["delta"]),
+            alpha_beta,
+        )
+
+
 # Initialize verification key and digest
 _vk = VK()
-vk_digest = verifier_key_digest()
+vk_digest = verifier_key_digest(_vk)
+
+_pvk: Optional[PreparedVerifyingKey] = None
+_pvk_lock = threading.Lock()
+
+
+def get_prepared_vk() -> PreparedVerifyingKey:
+    """Get the prepared form of _vk, building it on first use.
+
+    The cached key is rebuilt if _vk has been replaced by a different VK or
+    another backend has been selected. If
+    GROTH16_PREPARED_VK names a file, the prepared key is loaded from it, or
+    written to it after being built, so workers do not recompute the lines.
+    """
+    global _pvk
+    backend = get_backend()
+    pvk = _pvk
+    if pvk is None or pvk.vk is not _vk or pvk.backend is not backend:
+        with _pvk_lock:
+            if _pvk is None or _pvk.vk is not _vk or _pvk.backend is not backend:
+                _pvk = _load_prepared_vk(os.environ.get("GROTH16_PREPARED_VK"), backend)
+            pvk = _pvk
+    return pvk
+
+
+def _load_prepared_vk(path: Optional[str], backend: CurveBackend) -> PreparedVerifyingKey:
+    if path and os.path.exists(path):
+        try:
+            return PreparedVerifyingKey.load(path, _vk, backend)
+        except (ValueError, KeyError, TypeError) as e:
+            # Built for another key or backend, by an older version, or damaged: replace it
+            logger.warning("rebuilding prepared verifying key %s: %s", path, e)
+    pvk = PreparedVerifyingKey.from_vk(_vk, backend)
+    if path:
+        pvk.save(path)
+    return pvk
 
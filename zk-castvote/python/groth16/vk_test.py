@@ -0,0 +1,112 @@
+import json
+import threading
+
+import pytest
+from py_ecc.bn128.bn128_pairing import pairing
+
+from . import vk as vk_module
+from .backends import load_backend
+from .backends.reference import to_py_ecc_g1, to_py_ecc_g2
+from .vk import VK, PreparedVerifyingKey, _vk, get_prepared_vk
+
+
+def test_prepared_vk_save_load(tmp_path):
+    pvk = get_prepared_vk()
+    path = str(tmp_path / "pvk.json")
+    pvk.save(path)
+    loaded = PreparedVerifyingKey.load(path, _vk)
+    assert loaded.backend is pvk.backend
+    assert loaded.beta.lines == pvk.beta.lines
+    assert loaded.gamma.lines == pvk.gamma.lines
+    assert loaded.delta.lines == pvk.delta.lines
+    assert loaded.alpha_beta == pvk.alpha_beta
+
+
+def test_prepared_vk_load_rejects_other_vk(tmp_path):
+    path = tmp_path / "pvk.json"
+    path.write_text(json.dumps({"vk_digest": "00" * 32, "beta": [], "gamma": [], "delta": []}))
+    with pytest.raises(ValueError, match="does not match vk digest"):
+        PreparedVerifyingKey.load(str(path), _vk)
+
+
+def test_prepared_vk_load_rejects_other_backend(tmp_path):
+    pvk = get_prepared_vk()
+    path = str(tmp_path / "pvk.json")
+    pvk.save(path)
+    other = "py_ecc" if pvk.backend.name == "fast" else "fast"
+    with pytest.raises(ValueError, match=f"built by the {pvk.backend.name} backend"):
+        PreparedVerifyingKey.load(path, _vk, load_backend(other))
+
+
+def test_prepared_vk_alpha_beta():
+    pvk = get_prepared_vk()
+    expected = pairing(to_py_ecc_g2(_vk.Beta), to_py_ecc_g1(_vk.Alpha))
+    assert pvk.backend.gt_to_json(pvk.alpha_beta) == [c.n for c in expected.coeffs]
+
+
+def test_prepared_vk_rebuilt_for_new_vk(monkeypatch):
+    pvk = get_prepared_vk()
+    other = VK()
+    monkeypatch.setattr(vk_module, "_vk", other)
+    rebuilt = get_prepared_vk()
+    assert rebuilt is not pvk
+    assert rebuilt.vk is other
+    assert rebuilt.alpha_beta == pvk.alpha_beta
+
+
+def test_prepared_vk_concurrent_saves(tmp_path):
+    pvk = get_prepared_vk()
+    path = str(tmp_path / "pvk.json")
+    threads = [threading.Thread(target=pvk.save, args=(path,)) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert PreparedVerifyingKey.load(path, _vk).alpha_beta == pvk.alpha_beta
+    assert [p.name for p in tmp_path.iterdir()] == ["pvk.json"]
+
+
+@pytest.mark.parametrize("stale", ["other_backend", "old_format", "corrupt", "damaged", "truncated"])
+def test_unusable_prepared_vk_file_is_rebuilt(tmp_path, caplog, stale):
+    backend = get_prepared_vk().backend
+    other = load_backend("py_ecc" if backend.name == "fast" else "fast")
+    path = str(tmp_path / "pvk.json")
+    if stale == "other_backend":
+        PreparedVerifyingKey.from_vk(_vk, other).save(path)
+    elif stale == "old_format":
+        pvk = PreparedVerifyingKey.from_vk(_vk, backend)
+        pvk.save(path)
+        data = json.loads(open(path).read())
+        data["gamma"] = [[0] * 12 for _ in data["gamma"]]
+        (tmp_path / "pvk.json").write_text(json.dumps(data))
+    elif stale in ("damaged", "truncated"):
+        # Valid JSON with the right tags, but lines that do not give e(Alpha, Beta)
+        PreparedVerifyingKey.from_vk(_vk, backend).save(path)
+        data = json.loads(open(path).read())
+        if stale == "damaged":
+            data["beta"][0], data["beta"][1] = data["beta"][1], data["beta"][0]
+        else:
+            data["beta"] = data["beta"][:-1]
+        (tmp_path / "pvk.json").write_text(json.dumps(data))
+        with pytest.raises(ValueError):
+            PreparedVerifyingKey.load(path, _vk, backend)
+    else:
+        (tmp_path / "pvk.json").write_text("{")
+    with caplog.at_level("WARNING", logger=vk_module.__name__):
+        rebuilt = vk_module._load_prepared_vk(path, backend)
+    assert "rebuilding prepared verifying key" in caplog.text
+    assert rebuilt.backend is backend
+    assert PreparedVerifyingKey.load(path, _vk, backend).alpha_beta == rebuilt.alpha_beta
+
+
+def test_prepared_vk_tied_to_its_vk(tmp_path):
+    pvk = get_prepared_vk()
+    other = VK()
+    other.IC = list(reversed(other.IC))
+    path = str(tmp_path / "pvk.json")
+    PreparedVerifyingKey(other, pvk.backend, pvk.beta, pvk.gamma, pvk.delta, pvk.alpha_beta).save(path)
+    assert json.loads(open(path).read())["vk_digest"] == vk_module.verifier_key_digest(other).hex()
+    assert vk_module.verifier_key_digest(other) != vk_module.vk_digest
+    PreparedVerifyingKey.load(path, other)
+    with pytest.raises(ValueError, match="does not match vk digest"):
+        PreparedVerifyingKey.load(path, _vk)
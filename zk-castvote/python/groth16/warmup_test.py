@@ -0,0 +1,18 @@
+from .backends import get_backend
+from .parameters import SELECTORS, _risc0_selector_control_vk_x
+from .seal import decode_seal
+from .warmup import _dummy_seal, warmup
+
+
+def test_warmup_builds_every_control_vk_x():
+    timings = warmup()
+    assert set(timings) == {"backend", "prepared_vk", "control_vk_x", "verification"}
+    assert set(_risc0_selector_control_vk_x) == set(SELECTORS)
+    # Done once per process
+    assert warmup()["verification"] < 1e-3
+
+
+def test_dummy_seal_decodes():
+    proof = decode_seal(_dummy_seal())
+    assert proof.A == proof.C == (1, 2)
+    assert get_backend().g2_is_in_subgroup(proof.B)
@@ -1,4 +1,22 @@
-from .util import check_vote, VoteRequest, VoteResponse
-
-__all__ = ["check_vote", "VoteRequest", "VoteResponse"]
+from .util import check_vote, check_votes, BinaryVote, VoteRequest, VoteResponse
+from .pool import VerificationPool, QueueFullError
+from .batcher import MicroBatcher
+from .admission import AdmissionController, AdmissionRejected
+from .nullifiers import NullifierStore
+from . import stream, wire
 
+__all__ = [
+    "check_vote",
+    "check_votes",
+    "BinaryVote",
+    "VoteRequest",
+    "VoteResponse",
+    "VerificationPool",
+    "QueueFullError",
+    "MicroBatcher",
+    "AdmissionController",
+    "AdmissionRejected",
+    "NullifierStore",
+    "stream",
+    "wire",
+]
@@ -0,0 +1,108 @@
+import asyncio
+import math
+import os
+from typing import Dict, Optional
+
+from groth16 import timing
+from groth16.seal import SEAL_LENGTH
+from .batcher import MicroBatcher
+from .nullifiers import NullifierStore
+from .pool import VerificationPool
+from .util import Vote, VoteResponse, decode_vote_result, prepare_vote
+
+# How often wait_for_room() checks the pool again
+ROOM_POLL_SECONDS = 0.01
+
+
+class AdmissionRejected(Exception):
+    """A vote refused before or after verification, with the HTTP status to report."""
+    def __init__(self, status_code: int, detail: str, retry_after: Optional[float] = None):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+        self.retry_after = retry_after
+
+    @property
+    def headers(self) -> Optional[Dict[str, str]]:
+        if self.retry_after is None:
+            return None
+        return {"Retry-After": str(max(1, math.ceil(self.retry_after)))}
+
+
+class AdmissionController:
+    """Decides whether a vote may be queued for verification.
+
+    Malformed and replayed votes are refused by cheap checks before they cost
+    any pairing time; well-formed votes are refused with 503 while the pool
+    queue is full and with 429 while the expected wait exceeds max_wait. The
+    wait counts the votes still collecting in the micro-batcher, if given.
+    """
+    def __init__(self, pool: VerificationPool, nullifiers: Optional[NullifierStore] = None, max_wait: float = 30.0,
+                 batcher: Optional[MicroBatcher] = None):
+        self.pool = pool
+        self.batcher = batcher
+        self.max_wait = max_wait
+        # (poll_id, nullifier) pairs of accepted votes
+        self.nullifiers = nullifiers if nullifiers is not None else NullifierStore()
+
+    @classmethod
+    def from_env(cls, pool: VerificationPool, batcher: Optional[MicroBatcher] = None) -> "AdmissionController":
+        """CHECKVOTE_MAX_WAIT: seconds of expected queueing above which votes get 429
+        (default 30). The nullifier store is configured by NullifierStore.from_env."""
+        return cls(pool, NullifierStore.from_env(), max_wait=float(os.environ.get("CHECKVOTE_MAX_WAIT", "30")),
+                   batcher=batcher)
+
+    def precheck(self, vote: Vote) -> VoteResponse:
+        """Decode everything that does not need a pairing; raise ValueError if malformed.
+
+        Runs the hex decoding, seal length check, selector lookup and journal ABI
+        decode, and refuses a (poll_id, nullifier) pair that was already accepted.
+        These stages run again in the worker, which is where they are timed.
+        """
+        with timing.paused():
+            proof_seal = prepare_vote(vote).proof_seal
+            if len(proof_seal) != SEAL_LENGTH:
+                raise ValueError(f"Failed to decode seal: invalid seal length: {len(proof_seal)}, expected {SEAL_LENGTH}")
+            try:
+                result = decode_vote_result(vote)
+            except ValueError:
+                raise
+            except Exception as e:
+                raise ValueError(f"Failed to decode journal_abi: {e}")
+        if self.nullifiers.contains(result.poll_id, result.nullifier):
+            raise AdmissionRejected(409, f"vote already accepted for poll {result.poll_id}")
+        return result
+
+    def admit(self, votes: int = 1) -> None:
+        """Raise AdmissionRejected if `votes` more votes should not be queued now."""
+        # Votes waiting in the micro-batcher are ahead of these ones too
+        queued = self.batcher.queued if self.batcher is not None else 0
+        if self.pool.pending >= self.pool.max_queue:
+            raise AdmissionRejected(
+                503,
+                f"verification queue is full ({self.pool.pending}/{self.pool.max_queue})",
+                retry_after=self.pool.expected_wait(queued),
+            )
+        wait = self.pool.expected_wait(votes + queued)
+        if wait > self.max_wait:
+            raise AdmissionRejected(
+                429,
+                f"expected verification wait {wait:.1f}s exceeds {self.max_wait:.1f}s",
+                retry_after=wait - self.max_wait,
+            )
+
+    async def wait_for_room(self, votes: int = 1, timeout: float = 30.0) -> None:
+        """Wait until admit(votes) would pass, or for at most timeout seconds."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while loop.time() < deadline:
+            try:
+                self.admit(votes)
+                return
+            except AdmissionRejected:
+                await asyncio.sleep(min(ROOM_POLL_SECONDS, max(0.0, deadline - loop.time())))
+
+    def accept(self, result: VoteResponse) -> None:
+        """Record a verified vote; raise AdmissionRejected if its nullifier was accepted meanwhile."""
+        if not self.nullifiers.add(result.poll_id, result.nullifier):
+            raise AdmissionRejected(409, f"vote already accepted for poll {result.poll_id}")
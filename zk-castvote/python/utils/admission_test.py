@@ -0,0 +1,126 @@
+import asyncio
+
+import pytest
+
+from benchmarks.fixtures import SEAL, vote_body
+from groth16 import timing
+from .admission import AdmissionController, AdmissionRejected
+from .util import VoteRequest
+
+
+class _FakePool:
+    """The queue state AdmissionController reads, settable by the test."""
+    def __init__(self, pending=0, max_queue=8, wait=0.0):
+        self.pending = pending
+        self.max_queue = max_queue
+        self.wait = wait
+        self.asked = []
+
+    def expected_wait(self, votes=0):
+        self.asked.append(votes)
+        return self.wait
+
+
+def _vote(nullifier="admission", seal=SEAL) -> VoteRequest:
+    return VoteRequest(**vote_body(seal, nullifier=nullifier))
+
+
+def test_admit_below_limits():
+    pool = _FakePool(pending=7, wait=29.0)
+    AdmissionController(pool, max_wait=30.0).admit(votes=3)
+    assert pool.asked == [3]
+
+
+def test_full_queue_is_503_with_retry_after():
+    controller = AdmissionController(_FakePool(pending=8, max_queue=8, wait=2.3))
+    with pytest.raises(AdmissionRejected) as e:
+        controller.admit()
+    assert e.value.status_code == 503
+    assert e.value.retry_after == 2.3
+    assert e.value.headers == {"Retry-After": "3"}
+
+
+def test_long_wait_is_429_with_retry_after():
+    pool = _FakePool(wait=45.0)
+    with pytest.raises(AdmissionRejected) as e:
+        AdmissionController(pool, max_wait=30.0).admit(votes=5)
+    assert e.value.status_code == 429
+    assert pool.asked == [5]
+    assert e.value.retry_after == 15.0
+    assert e.value.headers == {"Retry-After": "15"}
+
+
+class _FakeBatcher:
+    def __init__(self, queued):
+        self.queued = queued
+
+
+def test_wait_counts_votes_in_the_batcher():
+    pool = _FakePool(pending=8, max_queue=8, wait=2.0)
+    with pytest.raises(AdmissionRejected):
+        AdmissionController(pool, batcher=_FakeBatcher(12)).admit(votes=3)
+    pool.pending = 0
+    with pytest.raises(AdmissionRejected):
+        AdmissionController(pool, batcher=_FakeBatcher(12), max_wait=1.0).admit(votes=3)
+    assert pool.asked == [12, 15]
+
+
+def test_retry_after_header_is_at_least_one_second():
+    assert AdmissionRejected(503, "full", retry_after=0.0).headers == {"Retry-After": "1"}
+    assert AdmissionRejected(409, "replayed").headers is None
+
+
+def test_wait_for_room():
+    pool = _FakePool(pending=8, max_queue=8)
+    controller = AdmissionController(pool)
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        # Gives up after the timeout
+        await controller.wait_for_room(timeout=0.05)
+        assert loop.time() - start >= 0.05
+        # Returns once the pool has room
+        loop.call_later(0.05, setattr, pool, "pending", 0)
+        start = loop.time()
+        await controller.wait_for_room(timeout=5.0)
+        assert loop.time() - start < 1.0
+        controller.admit()
+
+    asyncio.run(run())
+
+
+def test_replayed_nullifier_is_409():
+    controller = AdmissionController(_FakePool())
+    result = controller.precheck(_vote("once"))
+    controller.accept(result)
+    with pytest.raises(AdmissionRejected) as e:
+        controller.precheck(_vote("once"))
+    assert e.value.status_code == 409
+    # A replay verified concurrently is refused when it is accepted
+    with pytest.raises(AdmissionRejected) as e:
+        controller.accept(result)
+    assert e.value.status_code == 409
+    controller.precheck(_vote("other"))
+
+
+def test_precheck_rejects_malformed_votes():
+    controller = AdmissionController(_FakePool())
+    with pytest.raises(ValueError, match="invalid seal length"):
+        controller.precheck(_vote(seal=SEAL[:-1]))
+    with pytest.raises(ValueError, match="GetVerifierParameters2 failed"):
+        controller.precheck(_vote(seal=b"\xde\xad\xbe\xef" + SEAL[4:]))
+
+
+def test_precheck_is_not_timed():
+    # The worker times these stages when it verifies the vote
+    stages = []
+    previous = timing._observer
+    timing.set_observer(lambda stage, seconds: stages.append(stage))
+    try:
+        AdmissionController(_FakePool()).precheck(_vote("untimed"))
+        assert stages == []
+        timing.observe("after", 0.0)
+        assert stages == ["after"]
+    finally:
+        timing.set_observer(previous)
@@ -0,0 +1,110 @@
+import asyncio
+import os
+import time
+from typing import List, Optional, Set, Tuple
+
+from . import metrics
+from .pool import VerificationPool
+from .util import Vote, VoteResponse
+
+BATCH_DELAY = metrics.REGISTRY.register(metrics.WindowSummary(
+    "checkvote_batch_delay_seconds",
+    "Time single votes waited in the micro-batcher before being dispatched.",
+))
+
+BATCH_SIZE = metrics.REGISTRY.register(metrics.WindowSummary(
+    "checkvote_batch_size",
+    "Votes per micro-batch dispatched to the pool.",
+))
+
+
+class MicroBatcher:
+    """Groups single-vote submissions into batches that share one multi-pairing.
+
+    A vote is dispatched at once while the pool has an idle worker, so light
+    traffic waits for nothing; a batch of one is a plain pool.check_vote. While every worker is busy, votes collect for
+    up to max_wait seconds or max_batch votes, and the batch goes to the pool
+    as one check_votes task; the busier the pool, the bigger the batches.
+    Whenever one of these batches finishes, the votes collected meanwhile are
+    dispatched.
+    """
+    def __init__(self, pool: VerificationPool, max_batch: int = 32, max_wait: float = 0.005):
+        self.pool = pool
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        # (vote, future, time it was submitted)
+        self._queue: List[Tuple[Vote, asyncio.Future, float]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        # Batches being verified; the loop only keeps weak references to tasks
+        self._running: Set[asyncio.Task] = set()
+        # Batches dispatched but not yet counted in pool.pending
+        self._starting = 0
+
+    @classmethod
+    def from_env(cls, pool: VerificationPool) -> "MicroBatcher":
+        """CHECKVOTE_BATCH_MAX (default 32; 1 disables batching) and
+        CHECKVOTE_BATCH_WAIT_MS (longest wait of a vote while the pool is busy, default 5)."""
+        return cls(
+            pool,
+            max_batch=int(os.environ.get("CHECKVOTE_BATCH_MAX", "32")),
+            max_wait=float(os.environ.get("CHECKVOTE_BATCH_WAIT_MS", "5")) / 1000,
+        )
+
+    @property
+    def queued(self) -> int:
+        """Votes collected for the next batch and not yet handed to the pool."""
+        return len(self._queue)
+
+    async def check_vote(self, vote: Vote) -> VoteResponse:
+        """Verify a vote as part of the next batch; raise what check_vote would."""
+        if self.max_batch <= 1:
+            return await self.pool.check_vote(vote)
+        future = asyncio.get_running_loop().create_future()
+        self._queue.append((vote, future, time.perf_counter()))
+        self._schedule()
+        return await future
+
+    def _schedule(self) -> None:
+        if not self._queue:
+            return
+        if len(self._queue) >= self.max_batch or self.pool.pending + self._starting < self.pool.workers:
+            self._flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.max_wait, self._flush)
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._queue = self._queue[:self.max_batch], self._queue[self.max_batch:]
+        if not batch:
+            return
+        now = time.perf_counter()
+        for _, _, submitted in batch:
+            BATCH_DELAY.observe(now - submitted)
+        BATCH_SIZE.observe(len(batch))
+        self._starting += 1
+        task = asyncio.ensure_future(self._run(batch))
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+        self._schedule()
+
+    async def _run(self, batch: List[Tuple[Vote, asyncio.Future, float]]) -> None:
+        # The pool reserves its queue slot before check_votes first yields
+        self._starting -= 1
+        try:
+            if len(batch) == 1:
+                # Nothing to share a multi-pairing with: the plain single-vote check
+                results = [await self.pool.check_vote(batch[0][0])]
+            else:
+                results = await self.pool.check_votes([vote for vote, _, _ in batch])
+        except Exception as e:
+            results = [e] * len(batch)
+        for (_, future, _), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+        self._schedule()
@@ -0,0 +1,100 @@
+import asyncio
+
+import pytest
+
+from .batcher import MicroBatcher
+from .pool import QueueFullError
+
+
+class _FakePool:
+    """Records the batches it is given; each one takes `delay` seconds."""
+    def __init__(self, workers=1, delay=0.01, fail=None):
+        self.workers = workers
+        self.pending = 0
+        self.delay = delay
+        self.fail = fail
+        self.batches = []
+
+        # Votes checked on their own rather than as a batch
+        self.singles = []
+
+    async def check_votes(self, votes):
+        if self.fail is not None:
+            raise self.fail
+        self.batches.append(list(votes))
+        self.pending += 1
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.pending -= 1
+        return [ValueError(f"bad {v}") if v < 0 else v * 10 for v in votes]
+
+    async def check_vote(self, vote):
+        self.singles.append(vote)
+        [result] = await self.check_votes([vote])
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+def test_idle_pool_dispatches_at_once():
+    pool = _FakePool(workers=2)
+
+    async def run():
+        batcher = MicroBatcher(pool, max_batch=8, max_wait=1.0)
+        return await batcher.check_vote(1), await batcher.check_vote(2)
+
+    assert asyncio.run(run()) == (10, 20)
+    assert pool.batches == [[1], [2]]
+    # A batch of one is a plain check_vote
+    assert pool.singles == [1, 2]
+
+
+def test_busy_pool_collects_batches():
+    pool = _FakePool(workers=1)
+
+    async def run():
+        batcher = MicroBatcher(pool, max_batch=4, max_wait=1.0)
+        return await asyncio.gather(*(batcher.check_vote(v) for v in range(9)))
+
+    assert asyncio.run(run()) == [v * 10 for v in range(9)]
+    # The first vote finds the worker idle; the rest wait and fill whole batches
+    assert pool.batches == [[0], [1, 2, 3, 4], [5, 6, 7, 8]]
+    assert pool.singles == [0]
+
+
+def test_timer_flushes_partial_batch():
+    pool = _FakePool(workers=1, delay=1.0)
+
+    async def run():
+        batcher = MicroBatcher(pool, max_batch=8, max_wait=0.01)
+        first = asyncio.ensure_future(batcher.check_vote(1))
+        await asyncio.sleep(0)
+        second = asyncio.ensure_future(batcher.check_vote(2))
+        await asyncio.sleep(0.1)
+        assert pool.batches == [[1], [2]]
+        first.cancel()
+        second.cancel()
+
+    asyncio.run(run())
+
+
+def test_errors_reach_their_votes():
+    async def run(pool):
+        batcher = MicroBatcher(pool, max_batch=4, max_wait=0.001)
+        return await asyncio.gather(*(batcher.check_vote(v) for v in (1, -1, 2)), return_exceptions=True)
+
+    ok, bad, ok2 = asyncio.run(run(_FakePool()))
+    assert (ok, ok2) == (10, 20)
+    assert isinstance(bad, ValueError)
+
+    results = asyncio.run(run(_FakePool(fail=QueueFullError("full"))))
+    assert all(isinstance(r, QueueFullError) for r in results)
+
+
+@pytest.mark.parametrize("env, expected", [({}, (32, 0.005)), ({"CHECKVOTE_BATCH_MAX": "1", "CHECKVOTE_BATCH_WAIT_MS": "2"}, (1, 0.002))])
+def test_from_env(monkeypatch, env, expected):
+    for name, value in env.items():
+        monkeypatch.setenv(name, value)
+    batcher = MicroBatcher.from_env(_FakePool())
+    assert (batcher.max_batch, batcher.max_wait) == expected
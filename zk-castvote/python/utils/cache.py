@@ -0,0 +1,118 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple, Union
+
+
+# Rough per-entry bookkeeping cost (dict slot, tuple, key and str headers)
+ENTRY_OVERHEAD = 200
+
+
+def cache_key(selector: bytes, seal: Union[bytes, memoryview], claim_digest: bytes) -> bytes:
+    """Key of a verification outcome: SHA-256 over selector || proof seal || claim digest."""
+    h = hashlib.sha256(selector)
+    h.update(seal)
+    h.update(claim_digest)
+    return h.digest()
+
+
+class VerificationCache:
+    """Bounded LRU/TTL cache of Groth16 verification outcomes.
+
+    Values are the verification error message, or "" for a valid proof, so
+    rejected proofs are cached as well as accepted ones. With a path, entries
+    are also written to a sqlite file that outlives the process and is shared
+    by the workers of a pool. A sqlite error counts as a miss, or skips the
+    write to the file, and is counted in `errors`.
+    """
+    def __init__(
+        self,
+        max_entries: int = 100_000,
+        max_bytes: int = 64 * 1024 * 1024,
+        ttl: float = 3600.0,
+        path: Optional[str] = None,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self.bytes = 0
+        # key -> (expires_at, error)
+        self._entries: "OrderedDict[bytes, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("CREATE TABLE IF NOT EXISTS results (key BLOB PRIMARY KEY, error TEXT NOT NULL, expires REAL NOT NULL)")
+            self._db.execute("DELETE FROM results WHERE expires < ?", (time.time(),))
+
+    @classmethod
+    def from_env(cls) -> Optional["VerificationCache"]:
+        """CHECKVOTE_CACHE_SIZE (entries, 0 disables), CHECKVOTE_CACHE_BYTES,
+        CHECKVOTE_CACHE_TTL (seconds) and CHECKVOTE_CACHE_PATH (sqlite file)."""
+        max_entries = int(os.environ.get("CHECKVOTE_CACHE_SIZE", "100000"))
+        if max_entries <= 0:
+            return None
+        return cls(
+            max_entries=max_entries,
+            max_bytes=int(os.environ.get("CHECKVOTE_CACHE_BYTES", str(64 * 1024 * 1024))),
+            ttl=float(os.environ.get("CHECKVOTE_CACHE_TTL", "3600")),
+            path=os.environ.get("CHECKVOTE_CACHE_PATH") or None,
+        )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: bytes) -> Optional[str]:
+        """Cached outcome for key: None on a miss, "" if valid, else the error message."""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] >= now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                self._remove(key)
+            if self._db is not None:
+                try:
+                    row = self._db.execute("SELECT error, expires FROM results WHERE key = ?", (key,)).fetchone()
+                except sqlite3.Error:
+                    row = None
+                    self.errors += 1
+                if row is not None and row[1] >= now:
+                    self._insert(key, row[1], row[0])
+                    self.hits += 1
+                    return row[0]
+            self.misses += 1
+            return None
+
+    def put(self, key: bytes, error: Optional[str]) -> None:
+        """Record the outcome of verifying key: error None (or "") for a valid proof."""
+        expires = time.time() + self.ttl
+        error = error or ""
+        with self._lock:
+            self._insert(key, expires, error)
+            if self._db is not None:
+                try:
+                    self._db.execute("INSERT OR REPLACE INTO results (key, error, expires) VALUES (?, ?, ?)", (key, error, expires))
+                except sqlite3.Error:
+                    self.errors += 1
+
+    def _insert(self, key: bytes, expires: float, error: str) -> None:
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (expires, error)
+        self.bytes += len(key) + len(error) + ENTRY_OVERHEAD
+        while self._entries and (len(self._entries) > self.max_entries or self.bytes > self.max_bytes):
+            self._remove(next(iter(self._entries)))
+
+    def _remove(self, key: bytes) -> None:
+        _, error = self._entries.pop(key)
+        self.bytes -= len(key) + len(error) + ENTRY_OVERHEAD
@@ -0,0 +1,45 @@
+from .cache import VerificationCache, cache_key
+
+
+def test_cache_hit_miss_and_lru_eviction():
+    cache = VerificationCache(max_entries=2)
+    k1, k2, k3 = (cache_key(b"sel!", bytes([i]) * 256, bytes(32)) for i in range(3))
+    assert cache.get(k1) is None
+    cache.put(k1, None)
+    cache.put(k2, "invalid proofs")
+    assert cache.get(k1) == ""
+    cache.put(k3, None)  # evicts k2, the least recently used
+    assert cache.get(k2) is None
+    assert cache.get(k3) == ""
+    assert (cache.hits, cache.misses) == (2, 2)
+
+
+def test_cache_ttl_and_memory_limit():
+    cache = VerificationCache(ttl=-1)
+    cache.put(b"k" * 32, None)
+    assert cache.get(b"k" * 32) is None
+    assert len(cache) == 0
+
+    cache = VerificationCache(max_bytes=1000)
+    for i in range(10):
+        cache.put(bytes([i]) * 32, "x" * 100)
+    assert cache.bytes <= 1000
+    assert len(cache) < 10
+
+
+def test_cache_sqlite_tier(tmp_path):
+    path = str(tmp_path / "results.sqlite")
+    VerificationCache(path=path).put(b"k" * 32, "invalid proofs")
+    restarted = VerificationCache(path=path)
+    assert restarted.get(b"k" * 32) == "invalid proofs"
+    assert len(restarted) == 1
+
+
+def test_cache_sqlite_errors_are_misses(tmp_path):
+    cache = VerificationCache(path=str(tmp_path / "cache.sqlite"))
+    key = cache_key(b"sel!", b"\x01" * 256, bytes(32))
+    cache._db.close()
+    cache.put(key, "invalid proofs")
+    assert cache.get(key) == "invalid proofs"
+    assert cache.get(cache_key(b"sel!", b"\x02" * 256, bytes(32))) is None
+    assert (cache.hits, cache.misses, cache.errors) == (1, 1, 2)
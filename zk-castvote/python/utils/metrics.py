@@ -0,0 +1,195 @@
+"""Prometheus text-format metrics, without a client library.
+
+Stage timings are recorded through groth16.timing in whichever process does
+the work. Pool workers drain their histograms after every task and send them
+back with the result (see utils/pool.py), so /metrics in the app process
+covers all workers. Recording a stage costs a bisect and two additions.
+"""
+from bisect import bisect_left
+from collections import deque
+from typing import Callable, Deque, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from groth16 import timing
+from groth16.parameters import SELECTORS
+
+# Stage histogram bounds in seconds, 1 us to 10 s
+STAGE_BUCKETS = (
+    1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4,
+    1e-3, 2.5e-3, 5e-3, 1e-2, 2.5e-2, 5e-2, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+Labels = Tuple[str, ...]
+
+
+def _format_labels(names: Sequence[str], values: Labels, extra: str = "") -> str:
+    pairs = [f'{name}="{value}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.values: Dict[Labels, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        self.values[labels] = self.values.get(labels, 0.0) + amount
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} counter"
+        for labels, value in sorted(self.values.items()):
+            yield f"{self.name}{_format_labels(self.labelnames, labels)} {value:g}"
+
+
+class Gauge:
+    """A gauge read from a callback when the metrics are rendered."""
+    def __init__(self, name: str, help: str, read: Callable[[], Optional[float]]):
+        self.name = name
+        self.help = help
+        self.read = read
+
+    def render(self) -> Iterable[str]:
+        value = self.read()
+        if value is None:
+            return
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} gauge"
+        yield f"{self.name} {value:g}"
+
+
+class Histogram:
+    """Histogram per label value; snapshots can be drained and merged across processes."""
+    def __init__(self, name: str, help: str, labelname: str, buckets: Sequence[float]):
+        self.name = name
+        self.help = help
+        self.labelname = labelname
+        self.buckets = tuple(buckets)
+        # label -> [count per bucket (the last one is +Inf), sum]
+        self.data: Dict[str, list] = {}
+
+    def _series(self, label: str) -> list:
+        series = self.data.get(label)
+        if series is None:
+            series = self.data[label] = [[0] * (len(self.buckets) + 1), 0.0]
+        return series
+
+    def observe(self, label: str, value: float) -> None:
+        series = self._series(label)
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def drain(self) -> Dict[str, list]:
+        """The observations so far, which are then forgotten."""
+        data, self.data = self.data, {}
+        return data
+
+    def merge(self, data: Dict[str, list]) -> None:
+        for label, (counts, total) in data.items():
+            series = self._series(label)
+            series[0] = [a + b for a, b in zip(series[0], counts)]
+            series[1] += total
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        for label, (counts, total) in sorted(self.data.items()):
+            labels = f'{self.labelname}="{label}"'
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                yield f'{self.name}_bucket{{{labels},le="{bound:g}"}} {cumulative}'
+            cumulative += counts[-1]
+            yield f'{self.name}_bucket{{{labels},le="+Inf"}} {cumulative}'
+            yield f"{self.name}_sum{{{labels}}} {total:g}"
+            yield f"{self.name}_count{{{labels}}} {cumulative}"
+
+
+class WindowSummary:
+    """Quantiles over the last `window` observations, rendered as a Prometheus summary."""
+    def __init__(self, name: str, help: str, window: int = 1024, quantiles: Sequence[float] = (0.5, 0.99)):
+        self.name = name
+        self.help = help
+        self.quantiles = tuple(quantiles)
+        self.recent: Deque[float] = deque(maxlen=window)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.recent.append(value)
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> Optional[float]:
+        if not self.recent:
+            return None
+        ordered = sorted(self.recent)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} summary"
+        if self.recent:
+            for q in self.quantiles:
+                yield f'{self.name}{{quantile="{q:g}"}} {self.quantile(q):g}'
+        yield f"{self.name}_sum {self.sum:g}"
+        yield f"{self.name}_count {self.count}"
+
+
+class Registry:
+    def __init__(self):
+        self.metrics: List[object] = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        return "".join(f"{line}\n" for metric in self.metrics for line in metric.render())
+
+
+REGISTRY = Registry()
+
+STAGE_SECONDS = REGISTRY.register(Histogram(
+    "checkvote_stage_seconds",
+    "Time spent per verification stage, once per verified vote.",
+    "stage",
+    STAGE_BUCKETS,
+))
+
+VOTES = REGISTRY.register(Counter(
+    "checkvote_votes_total",
+    "Votes by outcome and by RISC Zero verifier selector.",
+    ("outcome", "selector", "version"),
+))
+
+WORKER_BUSY_SECONDS = REGISTRY.register(Counter(
+    "checkvote_worker_busy_seconds_total",
+    "Seconds the pool workers spent running verification tasks.",
+))
+
+
+def install() -> None:
+    """Record groth16 stage timings in this process."""
+    timing.set_observer(STAGE_SECONDS.observe)
+
+
+def vote_selector(vote) -> Tuple[str, str]:
+    """(selector hex, RISC Zero versions) of a vote; unknown selectors share one label."""
+    seal = getattr(vote, "seal", None)
+    try:
+        selector = bytes.fromhex(seal[:8]) if isinstance(seal, str) else bytes(seal[:4])
+    except (TypeError, ValueError):
+        return "unknown", "unknown"
+    entry = SELECTORS.get(selector)
+    if entry is None:
+        return "unknown", "unknown"
+    return selector.hex(), ", ".join(entry.versions)
+
+
+def count_vote(vote, outcome: str) -> None:
+    """Count a vote's outcome: accepted, rejected, malformed, duplicate, throttled or error."""
+    VOTES.inc(outcome, *vote_selector(vote))
@@ -0,0 +1,45 @@
+from benchmarks.fixtures import SEAL
+from groth16 import timing
+from .metrics import Counter, Histogram, Registry, vote_selector
+from .util import BinaryVote
+
+
+def test_histogram_drain_merge_and_render():
+    worker = Histogram("t_seconds", "help", "stage", (0.001, 0.01))
+    worker.observe("decode", 0.0005)
+    worker.observe("decode", 0.005)
+    worker.observe("decode", 1.0)
+    parent = Histogram("t_seconds", "help", "stage", (0.001, 0.01))
+    parent.observe("decode", 0.0001)
+    parent.merge(worker.drain())
+    assert worker.data == {}
+
+    lines = list(parent.render())
+    assert 't_seconds_bucket{stage="decode",le="0.001"} 2' in lines
+    assert 't_seconds_bucket{stage="decode",le="0.01"} 3' in lines
+    assert 't_seconds_bucket{stage="decode",le="+Inf"} 4' in lines
+    assert 't_seconds_count{stage="decode"} 4' in lines
+
+
+def test_registry_render_and_stage_observer():
+    registry = Registry()
+    votes = registry.register(Counter("votes_total", "Votes.", ("outcome",)))
+    votes.inc("accepted")
+    votes.inc("accepted")
+    stages = registry.register(Histogram("stage_seconds", "Stages.", "stage", (1.0,)))
+    timing.set_observer(stages.observe)
+    try:
+        timing.observe("decode_seal", timing.observe("hex_decode", 0.0))
+    finally:
+        timing.set_observer(None)
+    text = registry.render()
+    assert 'votes_total{outcome="accepted"} 2\n' in text
+    assert '# TYPE stage_seconds histogram\n' in text
+    assert 'stage_seconds_count{stage="decode_seal"} 1\n' in text
+
+
+def test_vote_selector():
+    vote = BinaryVote(SEAL, b"", b"", bytes(32))
+    assert vote_selector(vote) == (SEAL[:4].hex(), "1.1")
+    assert vote_selector(BinaryVote(b"\x00" * 260, b"", b"", bytes(32))) == ("unknown", "unknown")
+    assert vote_selector(None) == ("unknown", "unknown")
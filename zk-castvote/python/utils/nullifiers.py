@@ -0,0 +1,145 @@
+import hashlib
+import math
+import os
+import sqlite3
+import struct
+import threading
+from typing import Optional, Set
+
+
+def nullifier_key(poll_id: int, nullifier: str) -> bytes:
+    return poll_id.to_bytes(8, 'big') + nullifier.encode('utf-8')
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter with double hashing over SHA-256."""
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        self.bits = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hashes = max(1, round(self.bits / capacity * math.log(2)))
+        self._array = bytearray((self.bits + 7) // 8)
+
+    def _positions(self, key: bytes):
+        digest = hashlib.sha256(key).digest()
+        h1 = int.from_bytes(digest[:8], 'big')
+        h2 = int.from_bytes(digest[8:16], 'big') | 1
+        for i in range(self.hashes):
+            yield (h1 + i * h2) % self.bits
+
+    def dump(self) -> bytes:
+        return struct.pack('>QI', self.bits, self.hashes) + bytes(self._array)
+
+    def load(self, data: bytes) -> bool:
+        """Restore the bits written by dump(); False if the sizing does not match."""
+        if len(data) != 12 + len(self._array) or struct.unpack_from('>QI', data) != (self.bits, self.hashes):
+            return False
+        self._array[:] = data[12:]
+        return True
+
+    def add(self, key: bytes) -> None:
+        for pos in self._positions(key):
+            self._array[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, key: bytes) -> bool:
+        return all(self._array[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+
+class NullifierStore:
+    """Registry of accepted (poll_id, nullifier) pairs, for double-vote rejection.
+
+    Without a path, pairs are kept in an in-memory set. With a path, the exact
+    set lives in a sqlite file and only a Bloom filter is kept in memory, so
+    memory stays bounded however many nullifiers a poll has: a Bloom miss
+    answers "new" in O(1), and only a Bloom hit costs an indexed lookup.
+    add() is atomic across threads and processes sharing the file.
+
+    close() first folds in the rows other processes added to the file, then
+    writes the filter to <path>.bloom together with the last row id it
+    covers, so a restart only replays the rows added after that snapshot.
+    """
+    def __init__(self, path: Optional[str] = None, capacity: int = 10_000_000, error_rate: float = 0.001):
+        self._lock = threading.Lock()
+        self._memory: Optional[Set[bytes]] = None
+        self._db: Optional[sqlite3.Connection] = None
+        self._bloom: Optional[BloomFilter] = None
+        self._snapshot_path = f"{path}.bloom" if path else None
+        # Every row with an id up to this one is in the Bloom filter
+        self._scanned_id = 0
+        if not path:
+            self._memory = set()
+            return
+        self._bloom = BloomFilter(capacity, error_rate)
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS nullifiers (id INTEGER PRIMARY KEY, key BLOB NOT NULL UNIQUE)")
+        # Rebuild the in-memory filter: snapshot, then the rows added since
+        self._scanned_id = self._load_snapshot()
+        self._catch_up()
+
+    def _catch_up(self) -> None:
+        """Add the rows after _scanned_id, from any process, to the Bloom filter."""
+        rows = self._db.execute("SELECT id, key FROM nullifiers WHERE id > ? ORDER BY id", (self._scanned_id,))
+        for row_id, key in rows:
+            self._bloom.add(key)
+            self._scanned_id = row_id
+
+    def _load_snapshot(self) -> int:
+        try:
+            with open(self._snapshot_path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return 0
+        if len(data) < 8 or not self._bloom.load(data[8:]):
+            return 0
+        return struct.unpack_from('>Q', data)[0]
+
+    def close(self) -> None:
+        """Write the Bloom filter snapshot and close the database."""
+        with self._lock:
+            if self._db is None:
+                return
+            # Rows of other processes sharing the file are below the snapshot id too
+            self._catch_up()
+            tmp = f"{self._snapshot_path}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(struct.pack('>Q', self._scanned_id) + self._bloom.dump())
+            os.replace(tmp, self._snapshot_path)
+            self._db.close()
+            self._db = None
+
+    @classmethod
+    def from_env(cls) -> "NullifierStore":
+        """CHECKVOTE_NULLIFIER_DB (sqlite file; unset keeps nullifiers in memory)
+        and CHECKVOTE_NULLIFIER_CAPACITY (Bloom filter sizing, default 10M)."""
+        return cls(
+            path=os.environ.get("CHECKVOTE_NULLIFIER_DB") or None,
+            capacity=int(os.environ.get("CHECKVOTE_NULLIFIER_CAPACITY", "10000000")),
+        )
+
+    def __len__(self) -> int:
+        with self._lock:
+            if self._memory is not None:
+                return len(self._memory)
+            return self._db.execute("SELECT COUNT(*) FROM nullifiers").fetchone()[0]
+
+    def contains(self, poll_id: int, nullifier: str) -> bool:
+        key = nullifier_key(poll_id, nullifier)
+        with self._lock:
+            if self._memory is not None:
+                return key in self._memory
+            if key not in self._bloom:
+                return False
+            return self._db.execute("SELECT 1 FROM nullifiers WHERE key = ?", (key,)).fetchone() is not None
+
+    def add(self, poll_id: int, nullifier: str) -> bool:
+        """Record an accepted pair; False if it was already recorded."""
+        key = nullifier_key(poll_id, nullifier)
+        with self._lock:
+            if self._memory is not None:
+                if key in self._memory:
+                    return False
+                self._memory.add(key)
+                return True
+            inserted = self._db.execute("INSERT OR IGNORE INTO nullifiers (key) VALUES (?)", (key,)).rowcount == 1
+            self._bloom.add(key)
+            return inserted
@@ -0,0 +1,63 @@
+from .nullifiers import BloomFilter, NullifierStore
+
+
+def test_bloom_filter():
+    bloom = BloomFilter(1000, 0.01)
+    for i in range(1000):
+        bloom.add(str(i).encode())
+    assert all(str(i).encode() in bloom for i in range(1000))
+    false_positives = sum(str(i).encode() in bloom for i in range(1000, 11000))
+    assert false_positives < 300
+
+
+def test_nullifier_store_in_memory():
+    store = NullifierStore()
+    assert not store.contains(1, "n")
+    assert store.add(1, "n")
+    assert not store.add(1, "n")
+    assert store.contains(1, "n")
+    assert not store.contains(2, "n")
+    assert len(store) == 1
+
+
+def test_nullifier_store_persistent(tmp_path):
+    path = str(tmp_path / "nullifiers.sqlite")
+    store = NullifierStore(path, capacity=1000)
+    assert store.add(7, "abc")
+    assert not store.add(7, "abc")
+
+    restarted = NullifierStore(path, capacity=1000)
+    assert restarted.contains(7, "abc")
+    assert not restarted.contains(7, "abd")
+    assert not restarted.add(7, "abc")
+    assert restarted.add(8, "abc")
+    assert len(restarted) == 2
+
+
+def test_nullifier_store_snapshot(tmp_path):
+    path = str(tmp_path / "nullifiers.sqlite")
+    store = NullifierStore(path, capacity=1000)
+    store.add(1, "before")
+    store.close()
+    other = NullifierStore(path, capacity=1000)
+    other.add(1, "after")  # written after the snapshot, replayed on restart
+
+    restarted = NullifierStore(path, capacity=1000)
+    assert restarted.contains(1, "before")
+    assert restarted.contains(1, "after")
+    assert not restarted.contains(1, "other")
+
+
+def test_nullifier_store_snapshot_shared_file(tmp_path):
+    # Two processes share the file; the one closing last must not hide the other's rows
+    path = str(tmp_path / "nullifiers.sqlite")
+    first = NullifierStore(path, capacity=1000)
+    second = NullifierStore(path, capacity=1000)
+    second.add(1, "second")
+    first.add(1, "first")
+    second.close()
+    first.close()
+
+    restarted = NullifierStore(path, capacity=1000)
+    assert restarted.contains(1, "first")
+    assert restarted.contains(1, "second")
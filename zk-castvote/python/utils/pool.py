@@ -0,0 +1,150 @@
+import asyncio
+import math
+import multiprocessing
+import multiprocessing.synchronize
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Union
+
+from groth16.warmup import warmup
+from . import metrics
+from .util import Vote, VoteResponse, check_vote, check_votes
+
+
+# Smallest slice of a batch handed to one worker
+MIN_BATCH_CHUNK = 16
+
+# Weight of the latest task in the per-vote service time average
+SERVICE_TIME_ALPHA = 0.2
+
+
+class QueueFullError(Exception):
+    """Raised when the verification queue is at its configured depth."""
+
+
+# Longest wait of a worker for the others in VerificationPool.warmup()
+WARMUP_BARRIER_TIMEOUT = 120.0
+
+# Seconds this worker spent in warmup(), per stage
+_worker_warmup: Dict[str, float] = {}
+# Shared by the workers of a VerificationPool, see _warmup_report
+_warmup_barrier: Optional[multiprocessing.synchronize.Barrier] = None
+
+
+def _init_worker(barrier: Optional[multiprocessing.synchronize.Barrier] = None) -> None:
+    """Build the verifier state in each worker before it takes any vote.
+
+    Workers forked from a process that already ran warmup() inherit its
+    state, and only check it here. Stage timings are recorded from here on,
+    without any inherited from the parent.
+    """
+    global _warmup_barrier
+    _warmup_barrier = barrier
+    _worker_warmup.update(warmup())
+    metrics.install()
+    metrics.STAGE_SECONDS.drain()
+
+
+def _warmup_report() -> Dict[str, float]:
+    # Held until every worker has one of these tasks, so none runs two
+    if _warmup_barrier is not None:
+        _warmup_barrier.wait(WARMUP_BARRIER_TIMEOUT)
+    return {"pid": os.getpid(), **_worker_warmup}
+
+
+def _timed(fn, arg):
+    """Run fn(arg) in a worker; return (worker seconds, result or the exception
+    raised, the worker's stage timings since its last task)."""
+    start = time.perf_counter()
+    try:
+        result = fn(arg)
+    except Exception as e:
+        result = e
+    return time.perf_counter() - start, result, metrics.STAGE_SECONDS.drain()
+
+
+class VerificationPool:
+    """Runs vote verification in worker processes so the event loop stays responsive.
+
+    Pairing checks are pure-Python and CPU-bound; running them in a process
+    pool spreads them across cores instead of blocking the asyncio loop.
+    """
+    def __init__(self, workers: Optional[int] = None, max_queue: Optional[int] = None):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_queue = max_queue if max_queue is not None else 64 * self.workers
+        # Tasks submitted to the executor and not yet finished, and the votes in them
+        self.pending = 0
+        self.pending_votes = 0
+        # Moving average of worker time per vote, seeded on the first task
+        self.vote_seconds: Optional[float] = None
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_worker,
+            initargs=(multiprocessing.Barrier(self.workers),),
+        )
+
+    @classmethod
+    def from_env(cls) -> "VerificationPool":
+        """CHECKVOTE_WORKERS (default: CPU count) and CHECKVOTE_MAX_QUEUE (default: 64 per worker)."""
+        workers = int(os.environ.get("CHECKVOTE_WORKERS", "0")) or None
+        max_queue = os.environ.get("CHECKVOTE_MAX_QUEUE")
+        return cls(workers=workers, max_queue=int(max_queue) if max_queue else None)
+
+    def expected_wait(self, votes: int = 0) -> float:
+        """Estimated seconds until `votes` more votes submitted now would be verified."""
+        if self.vote_seconds is None:
+            return 0.0
+        return (self.pending_votes + votes) * self.vote_seconds / self.workers
+
+    def _reserve(self, n: int) -> None:
+        if self.pending + n > self.max_queue:
+            raise QueueFullError(f"verification queue is full ({self.pending}/{self.max_queue})")
+        self.pending += n
+
+    async def _run(self, fn, arg, votes: int):
+        self.pending_votes += votes
+        try:
+            elapsed, result, stages = await asyncio.get_running_loop().run_in_executor(self._executor, _timed, fn, arg)
+        finally:
+            self.pending -= 1
+            self.pending_votes -= votes
+        metrics.STAGE_SECONDS.merge(stages)
+        metrics.WORKER_BUSY_SECONDS.inc(amount=elapsed)
+        per_vote = elapsed / votes
+        if self.vote_seconds is None:
+            self.vote_seconds = per_vote
+        else:
+            self.vote_seconds += SERVICE_TIME_ALPHA * (per_vote - self.vote_seconds)
+        if isinstance(result, BaseException):
+            raise result
+        return result
+
+    async def warmup(self) -> List[Dict[str, float]]:
+        """Start the workers and wait until they are ready; return each one's warmup timings.
+
+        One task per worker; the tasks wait for each other on a barrier, so
+        each one runs on a different worker and every worker is started.
+        """
+        loop = asyncio.get_running_loop()
+        reports = await asyncio.gather(*(
+            loop.run_in_executor(self._executor, _warmup_report) for _ in range(self.workers)
+        ))
+        return list({report["pid"]: report for report in reports}.values())
+
+    async def check_vote(self, vote: Vote) -> VoteResponse:
+        self._reserve(1)
+        return await self._run(check_vote, vote, 1)
+
+    async def check_votes(self, votes: List[Vote]) -> List[Union[VoteResponse, ValueError]]:
+        """check_votes over the pool, one slice of the batch per worker."""
+        if not votes:
+            return []
+        size = max(MIN_BATCH_CHUNK, math.ceil(len(votes) / self.workers))
+        chunks = [votes[i:i + size] for i in range(0, len(votes), size)]
+        self._reserve(len(chunks))
+        parts = await asyncio.gather(*(self._run(check_votes, chunk, len(chunk)) for chunk in chunks))
+        return [result for part in parts for result in part]
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,86 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from . import pool as pool_module
+from .pool import QueueFullError, VerificationPool
+
+
+def _thread_pool(workers: int, max_queue: int) -> VerificationPool:
+    """A pool whose tasks run in threads, so patched check functions are used."""
+    pool = VerificationPool(workers=workers, max_queue=max_queue)
+    pool._executor.shutdown()
+    pool._executor = ThreadPoolExecutor(max_workers=workers)
+    return pool
+
+
+def test_queue_limit_and_pending(monkeypatch):
+    release = threading.Event()
+
+    def slow_check(vote):
+        release.wait(5)
+        if vote < 0:
+            raise ValueError("bad vote")
+        return vote * 10
+
+    monkeypatch.setattr(pool_module, "check_vote", slow_check)
+    pool = _thread_pool(workers=1, max_queue=2)
+
+    async def run():
+        first = asyncio.ensure_future(pool.check_vote(1))
+        second = asyncio.ensure_future(pool.check_vote(-1))
+        await asyncio.sleep(0.05)
+        assert (pool.pending, pool.pending_votes) == (2, 2)
+        with pytest.raises(QueueFullError):
+            await pool.check_vote(3)
+        assert pool.pending == 2
+        release.set()
+        assert await first == 10
+        with pytest.raises(ValueError, match="bad vote"):
+            await second
+
+    asyncio.run(run())
+    assert (pool.pending, pool.pending_votes) == (0, 0)
+    assert pool.vote_seconds is not None
+    pool.shutdown()
+
+
+@pytest.mark.parametrize("workers, votes, chunks", [
+    (3, 100, [34, 34, 32]),
+    (3, 20, [16, 4]),
+    (4, 10, [10]),
+])
+def test_check_votes_splits_into_chunks(monkeypatch, workers, votes, chunks):
+    seen = []
+
+    def fake_check_votes(chunk):
+        seen.append(len(chunk))
+        return [v * 10 for v in chunk]
+
+    monkeypatch.setattr(pool_module, "check_votes", fake_check_votes)
+    pool = _thread_pool(workers=workers, max_queue=64)
+    results = asyncio.run(pool.check_votes(list(range(votes))))
+    assert results == [v * 10 for v in range(votes)]
+    assert sorted(seen, reverse=True) == chunks
+    assert (pool.pending, pool.pending_votes) == (0, 0)
+    pool.shutdown()
+
+
+def test_check_votes_reserves_one_slot_per_chunk(monkeypatch):
+    monkeypatch.setattr(pool_module, "check_votes", lambda chunk: chunk)
+    pool = _thread_pool(workers=3, max_queue=2)
+    with pytest.raises(QueueFullError):
+        asyncio.run(pool.check_votes(list(range(100))))
+    assert pool.pending == 0
+    pool.shutdown()
+
+
+def test_warmup_starts_every_worker():
+    pool = VerificationPool(workers=2)
+    try:
+        reports = asyncio.run(pool.warmup())
+    finally:
+        pool.shutdown()
+    assert len({report["pid"] for report in reports}) == 2
@@ -0,0 +1,121 @@
+"""Streaming vote verification: NDJSON lines in, per-vote results out as they finish.
+
+iter_lines splits a chunked request body into lines; verify_stream runs a
+check on each line with at most max_in_flight lines between being read and
+their result being yielded, so memory stays bounded however long the stream
+is. Reading pauses while that window is full, and while an optional
+`ready` hook says there is no room downstream.
+"""
+import asyncio
+from typing import AsyncIterator, Awaitable, Callable, Dict, Optional, Union
+
+ORDERS = ("input", "completion")
+
+
+class LineTooLong(ValueError):
+    """A line exceeded the maximum length; it is skipped up to its newline."""
+
+
+async def iter_lines(chunks: AsyncIterator[bytes], max_line: int) -> AsyncIterator[Union[bytes, LineTooLong]]:
+    """Non-empty lines of a chunked body; an overlong line is yielded as a LineTooLong."""
+    buffer = bytearray()
+    skipping = False
+    async for chunk in chunks:
+        start = 0
+        while True:
+            end = chunk.find(b"\n", start)
+            if end < 0:
+                break
+            if not skipping:
+                buffer += chunk[start:end]
+                if len(buffer) > max_line:
+                    yield LineTooLong(f"line longer than {max_line} bytes")
+                elif buffer.strip():
+                    yield bytes(buffer)
+            buffer.clear()
+            skipping = False
+            start = end + 1
+        if not skipping:
+            buffer += chunk[start:]
+            if len(buffer) > max_line:
+                # Report once, then drop the rest of the line as it arrives
+                yield LineTooLong(f"line longer than {max_line} bytes")
+                buffer.clear()
+                skipping = True
+    if not skipping and buffer.strip():
+        yield bytes(buffer)
+
+
+async def verify_stream(
+    lines: AsyncIterator[Union[bytes, LineTooLong]],
+    check: Callable[[bytes], Awaitable[dict]],
+    max_in_flight: int,
+    order: str = "input",
+    ready: Optional[Callable[[], Awaitable[None]]] = None,
+) -> AsyncIterator[dict]:
+    """Yield {"index": i, **check(line_i)} for every line, in input or completion order.
+
+    check must return a result dict rather than raise; a LineTooLong from
+    iter_lines becomes an error result without calling it. ready, if given,
+    is awaited before each line is read, so the body is not read further
+    until it returns.
+    """
+    if order not in ORDERS:
+        raise ValueError(f"order must be one of {ORDERS}, got {order!r}")
+    window = asyncio.Semaphore(max_in_flight)
+    done: asyncio.Queue = asyncio.Queue()
+    # Completed results not yet yielded in input order, by index
+    pending: Dict[int, dict] = {}
+    tasks = set()
+
+    async def run(index: int, line: Union[bytes, LineTooLong]) -> None:
+        if isinstance(line, LineTooLong):
+            result = {"status": "error", "detail": str(line)}
+        else:
+            result = await check(line)
+        await done.put({"index": index, **result})
+
+    async def read() -> int:
+        count = 0
+        iterator = lines.__aiter__()
+        while True:
+            await window.acquire()
+            if ready is not None:
+                await ready()
+            try:
+                line = await iterator.__anext__()
+            except StopAsyncIteration:
+                return count
+            task = asyncio.create_task(run(count, line))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+            count += 1
+
+    reader = asyncio.create_task(read())
+    total: Optional[int] = None
+    next_index = 0
+    try:
+        while total is None or next_index < total:
+            if total is None and reader.done():
+                total = reader.result()
+                continue
+            get = asyncio.create_task(done.get())
+            finished, _ = await asyncio.wait({get, reader} if total is None else {get}, return_when=asyncio.FIRST_COMPLETED)
+            if get not in finished:
+                get.cancel()
+                continue
+            result = get.result()
+            if order == "completion":
+                next_index += 1
+                window.release()
+                yield result
+                continue
+            pending[result["index"]] = result
+            while next_index in pending:
+                next_index += 1
+                window.release()
+                yield pending.pop(next_index - 1)
+    finally:
+        reader.cancel()
+        for task in list(tasks):
+            task.cancel()
@@ -0,0 +1,70 @@
+import asyncio
+
+import pytest
+
+from .stream import iter_lines, verify_stream
+
+
+async def _chunks(*chunks):
+    for chunk in chunks:
+        yield chunk
+
+
+async def _collect(agen):
+    return [item async for item in agen]
+
+
+def test_iter_lines_across_chunks():
+    lines = asyncio.run(_collect(iter_lines(_chunks(b'{"a":', b'1}\n\n{"b"', b':2}\n{"c":3}'), max_line=100)))
+    assert lines == [b'{"a":1}', b'{"b":2}', b'{"c":3}']
+
+    lines = asyncio.run(_collect(iter_lines(_chunks(b"x" * 8, b"x" * 8, b"xx\nok\n"), max_line=10)))
+    assert [str(line) for line in lines[:1]] == ["line longer than 10 bytes"]
+    assert lines[1:] == [b"ok"]
+
+
+@pytest.mark.parametrize("order", ["input", "completion"])
+def test_verify_stream_order_and_window(order):
+    # Line i finishes after (5 - i) ticks, so completion order is reversed
+    in_flight = peak = 0
+
+    async def check(line):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01 * (5 - int(line)))
+        in_flight -= 1
+        return {"status": "success", "value": int(line)}
+
+    async def run():
+        lines = _chunks(*(b"%d" % i for i in range(5)))
+        return await _collect(verify_stream(lines, check, max_in_flight=3, order=order))
+
+    results = asyncio.run(run())
+    assert sorted(r["index"] for r in results) == list(range(5))
+    assert all(r["index"] == r["value"] for r in results)
+    assert peak <= 3
+    if order == "input":
+        assert [r["index"] for r in results] == list(range(5))
+    else:
+        assert [r["index"] for r in results][:2] == [2, 1]
+
+
+def test_verify_stream_waits_for_ready():
+    # Each line is read only after ready() returns
+    events = []
+
+    async def lines():
+        for i in range(3):
+            events.append(f"read {i}")
+            yield b"%d" % i
+
+    async def ready():
+        events.append("ready")
+
+    async def check(line):
+        return {"status": "success"}
+
+    results = asyncio.run(_collect(verify_stream(lines(), check, max_in_flight=2, ready=ready)))
+    assert [r["index"] for r in results] == [0, 1, 2]
+    assert events[:6] == ["ready", "read 0", "ready", "read 1", "ready", "read 2"]
@@ -1,11 +1,15 @@
 import struct
 import hashlib
-from typing import Optional
+from time import perf_counter
+from typing import List, Optional, Union
 from dataclasses import dataclass
 
-from risc0.risc0 import calculate_claim_digest
+from risc0.risc0 import VerifierParameters, calculate_claim_digest
+from groth16 import timing
+from groth16.batch import verify_batch
 from groth16.verifier import verify_integrity
 from groth16.parameters import get_verifier_parameters2
+from .cache import VerificationCache, cache_key
 
 
 @dataclass
@@ -27,6 +31,60 @@ class VoteRequest:
     is_student: bool
     poll_id: int
 
+
+@dataclass
+class BinaryVote:
+    """A vote received in the binary wire format (see utils/wire.py).
+
+    Same fields as VoteRequest, as raw bytes instead of hex; the nullifier,
+    age, is_student and poll_id are read from journal_abi.
+    """
+    seal: bytes
+    journal: bytes
+    journal_abi: bytes
+    image_id: bytes
+
+
+Vote = Union[VoteRequest, BinaryVote]
+
+
+@dataclass
+class PreparedVote:
+    """Inputs of verify_integrity decoded from a vote.
+
+    proof_seal is a view into the decoded seal, past the selector.
+    """
+    params: VerifierParameters
+    selector: bytes
+    proof_seal: memoryview
+    claim_digest: bytes
+
+    @property
+    def cache_key(self) -> bytes:
+        return cache_key(self.selector, self.proof_seal, self.claim_digest)
+
+
+# Verification outcome cache, built from the environment on first use (per process)
+_verification_cache: Optional[VerificationCache] = None
+_verification_cache_loaded = False
+
+
+def get_verification_cache() -> Optional[VerificationCache]:
+    """The process-wide VerificationCache, or None if disabled by CHECKVOTE_CACHE_SIZE=0."""
+    global _verification_cache, _verification_cache_loaded
+    if not _verification_cache_loaded:
+        _verification_cache = VerificationCache.from_env()
+        _verification_cache_loaded = True
+    return _verification_cache
+
+
+def set_verification_cache(cache: Optional[VerificationCache]) -> None:
+    """Replace the process-wide VerificationCache; None disables caching."""
+    global _verification_cache, _verification_cache_loaded
+    _verification_cache = cache
+    _verification_cache_loaded = True
+
+
 def my_sha256(input_bytes: bytes) -> bytes:
     """Calculate SHA-256 hash."""
     return hashlib.sha256(input_bytes).digest()
@@ -66,31 +124,40 @@ def decode_bincode_vote(data: bytes) -> VoteResponse:
     )
 
 
-def check_vote(vote: VoteRequest) -> VoteResponse:
-    """Check and verify a vote (optimized)."""
+def _vote_bytes(value: Union[str, bytes]) -> bytes:
+    """A vote field as bytes: hex-decoded from the JSON API, as is from the binary one."""
+    if isinstance(value, str):
+        return bytes.fromhex(value)
+    return value
+
+
+def prepare_vote(vote: Vote) -> PreparedVote:
+    """Decode a vote into the inputs of verify_integrity."""
     # Preconvert common hex fields once
+    start = perf_counter()
     try:
-        image_id = bytes.fromhex(vote.image_id)
+        image_id = _vote_bytes(vote.image_id)
         if len(image_id) != 32:
             raise ValueError(f"Invalid image_id length: {len(image_id)}")
     except Exception as e:
         raise ValueError(f"Failed to decode imageID: {e}")
 
     try:
-        journal_bytes = bytes.fromhex(vote.journal)
+        journal_bytes = _vote_bytes(vote.journal)
     except Exception as e:
         raise ValueError(f"Failed to decode journal: {e}")
 
-    # SHA256 digest of journal
-    journal_digest = hashlib.sha256(journal_bytes).digest()
-    claim_digest = calculate_claim_digest(image_id, journal_digest)
-    print(f"claimDigest: {claim_digest.hex()}")
-
     # Decode seal once
     try:
-        seal_bytes = bytes.fromhex(vote.seal)
+        seal_bytes = _vote_bytes(vote.seal)
     except Exception as e:
         raise ValueError(f"Failed to decode seal: {e}")
+    start = timing.observe("hex_decode", start)
+
+    # SHA256 digest of journal
+    journal_digest = hashlib.sha256(journal_bytes).digest()
+    claim_digest = calculate_claim_digest(image_id, journal_digest)
+    start = timing.observe("claim_digest", start)
 
     if len(seal_bytes) < 4:
         raise ValueError("Seal too short to contain selector")
@@ -99,21 +166,17 @@ def check_vote(vote: VoteRequest) -> VoteResponse:
     params = get_verifier_parameters2(selector)
     if params is None:
         raise ValueError("GetVerifierParameters2 failed")
+    timing.observe("selector_lookup", start)
 
-    # Verify integrity (skip selector in proof)
-    proof_seal = seal_bytes[4:]
+    # Skip selector in proof, without copying the seal
+    return PreparedVote(params, selector, memoryview(seal_bytes)[4:], claim_digest)
 
-    # Python Groth16 verification is expensive
-    # Avoid printing or any intermediate object creation inside verify_integrity
-    try:
-        verify_integrity(params, proof_seal, claim_digest)
-        # print("verify OK!")  # Remove prints for performance
-    except Exception as e:
-        raise ValueError(f"Verification failed: {e}")
 
-    # Decode journal ABI (bincode)
+def decode_vote_result(vote: Vote) -> VoteResponse:
+    """Decode the journal ABI of a verified vote."""
+    start = perf_counter()
     try:
-        journal_data = bytes.fromhex(vote.journal_abi)
+        journal_data = _vote_bytes(vote.journal_abi)
     except Exception as e:
         raise ValueError(f"Failed to decode journal_abi: {e}")
 
@@ -128,6 +191,7 @@ def check_vote(vote: VoteRequest) -> VoteResponse:
     is_student = struct.unpack_from('<B', journal_data, offset)[0] != 0
     offset += 1
     poll_id = struct.unpack_from('<Q', journal_data, offset)[0]
+    timing.observe("journal_abi_decode", start)
 
     return VoteResponse(
         nullifier=nullifier,
@@ -136,6 +200,71 @@ def check_vote(vote: VoteRequest) -> VoteResponse:
         poll_id=poll_id,
     )
 
+
+def check_vote(vote: Vote) -> VoteResponse:
+    """Check and verify a vote (optimized)."""
+    prepared = prepare_vote(vote)
+
+    # Retried and resubmitted ballots reuse the cached outcome
+    cache = get_verification_cache()
+    error = cache.get(prepared.cache_key) if cache is not None else None
+    if error is None:
+        # Python Groth16 verification is expensive
+        # Avoid printing or any intermediate object creation inside verify_integrity
+        try:
+            verify_integrity(prepared.params, prepared.proof_seal, prepared.claim_digest)
+            error = ""
+        except Exception as e:
+            error = str(e)
+        if cache is not None:
+            cache.put(prepared.cache_key, error)
+    if error:
+        raise ValueError(f"Verification failed: {error}")
+
+    return decode_vote_result(vote)
+
+
+def check_votes(votes: List[Vote]) -> List[Union[VoteResponse, ValueError]]:
+    """Check and verify many votes, sharing one batch pairing check.
+
+    Returns one entry per vote, in order: the decoded VoteResponse, or the
+    ValueError check_vote would have raised for that vote.
+    """
+    cache = get_verification_cache()
+    results: List[Union[VoteResponse, ValueError, None]] = [None] * len(votes)
+    errors: List[Optional[str]] = [None] * len(votes)
+    batch = []
+    batch_index = []
+    for i, vote in enumerate(votes):
+        try:
+            prepared = prepare_vote(vote)
+        except ValueError as e:
+            results[i] = e
+            continue
+        errors[i] = cache.get(prepared.cache_key) if cache is not None else None
+        if errors[i] is None:
+            batch.append(prepared)
+            batch_index.append(i)
+
+    batch_errors = verify_batch([(p.params, p.proof_seal, p.claim_digest) for p in batch])
+    for i, prepared, err in zip(batch_index, batch, batch_errors):
+        errors[i] = str(err) if err is not None else ""
+        if cache is not None:
+            cache.put(prepared.cache_key, errors[i])
+
+    for i, vote in enumerate(votes):
+        if results[i] is not None:
+            continue
+        if errors[i]:
+            results[i] = ValueError(f"Verification failed: {errors[i]}")
+            continue
+        try:
+            results[i] = decode_vote_result(vote)
+        except Exception as e:
+            results[i] = ValueError(f"Failed to decode journal_abi: {e}")
+    return results
+
+
 def verify_encrypted_data_integrity(journal: str, ciphertext: str, aad: str) -> bool:
     """Verify encrypted data integrity."""
     # Extract cipherHashCode from journal (last 64 hex chars = 32 bytes)
@@ -0,0 +1,100 @@
+"""Binary wire format for votes (Content-Type: application/octet-stream).
+
+One vote is a fixed frame, integers big-endian:
+
+    selector      4 bytes
+    seal        256 bytes   A || B || C, as in the hex API
+    image_id     32 bytes
+    journal       u32 length || bytes
+    journal_abi   u32 length || bytes
+
+A batch body is frames back to back. The hex JSON API carries the same
+fields; this form avoids the hex doubling and the bytes.fromhex calls.
+"""
+import struct
+from typing import List, Tuple, Union
+
+from groth16.seal import SEAL_LENGTH
+from .util import BinaryVote, VoteRequest
+
+CONTENT_TYPE = "application/octet-stream"
+
+SELECTOR_LENGTH = 4
+IMAGE_ID_LENGTH = 32
+# Header up to the journal length prefix
+HEADER_LENGTH = SELECTOR_LENGTH + SEAL_LENGTH + IMAGE_ID_LENGTH
+# Upper bound on journal and journal_abi, against bogus length prefixes
+MAX_FIELD_LENGTH = 1 << 20
+
+_LENGTH = struct.Struct('>I')
+
+
+def is_binary(content_type: str) -> bool:
+    return content_type.split(";")[0].strip() == CONTENT_TYPE
+
+
+def encode_vote(vote: Union[VoteRequest, BinaryVote]) -> bytes:
+    """Frame a vote; hex fields of a VoteRequest are decoded first."""
+    seal, journal, journal_abi, image_id = (
+        bytes.fromhex(v) if isinstance(v, str) else bytes(v)
+        for v in (vote.seal, vote.journal, vote.journal_abi, vote.image_id)
+    )
+    if len(seal) != SELECTOR_LENGTH + SEAL_LENGTH:
+        raise ValueError(f"seal must be {SELECTOR_LENGTH + SEAL_LENGTH} bytes with its selector, got {len(seal)}")
+    if len(image_id) != IMAGE_ID_LENGTH:
+        raise ValueError(f"image_id must be {IMAGE_ID_LENGTH} bytes, got {len(image_id)}")
+    return b"".join((
+        seal, image_id,
+        _LENGTH.pack(len(journal)), journal,
+        _LENGTH.pack(len(journal_abi)), journal_abi,
+    ))
+
+
+def _read_field(view: memoryview, offset: int, name: str) -> Tuple[bytes, int]:
+    if offset + _LENGTH.size > len(view):
+        raise ValueError(f"truncated before {name} length")
+    (length,) = _LENGTH.unpack_from(view, offset)
+    offset += _LENGTH.size
+    if length > MAX_FIELD_LENGTH:
+        raise ValueError(f"{name} length {length} exceeds {MAX_FIELD_LENGTH}")
+    if offset + length > len(view):
+        raise ValueError(f"truncated {name}: {len(view) - offset} of {length} bytes")
+    return bytes(view[offset:offset + length]), offset + length
+
+
+def read_vote(view: memoryview, offset: int) -> Tuple[BinaryVote, int]:
+    """Parse the frame starting at offset; return the vote and the offset past it."""
+    if offset + HEADER_LENGTH > len(view):
+        raise ValueError(f"truncated header: {len(view) - offset} of {HEADER_LENGTH} bytes")
+    seal = bytes(view[offset:offset + SELECTOR_LENGTH + SEAL_LENGTH])
+    offset += SELECTOR_LENGTH + SEAL_LENGTH
+    image_id = bytes(view[offset:offset + IMAGE_ID_LENGTH])
+    offset += IMAGE_ID_LENGTH
+    journal, offset = _read_field(view, offset, "journal")
+    journal_abi, offset = _read_field(view, offset, "journal_abi")
+    return BinaryVote(seal, journal, journal_abi, image_id), offset
+
+
+def decode_vote(data: bytes) -> BinaryVote:
+    """Parse one frame; raise ValueError if it is malformed or has trailing bytes."""
+    try:
+        vote, end = read_vote(memoryview(data), 0)
+    except ValueError as e:
+        raise ValueError(f"invalid vote frame: {e}") from e
+    if end != len(data):
+        raise ValueError(f"invalid vote frame: {len(data) - end} trailing bytes")
+    return vote
+
+
+def decode_votes(data: bytes) -> List[BinaryVote]:
+    """Parse a batch of back-to-back frames."""
+    view = memoryview(data)
+    votes = []
+    offset = 0
+    while offset < len(view):
+        try:
+            vote, offset = read_vote(view, offset)
+        except ValueError as e:
+            raise ValueError(f"invalid vote frame {len(votes)}: {e}") from e
+        votes.append(vote)
+    return votes
@@ -0,0 +1,56 @@
+import struct
+
+import pytest
+
+from benchmarks.fixtures import SEAL
+from .util import VoteRequest, decode_vote_result, prepare_vote
+from .wire import HEADER_LENGTH, decode_vote, decode_votes, encode_vote
+
+JOURNAL_ABI = struct.pack('<Q', 3) + b"abc" + struct.pack('<IBQ', 30, 1, 7)
+
+
+def _hex_vote() -> VoteRequest:
+    return VoteRequest(
+        seal=SEAL.hex(),
+        journal=b"journal".hex(),
+        journal_abi=JOURNAL_ABI.hex(),
+        image_id=bytes(range(32)).hex(),
+        nullifier="abc",
+        age=30,
+        is_student=True,
+        poll_id=7,
+    )
+
+
+def test_binary_vote_matches_hex_vote():
+    hex_vote = _hex_vote()
+    frame = encode_vote(hex_vote)
+    assert len(frame) == HEADER_LENGTH + 4 + 7 + 4 + len(JOURNAL_ABI)
+    vote = decode_vote(frame)
+    assert vote.seal == SEAL
+
+    prepared, expected = prepare_vote(vote), prepare_vote(hex_vote)
+    assert prepared.cache_key == expected.cache_key
+    assert prepared.claim_digest == expected.claim_digest
+    assert decode_vote_result(vote) == decode_vote_result(hex_vote)
+    assert encode_vote(vote) == frame
+
+
+def test_decode_votes_batch():
+    frame = encode_vote(_hex_vote())
+    assert len(decode_votes(frame * 3)) == 3
+    assert decode_votes(b"") == []
+    with pytest.raises(ValueError, match="invalid vote frame 1: truncated"):
+        decode_votes(frame + frame[:-1])
+
+
+@pytest.mark.parametrize("cut, message", [
+    (lambda f: f[:100], "truncated header"),
+    (lambda f: f[:HEADER_LENGTH + 2], "truncated before journal length"),
+    (lambda f: f[:-1], "truncated journal_abi"),
+    (lambda f: f + b"\x00", "1 trailing bytes"),
+    (lambda f: f[:HEADER_LENGTH] + b"\xff" * 4 + f[HEADER_LENGTH + 4:], "journal length .* exceeds"),
+])
+def test_decode_vote_rejects(cut, message):
+    with pytest.raises(ValueError, match=f"invalid vote frame: {message}"):
+        decode_vote(cut(encode_vote(_hex_vote())))
@@ -0,0 +1,295 @@
+"""Re-verify a whole vote archive offline, without the HTTP server.
+
+Run from the python/ directory:
+
+    python -m verify_archive ARCHIVE RESULTS [--format ndjson|binary] [--workers N] [--chunk N] [--fresh]
+
+ARCHIVE is NDJSON, one /checkvote request body per line, or binary vote
+frames back to back (utils/wire.py; the default for a .bin file). It is
+mmapped, cut into chunks of records, and the chunks are verified with
+check_votes in a pool of worker processes, one per core. The verification
+cache is off in the workers: every proof is verified.
+
+RESULTS receives one NDJSON line per record, in archive order: its byte
+offset, status (accepted, rejected or duplicate), selector, nullifier and
+poll id, and the error of a rejected vote. A vote whose (poll_id,
+nullifier) was already accepted earlier in the archive is a duplicate.
+RESULTS.summary.json gets the counts, overall and per selector / RISC Zero
+version.
+
+After every chunk, RESULTS.checkpoint records the archive offset reached.
+Rerunning the same command resumes from there; --fresh starts over.
+"""
+import argparse
+import json
+import mmap
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import fields
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+from groth16.parameters import SELECTORS
+from utils import wire
+from utils.nullifiers import NullifierStore
+from utils.pool import _init_worker
+from utils.util import VoteRequest, check_votes, set_verification_cache
+
+FORMATS = ("ndjson", "binary")
+
+_VOTE_FIELDS = [f.name for f in fields(VoteRequest)]
+
+# Archive mapped in this process: (path, mmap)
+_mapped: Optional[Tuple[str, Union[mmap.mmap, bytes]]] = None
+
+
+def _map(path: str) -> Union[mmap.mmap, bytes]:
+    global _mapped
+    if _mapped is None or _mapped[0] != path:
+        with open(path, "rb") as f:
+            # An empty file cannot be mapped, and has no records either
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if os.fstat(f.fileno()).st_size else b""
+        _mapped = (path, mm)
+    return _mapped[1]
+
+
+def _records(mm: mmap.mmap, fmt: str, start: int, end: int) -> Iterator[Tuple[int, int]]:
+    """(offset, end) of the records in mm[start:end]; blank NDJSON lines are skipped."""
+    offset = start
+    if fmt == "binary":
+        view = memoryview(mm)
+        try:
+            while offset < end:
+                try:
+                    _, next_offset = wire.read_vote(view, offset)
+                except ValueError as e:
+                    raise ValueError(f"invalid vote frame at offset {offset}: {e}") from e
+                yield offset, next_offset
+                offset = next_offset
+        finally:
+            view.release()
+        return
+    while offset < end:
+        newline = mm.find(b"\n", offset, end)
+        next_offset = end if newline < 0 else newline + 1
+        if mm[offset:next_offset].strip():
+            yield offset, next_offset
+        offset = next_offset
+
+
+def _chunks(mm: mmap.mmap, fmt: str, start: int, size: int) -> Iterator[Tuple[int, int, int]]:
+    """(start, end, records) ranges of up to size records each, from start to the end of the archive."""
+    chunk_start, count, end = start, 0, start
+    try:
+        for _, end in _records(mm, fmt, start, len(mm)):
+            count += 1
+            if count == size:
+                yield chunk_start, end, count
+                chunk_start, count = end, 0
+    except ValueError:
+        # The records read before a corrupt frame are still verified
+        if count:
+            yield chunk_start, end, count
+        raise
+    if count:
+        yield chunk_start, len(mm), count
+
+
+def _parse(record: bytes, fmt: str):
+    if fmt == "binary":
+        return wire.decode_vote(record)
+    data = json.loads(record)
+    if not isinstance(data, dict):
+        raise ValueError("expected a JSON object")
+    missing = [name for name in _VOTE_FIELDS if name not in data]
+    if missing:
+        raise ValueError(f"missing fields: {', '.join(missing)}")
+    return VoteRequest(**{name: data[name] for name in _VOTE_FIELDS})
+
+
+def _selector(vote) -> Optional[str]:
+    if isinstance(vote.seal, str):
+        return vote.seal[:8].lower() if len(vote.seal) >= 8 else None
+    return vote.seal[:4].hex()
+
+
+def _init_archive_worker() -> None:
+    """Worker initializer: every proof of an audit is verified again, so no
+    outcome comes from the verification cache or its shared sqlite file."""
+    set_verification_cache(None)
+    _init_worker()
+
+
+def verify_range(path: str, fmt: str, start: int, end: int) -> List[dict]:
+    """Verify the records in archive[start:end] (run in a worker)."""
+    mm = _map(path)
+    results: List[dict] = []
+    votes = []
+    for offset, record_end in _records(mm, fmt, start, end):
+        result = {"offset": offset, "status": "rejected", "selector": None}
+        results.append(result)
+        try:
+            vote = _parse(mm[offset:record_end], fmt)
+        except ValueError as e:
+            result["detail"] = f"invalid record: {e}"
+            continue
+        result["selector"] = _selector(vote)
+        votes.append((result, vote))
+
+    for (result, _), outcome in zip(votes, check_votes([vote for _, vote in votes])):
+        if isinstance(outcome, Exception):
+            result["detail"] = str(outcome)
+            continue
+        result.update(status="accepted", nullifier=outcome.nullifier, poll_id=outcome.poll_id)
+    return results
+
+
+class Summary:
+    """Counts of a run, overall and per selector."""
+    def __init__(self):
+        self.versions = {selector.hex(): ", ".join(entry.versions) for selector, entry in SELECTORS.items()}
+        self.counts = {"records": 0, "accepted": 0, "rejected": 0, "duplicate": 0}
+        self.selectors: Dict[str, Dict[str, int]] = {}
+        self.nullifiers = NullifierStore()
+
+    def add(self, result: dict) -> None:
+        """Count a result, turning an accepted vote with a known nullifier into a duplicate."""
+        if result["status"] == "accepted" and not self.nullifiers.add(result["poll_id"], result["nullifier"]):
+            result["status"] = "duplicate"
+        self.counts["records"] += 1
+        self.counts[result["status"]] += 1
+        selector = result["selector"] or "unknown"
+        if selector not in self.selectors:
+            self.selectors[selector] = {"accepted": 0, "rejected": 0, "duplicate": 0}
+        self.selectors[selector][result["status"]] += 1
+
+    def to_json(self) -> dict:
+        return {
+            **self.counts,
+            "selectors": {
+                selector: {"version": self.versions.get(selector), **counts}
+                for selector, counts in sorted(self.selectors.items())
+            },
+        }
+
+
+def _load_checkpoint(path: str, archive: str) -> Optional[dict]:
+    try:
+        with open(path) as f:
+            checkpoint = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return checkpoint if checkpoint.get("archive") == os.path.abspath(archive) else None
+
+
+def _save_checkpoint(path: str, checkpoint: dict) -> None:
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(checkpoint, f)
+    os.replace(tmp, path)
+
+
+def run(
+    archive: str,
+    results_path: str,
+    fmt: Optional[str] = None,
+    workers: Optional[int] = None,
+    chunk: int = 64,
+    fresh: bool = False,
+    limit: Optional[int] = None,
+) -> dict:
+    """Verify archive into results_path, resuming from its checkpoint; return the summary.
+
+    limit stops after about that many records (whole chunks), as an interruption would.
+    """
+    fmt = fmt or ("binary" if archive.endswith(".bin") else "ndjson")
+    if fmt not in FORMATS:
+        raise ValueError(f"format must be one of {FORMATS}, got {fmt!r}")
+    workers = workers or os.cpu_count() or 1
+    checkpoint_path = f"{results_path}.checkpoint"
+    mm = _map(archive)
+    checkpoint = None if fresh or not os.path.exists(results_path) else _load_checkpoint(checkpoint_path, archive)
+    summary = Summary()
+
+    if checkpoint is None:
+        checkpoint = {"archive": os.path.abspath(archive), "offset": 0, "results_bytes": 0}
+        out = open(results_path, "wb")
+    else:
+        # Drop results written after the checkpoint, and recount the rest
+        out = open(results_path, "r+b")
+        out.truncate(checkpoint["results_bytes"])
+        for line in out:
+            summary.add(json.loads(line))
+        out.seek(checkpoint["results_bytes"])
+
+    started = time.perf_counter()
+    resumed_from = checkpoint["offset"]
+    error = None
+    with out, ProcessPoolExecutor(max_workers=workers, initializer=_init_archive_worker) as executor:
+        inflight = deque()
+
+        def drain_one() -> None:
+            end, future = inflight.popleft()
+            lines = []
+            for result in future.result():
+                summary.add(result)
+                lines.append(json.dumps(result) + "\n")
+            out.write("".join(lines).encode())
+            out.flush()
+            os.fsync(out.fileno())
+            checkpoint.update(offset=end, results_bytes=out.tell())
+            _save_checkpoint(checkpoint_path, checkpoint)
+
+        submitted = 0
+        try:
+            for start, end, count in _chunks(mm, fmt, checkpoint["offset"], chunk):
+                if limit is not None and submitted >= limit:
+                    break
+                inflight.append((end, executor.submit(verify_range, archive, fmt, start, end)))
+                submitted += count
+                if len(inflight) >= 2 * workers:
+                    drain_one()
+        except ValueError as e:
+            # A corrupt binary frame: nothing after it can be located
+            error = str(e)
+        while inflight:
+            drain_one()
+
+    result = summary.to_json()
+    result.update(
+        complete=error is None and checkpoint["offset"] == len(mm),
+        offset=checkpoint["offset"],
+        resumed_from=resumed_from,
+        seconds=round(time.perf_counter() - started, 3),
+    )
+    if error is not None:
+        result["error"] = error
+    with open(f"{results_path}.summary.json", "w") as f:
+        json.dump(result, f, indent=2)
+    return result
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m verify_archive", description=__doc__.split("\n")[0])
+    parser.add_argument("archive")
+    parser.add_argument("results")
+    parser.add_argument("--format", choices=FORMATS, help="default: binary for .bin files, else ndjson")
+    parser.add_argument("--workers", type=int, help="worker processes (default: CPU count)")
+    parser.add_argument("--chunk", type=int, default=64, help="records per worker task (default: 64)")
+    parser.add_argument("--fresh", action="store_true", help="ignore the checkpoint and start over")
+    parser.add_argument("--limit", type=int, help="stop after about this many records")
+    args = parser.parse_args(argv)
+    try:
+        summary = run(args.archive, args.results, args.format, args.workers, args.chunk, args.fresh, args.limit)
+    except KeyboardInterrupt:
+        print(f"interrupted; rerun to resume from {args.results}.checkpoint", file=sys.stderr)
+        return 130
+    json.dump(summary, sys.stdout, indent=2)
+    print()
+    return 0 if summary["complete"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
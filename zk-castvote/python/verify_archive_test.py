@@ -0,0 +1,91 @@
+import json
+from dataclasses import asdict
+
+from benchmarks.fixtures import JOURNAL, SEAL, vote_body
+from utils import wire
+from utils.cache import VerificationCache
+from utils.util import VoteRequest, prepare_vote
+from utils.wire_test import _hex_vote
+from verify_archive import Summary, run
+
+
+def _write_archive(path, binary=False):
+    vote = _hex_vote()
+    if binary:
+        path.write_bytes(wire.encode_vote(vote) * 5)
+    else:
+        line = json.dumps(asdict(vote)) + "\n"
+        path.write_text(line * 2 + "\n" + '{"seal": "00"}\n' + line * 2)
+    return vote
+
+
+def _results(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_run_and_resume(tmp_path):
+    archive, results = tmp_path / "votes.ndjson", tmp_path / "results.ndjson"
+    vote = _write_archive(archive)
+
+    partial = run(str(archive), str(results), workers=1, chunk=2, limit=2)
+    assert not partial["complete"] and partial["records"] == 2
+
+    summary = run(str(archive), str(results), workers=1, chunk=2)
+    assert summary["complete"] and summary["resumed_from"] == partial["offset"]
+    assert (summary["records"], summary["rejected"], summary["accepted"]) == (5, 5, 0)
+    lines = _results(results)
+    assert [r["offset"] for r in lines] == sorted(r["offset"] for r in lines)
+    assert "missing fields" in lines[2]["detail"]
+    assert summary["selectors"][vote.seal[:8]] == {"version": "1.1", "accepted": 0, "rejected": 4, "duplicate": 0}
+
+    fresh = run(str(archive), str(results), workers=1, chunk=2, fresh=True)
+    assert _results(results) == lines
+    assert fresh["resumed_from"] == 0
+
+
+def test_run_binary_archive(tmp_path):
+    archive, results = tmp_path / "votes.bin", tmp_path / "results.ndjson"
+    _write_archive(archive, binary=True)
+    with open(archive, "ab") as f:
+        f.write(b"\x00" * 10)
+    summary = run(str(archive), str(results), workers=1, chunk=4)
+    assert summary["records"] == 5
+    assert not summary["complete"]
+    assert "truncated header" in summary["error"]
+
+
+def test_summary_counts_duplicates():
+    summary = Summary()
+    for nullifier in ("a", "b", "a"):
+        summary.add({"status": "accepted", "selector": None, "nullifier": nullifier, "poll_id": 1})
+    summary.add({"status": "rejected", "selector": None, "detail": "invalid"})
+    counts = summary.to_json()
+    assert (counts["accepted"], counts["duplicate"], counts["rejected"]) == (2, 1, 1)
+    assert counts["selectors"]["unknown"]["duplicate"] == 1
+
+
+def _valid_vote(nullifier):
+    return VoteRequest(**vote_body(SEAL, nullifier=nullifier))
+
+
+def test_archive_ignores_cached_outcomes(tmp_path, monkeypatch):
+    # A shared cache claiming that a tampered vote verified
+    tampered = VoteRequest(**vote_body(SEAL, journal=JOURNAL[:-1] + bytes([JOURNAL[-1] ^ 1])))
+    cache_path = str(tmp_path / "cache.sqlite")
+    VerificationCache(path=cache_path).put(prepare_vote(tampered).cache_key, "")
+    monkeypatch.setenv("CHECKVOTE_CACHE_PATH", cache_path)
+    archive, results = tmp_path / "votes.ndjson", tmp_path / "results.ndjson"
+    archive.write_text(json.dumps(asdict(tampered)) + "\n")
+    summary = run(str(archive), str(results), workers=1)
+    assert (summary["accepted"], summary["rejected"]) == (0, 1)
+    assert "invalid proofs" in _results(results)[0]["detail"]
+
+
+def test_archive_reports_replayed_nullifier(tmp_path):
+    archive, results = tmp_path / "votes.ndjson", tmp_path / "results.ndjson"
+    votes = [_valid_vote("alice"), _valid_vote("bob"), _valid_vote("alice")]
+    archive.write_text("".join(json.dumps(asdict(v)) + "\n" for v in votes))
+    summary = run(str(archive), str(results), workers=1)
+    assert (summary["accepted"], summary["duplicate"], summary["rejected"]) == (2, 1, 0)
+    assert [r["status"] for r in _results(results)] == ["accepted", "accepted", "duplicate"]
+    assert _results(results)[2]["nullifier"] == "alice"